@@ -1,13 +1,23 @@
 from flask import Flask
 from os import environ, path
-from sqlalchemy_utils import database_exists, create_database
 import logging
 from .models import db
 from dotenv import load_dotenv
 from .routes.routes import init_routes
+from .commands import init_commands
+from .metrics import init_metrics
+from .database import (
+    bootstrap_database,
+    engine_options,
+    init_replica,
+    init_sqlite_transactions,
+)
+from .rate_limit import DEFAULT_LIMITS, Limit, init_rate_limit
+from .json_provider import make_json_provider
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
-from .models.seeders import seed_transaction_categories
+from werkzeug.middleware.proxy_fix import ProxyFix
+from .passwords import DEFAULT_HASH_METHOD, check_hash_method
 
 migrate = Migrate()
 
@@ -24,21 +34,81 @@ def create_app():
     app.config["JWT_SECRET_KEY"] = environ.get("JWT_SECRET_KEY")
     jwt = JWTManager(app)
 
+    # json encoding, orjson when installed unless told otherwise
+    app.json = make_json_provider(
+        app,
+        environ.get("JSON_PROVIDER", "auto"),
+        decimal_as_string=environ.get("JSON_DECIMAL_AS_STRING", "false").lower()
+        == "true",
+    )
+
+    # algorithm and cost for new password hashes, see app/passwords.py
+    app.config["PASSWORD_HASH_METHOD"] = environ.get(
+        "PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD
+    )
+    check_hash_method(app.config["PASSWORD_HASH_METHOD"])
+
+    # how long a stored Idempotency-Key response is replayed, in seconds
+    app.config["IDEMPOTENCY_KEY_TTL"] = int(environ.get("IDEMPOTENCY_KEY_TTL", 86400))
+
+    # shared secret for /api/admin and /api/events, unset disables them
+    app.config["ADMIN_API_KEY"] = environ.get("ADMIN_API_KEY")
+    # rows one POST /api/admin/users/import may hold, `flask users import`
+    # takes bigger files
+    app.config["ADMIN_IMPORT_MAX_ROWS"] = int(
+        environ.get("ADMIN_IMPORT_MAX_ROWS", 10000)
+    )
+
+    # reference data (transaction categories) cache lifetime, in seconds
+    app.config["REFERENCE_CACHE_TTL"] = int(environ.get("REFERENCE_CACHE_TTL", 300))
+
+    # logged in user and account ids cache lifetime, in seconds, 0 disables
+    app.config["PRINCIPAL_CACHE_TTL"] = int(environ.get("PRINCIPAL_CACHE_TTL", 30))
+
+    # requests slower than this are logged, a sample rate below 1 logs only
+    # a share of them
+    app.config["SLOW_REQUEST_THRESHOLD_MS"] = float(
+        environ.get("SLOW_REQUEST_THRESHOLD_MS", 500)
+    )
+    app.config["SLOW_REQUEST_SAMPLE_RATE"] = float(
+        environ.get("SLOW_REQUEST_SAMPLE_RATE", 1.0)
+    )
+
+    # proxies in front of the app whose X-Forwarded-For/-Proto to trust, 1
+    # behind Render's; without it every client has the proxy's address and
+    # shares its per-IP rate limits. Leave 0 when clients connect directly,
+    # they could send any X-Forwarded-For otherwise
+    proxy_hops = int(environ.get("TRUSTED_PROXY_HOPS", 0))
+    if proxy_hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_hops, x_proto=proxy_hops)
+
+    # token bucket limits per endpoint, e.g. RATE_LIMIT_LOGIN=10/minute
+    app.config["RATE_LIMIT_ENABLED"] = (
+        environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    )
+    app.config["RATE_LIMITS"] = {
+        name: Limit.parse(environ.get(f"RATE_LIMIT_{name.upper()}", default))
+        for name, default in DEFAULT_LIMITS.items()
+    }
+
     # pg db creation
     url = environ.get("POSTGRESQL_URL")
     if not url:
         raise ValueError("POSTGRESQL_URL not set in environment variables")
     try:
-        if not database_exists(url):
-            create_database(url)
-            logging.info("Database created successfully")
         app.config["SQLALCHEMY_DATABASE_URI"] = url
         app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        # pool sizing and statement timeout, see app/database.py
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+        # optional read replica for GET requests
+        init_replica(app, environ.get("REPLICA_DATABASE_URL"))
         db.init_app(app)
-        with app.app_context():
-            db.create_all()
-            seed_transaction_categories()  # add default categories
-            logging.info("Database tables created successfully")
+        init_sqlite_transactions(app)
+
+        # create the database, tables and default categories on boot, turn
+        # off in production and run `flask bootstrap` once per deploy instead
+        if environ.get("AUTO_BOOTSTRAP", "true").lower() == "true":
+            bootstrap_database(app)
 
     except Exception as e:
         logging.error(f"Database connection error: {str(e)}")
@@ -47,6 +117,15 @@ def create_app():
     # init routes
     init_routes(app)
 
+    # rate limiting, "memory" per process or "local" shared store stand-in
+    init_rate_limit(app, environ.get("RATE_LIMIT_STORAGE", "memory"))
+
+    # request latency and sql metrics
+    init_metrics(app)
+
+    # init cli commands
+    init_commands(app)
+
     # init flask-migrate
     migrate.init_app(app, db)
 
@@ -0,0 +1,163 @@
+import asyncio
+import re
+import time
+from os import environ
+from asgiref.sync import ThreadSensitiveContext
+from asgiref.wsgi import WsgiToAsgi
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.exceptions import HTTPException
+from app import create_app
+from app.blueprints import reads
+from app.database import async_database_url, async_engine_options, read_from_replica
+from app.metrics import request_duration, request_queries
+
+# ASGI entry point. The GET views of app/blueprints/reads.py spend most of
+# their time waiting on the database, here they run on the event loop with
+# an asyncio driver (asyncpg or aiosqlite), so a slow query holds a coroutine
+# instead of a worker. They run in a Flask request context, behind the JWT
+# check jwt_required makes, with the same queries and ownership checks as
+# the Flask views. Only their successful responses are sent from here;
+# anything else (a bad token, invalid parameters, another user's data) is
+# handed to the Flask app so status codes and error bodies stay exactly the
+# same. Every other route runs the Flask app on a thread of its own, at most
+# ASGI_WSGI_THREADS (16) at a time.
+#
+#   uvicorn asgi:app --workers 4
+
+
+class AsgiApp:
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.wsgi_app = WsgiToAsgi(flask_app)
+        self.wsgi_slots = asyncio.Semaphore(int(environ.get("ASGI_WSGI_THREADS", 16)))
+        self.routes = []
+
+        config = flask_app.config
+        url = config["SQLALCHEMY_DATABASE_URI"]
+        self.engines = {
+            "primary": create_async_engine(
+                async_database_url(url), **async_engine_options(url)
+            )
+        }
+        replica = config.get("SQLALCHEMY_BINDS", {}).get("replica")
+        if replica:
+            self.engines["replica"] = create_async_engine(
+                async_database_url(replica["url"]),
+                **async_engine_options(replica["url"]),
+            )
+        self.sessions = {
+            name: async_sessionmaker(engine) for name, engine in self.engines.items()
+        }
+
+    def route(self, rule, view):
+        # Flask style rule, only <int:name> converters are needed here
+        pattern = re.sub(r"<int:(\w+)>", r"(?P<\1>\\d+)", rule)
+        self.routes.append((re.compile(f"^{pattern}$"), rule, view))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self.lifespan(receive, send)
+
+        if scope["type"] == "http" and scope["method"] == "GET":
+            for regex, rule, view in self.routes:
+                match = regex.match(scope["path"])
+                if match:
+                    params = {
+                        key: int(value) for key, value in match.groupdict().items()
+                    }
+                    if await self.handle(scope, send, rule, view, params):
+                        return
+                    break
+
+        # asgiref runs every WSGI call on one shared thread, unless the call
+        # has a thread sensitive context of its own
+        async with self.wsgi_slots:
+            async with ThreadSensitiveContext():
+                await self.wsgi_app(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for engine in self.engines.values():
+                    await engine.dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def request_context(self, scope):
+        client = scope.get("client")
+        return self.flask_app.test_request_context(
+            scope["path"],
+            query_string=scope["query_string"].decode("latin-1"),
+            headers=[
+                (key.decode("latin-1"), value.decode("latin-1"))
+                for key, value in scope["headers"]
+            ],
+            environ_base={"REMOTE_ADDR": client[0]} if client else None,
+        )
+
+    async def handle(self, scope, send, rule, view, params):
+        started = time.perf_counter()
+        with self.request_context(scope):
+            try:
+                verify_jwt_in_request()
+            except Exception:
+                return False
+
+            # the same replica routing as RoutingSession
+            name = "replica" if read_from_replica() else "primary"
+            try:
+                async with self.sessions[name]() as session:
+                    result, queries = await self.run_statements(
+                        session, view(int(get_jwt_identity()), **params)
+                    )
+            except HTTPException:
+                return False
+            payload, status, headers = result
+            if status != 200:
+                return False
+
+            response = self.flask_app.json.response(payload)
+        response.headers.extend(headers)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": response.status_code,
+                "headers": [
+                    (key.lower().encode("latin-1"), value.encode("latin-1"))
+                    for key, value in response.headers.items()
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": response.get_data()})
+
+        request_duration.observe(
+            time.perf_counter() - started, "GET", rule, response.status_code
+        )
+        request_queries.observe(queries, "GET", rule)
+        return True
+
+    async def run_statements(self, session, steps):
+        """app.database.run_statements on an async session, counting queries."""
+        queries = 0
+        try:
+            stmt = next(steps)
+            while True:
+                queries += 1
+                stmt = steps.send((await session.execute(stmt)).all())
+        except StopIteration as done:
+            return done.value, queries
+
+
+def create_asgi_app(flask_app=None):
+    app = AsgiApp(flask_app or create_app())
+    app.route("/api/users/me", reads.profile)
+    app.route("/api/transactions", reads.transaction_history)
+    app.route("/api/transactions/<int:transaction_id>", reads.transaction_details)
+    app.route("/api/accounts/<int:account_id>/balance", reads.account_balance)
+    app.route("/api/bills", reads.bills)
+    app.route("/api/budgets", reads.budgets)
+    return app
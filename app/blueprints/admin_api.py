@@ -0,0 +1,73 @@
+import hmac
+import io
+from functools import wraps
+from itertools import islice
+from flask import Blueprint, current_app, request, jsonify
+from app.models.user_import import DEFAULT_CHUNK_SIZE, import_users, read_rows
+
+admin_api = Blueprint("admin_api", __name__)
+
+IMPORT_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+}
+
+
+def admin_required(view):
+    # operator endpoints take the ADMIN_API_KEY in the X-Admin-Key header
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        admin_key = current_app.config.get("ADMIN_API_KEY")
+        if not admin_key:
+            return jsonify({"error": "Admin API is disabled"}), 404
+        provided = request.headers.get("X-Admin-Key", "")
+        if not hmac.compare_digest(provided.encode(), admin_key.encode()):
+            return jsonify({"error": "Invalid admin key"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+@admin_api.route("/admin/users/import", methods=["POST"])
+@admin_required
+def import_users_endpoint():
+    fmt = IMPORT_CONTENT_TYPES.get(request.mimetype)
+    if not fmt:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid content type. Must be one of "
+                    f"{list(IMPORT_CONTENT_TYPES)}"
+                }
+            ),
+            415,
+        )
+
+    try:
+        chunk_size = int(request.args.get("chunk_size", DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        return jsonify({"error": "Chunk size must be a valid number"}), 400
+    if chunk_size < 1:
+        return jsonify({"error": "Chunk size must be positive"}), 400
+
+    # parsed as the body arrives, at most one row past the limit is read
+    # so a file that's too big is turned down before anything is imported
+    max_rows = current_app.config["ADMIN_IMPORT_MAX_ROWS"]
+    stream = io.TextIOWrapper(request.stream, encoding="utf-8", newline="")
+    rows = list(islice(read_rows(stream, fmt), max_rows + 1))
+    if len(rows) > max_rows:
+        return (
+            jsonify(
+                {
+                    "error": f"An import can hold at most {max_rows} rows, "
+                    "use `flask users import` for bigger files"
+                }
+            ),
+            413,
+        )
+
+    # hashed in this worker, forking a process pool per request would copy
+    # its open connections and threads; use `flask users import` for bulk
+    summary = import_users(rows, chunk_size, workers=1)
+    status = 201 if summary["created"] else 400
+    return jsonify(summary), status
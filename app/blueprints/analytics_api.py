@@ -0,0 +1,107 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from sqlalchemy import extract, func, select
+from datetime import datetime
+from app.models import db
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction_category import TransactionCategory
+from app.models.principal import current_principal
+
+analytics_api = Blueprint("analytics_api", __name__)
+
+GROUP_BY_OPTIONS = ["category", "day", "month"]
+
+
+@analytics_api.route("/analytics/spending", methods=["GET"])
+@jwt_required()
+def spending():
+    principal = current_principal()
+
+    group_by = request.args.get("group_by", "category")
+    if group_by not in GROUP_BY_OPTIONS:
+        return (
+            jsonify({"error": f"Invalid group_by. Must be one of {GROUP_BY_OPTIONS}"}),
+            400,
+        )
+
+    criteria = [SpendingRollup.user_id == principal.id]
+    try:
+        # date range, both ends inclusive
+        if request.args.get("from"):
+            start = datetime.strptime(request.args["from"], "%Y-%m-%d").date()
+            criteria.append(SpendingRollup.day >= start)
+        if request.args.get("to"):
+            end = datetime.strptime(request.args["to"], "%Y-%m-%d").date()
+            criteria.append(SpendingRollup.day <= end)
+    except ValueError:
+        return (
+            jsonify(
+                {
+                    "error": "Invalid date format. Use YYYY-MM-DD format, example: 2025-04-15"
+                }
+            ),
+            400,
+        )
+
+    if request.args.get("category_id"):
+        try:
+            criteria.append(
+                SpendingRollup.category_id == int(request.args["category_id"])
+            )
+        except ValueError:
+            return jsonify({"error": "Category ID must be a valid number"}), 400
+
+    totals = (
+        func.sum(SpendingRollup.total_amount).label("total_amount"),
+        func.sum(SpendingRollup.transaction_count).label("transaction_count"),
+    )
+
+    # aggregated from the daily rollup rows, never from raw transactions
+    if group_by == "category":
+        stmt = (
+            select(
+                SpendingRollup.category_id,
+                TransactionCategory.name.label("category"),
+                *totals,
+            )
+            .join(
+                TransactionCategory,
+                SpendingRollup.category_id == TransactionCategory.id,
+            )
+            .where(*criteria)
+            .group_by(SpendingRollup.category_id, TransactionCategory.name)
+            .order_by(SpendingRollup.category_id)
+        )
+        key = lambda row: {"category_id": row.category_id, "category": row.category}
+    elif group_by == "day":
+        stmt = (
+            select(SpendingRollup.day, *totals)
+            .where(*criteria)
+            .group_by(SpendingRollup.day)
+            .order_by(SpendingRollup.day)
+        )
+        key = lambda row: {"day": row.day}
+    else:
+        year = extract("year", SpendingRollup.day)
+        month = extract("month", SpendingRollup.day)
+        stmt = (
+            select(year.label("year"), month.label("month"), *totals)
+            .where(*criteria)
+            .group_by(year, month)
+            .order_by(year, month)
+        )
+        key = lambda row: {"month": f"{int(row.year):04d}-{int(row.month):02d}"}
+
+    return (
+        jsonify(
+            [
+                {
+                    **key(row),
+                    "total_amount": row.total_amount,
+                    "transaction_count": int(row.transaction_count),
+                }
+                for row in db.session.execute(stmt)
+            ]
+        ),
+        200,
+    )
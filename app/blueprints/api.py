@@ -1,49 +1,64 @@
-from flask import Blueprint, request, jsonify
+from flask import (
+    Blueprint,
+    Response,
+    current_app,
+    json,
+    request,
+    jsonify,
+    stream_with_context,
+)
 from app.models.user import User, db
-from werkzeug.security import generate_password_hash, check_password_hash
 from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.models.account import Account
-from password_strength import PasswordPolicy, tests
+from app.models.account_numbers import commit_with_new_account_numbers
+from app.models.principal import current_principal
+from app.passwords import hash_password, strength_check, verify_password
 from app.models.transaction import Transaction
-from decimal import Decimal
-from app.models.transaction_category import TransactionCategory
-from app.models.budget import Budget
+from app.models.reference_cache import cache_stats, list_categories
+from app.metrics import render_metrics
+from app.database import pool_status, use_primary
+from app.rate_limit import rate_limit
+from app.blueprints import reads
+from app.blueprints.reads import parse_history_args
 from datetime import datetime
-from app.models.bill import Bill
+from app.models.serializers import (
+    TRANSACTION_FIELDS,
+    serialize_transactions,
+    transaction_row_to_dict,
+    transaction_rows,
+)
+import csv
+import io
+from app.models.idempotency_key import (
+    IdempotencyError,
+    claim_idempotency_key,
+    complete_idempotency_key,
+    request_hash,
+)
+from app.models.transaction_service import (
+    BatchLookups,
+    TransactionError,
+    process_transaction,
+)
+from app.models.transaction_history import history_filters
 
 api = Blueprint("api", __name__)
 
-policy = PasswordPolicy.from_names(
-    length=8,  # min length: 8
-    uppercase=1,  # need min. 1 uppercase letters
-    numbers=1,  # need min. 1 digits
-    special=1,  # need min. 1 special characters
-    # nonletters=2,  # need min. 2 non-letter characters (digits, specials, anything)
-)
+MAX_BATCH_SIZE = 1000
 
+STATEMENT_CHUNK_SIZE = 1000
+STATEMENT_FORMATS = {
+    "csv": ("text/csv", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
 
-def strength_check(pw):
-    test = policy.test(pw)
-    if test:
-        error_messages = []
-        for failed_test in test:
-            test_type = failed_test.__class__.__name__
 
-            if test_type == "Length":
-                error_messages.append("Password must be at least 8 characters")
-            elif test_type == "Uppercase":
-                error_messages.append(
-                    "Password must contain at least 1 uppercase letter"
-                )
-            elif test_type == "Numbers":
-                error_messages.append("Password must contain at least 1 number")
-            elif test_type == "Special":
-                error_messages.append(
-                    "Password must contain at least 1 special character"
-                )
-        return error_messages
-    return None
+def csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
 
 
 @api.route("/users", methods=["GET", "POST"])
@@ -74,12 +89,14 @@ def users():
         if User.query.filter_by(email=data["email"]).first():
             return jsonify({"error": "Email already exists"}), 400
 
-        try:
+        password_hash = hash_password(data["password"])
+
+        def build():
             # Create new user
             new_user = User(
                 username=data["username"],
                 email=data["email"],
-                password_hash=generate_password_hash(data["password"]),
+                password_hash=password_hash,
                 first_name=data["first_name"],
                 last_name=data["last_name"],
             )
@@ -93,13 +110,18 @@ def users():
                 is_main=True,
             )
             db.session.add(main_account)
+            return new_user, main_account
 
-            db.session.commit()
+        try:
+            new_user, main_account = commit_with_new_account_numbers(build)
 
             # show new user and their acc info
             response_data = new_user.to_dict()
             response_data["account"] = main_account.to_dict()
             return jsonify(response_data), 201
+        except IntegrityError:
+            # registered concurrently after the checks above
+            return jsonify({"error": "Username or email already exists"}), 400
         except Exception as e:
             db.session.rollback()
             return jsonify({"error": str(e)}), 500
@@ -112,13 +134,12 @@ def users():
 @api.route("/users/me", methods=["GET", "PUT"])
 @jwt_required()
 def profile():
-    # fetch user id from jwt
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
-    if not user:
+    principal = current_principal()
+    if not principal.user:
         return jsonify({"error": "User not found"}), 404
 
     if request.method == "PUT":
+        user = db.session.get(User, principal.id)
         if not request.is_json:
             return jsonify({"error": "Missing JSON in request"}), 400
 
@@ -133,7 +154,7 @@ def profile():
                 )
 
             # check for wrong curr password
-            if not check_password_hash(user.password_hash, current_password):
+            if not verify_password(user.password_hash, current_password):
                 return jsonify({"error": "Current password is incorrect"}), 401
 
             # check new pw str
@@ -146,7 +167,7 @@ def profile():
                     400,
                 )
 
-            user.password_hash = generate_password_hash(data["password"])
+            user.password_hash = hash_password(data["password"])
             data.pop("password")
             data.pop("current_password")
 
@@ -172,7 +193,7 @@ def profile():
             return jsonify({"error": str(e)}), 500
 
     # GET
-    return jsonify(user.to_dict())
+    return reads.respond(reads.profile(principal.id))
 
 
 @api.route("/accounts", methods=["GET"])
@@ -200,20 +221,22 @@ def create_account():
             400,
         )
 
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
-    if not user:
+    principal = current_principal()
+    if not principal.user:
         return jsonify({"error": "User not found"}), 404
 
-    try:
+    def build():
         new_account = Account(
             account_number=Account.generate_unique_account_number(),
             account_type=account_type,
-            user=user,
+            user_id=principal.id,
             is_main=False,
         )
         db.session.add(new_account)
-        db.session.commit()
+        return new_account
+
+    try:
+        new_account = commit_with_new_account_numbers(build)
 
         return jsonify(new_account.to_dict()), 201
     except Exception as e:
@@ -227,14 +250,84 @@ def account_details(account_id):
     return jsonify(account.to_dict()), 200
 
 
+@api.route("/accounts/<int:account_id>/balance", methods=["GET"])
+@jwt_required()
+def account_balance(account_id):
+    return reads.respond(reads.account_balance(current_principal().id, account_id))
+
+
+@api.route("/accounts/<int:account_id>/statement", methods=["GET"])
+@jwt_required()
+def account_statement(account_id):
+    account = Account.query.get_or_404(account_id)
+
+    # only allows user-owned accounts
+    if not current_principal().owns(account):
+        return jsonify({"error": "Unauthorized access"}), 403
+
+    statement_format = request.args.get("format", "csv")
+    if statement_format not in STATEMENT_FORMATS:
+        return (
+            jsonify(
+                {"error": f"Invalid format. Must be one of {list(STATEMENT_FORMATS)}"}
+            ),
+            400,
+        )
+
+    try:
+        args = parse_history_args(
+            {key: request.args.get(key) for key in ("from", "to")}
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # oldest first, rows are pulled from a server-side cursor in chunks
+    stmt = (
+        transaction_rows()
+        .where(
+            (Transaction.from_account_id == account.id)
+            | (Transaction.to_account_id == account.id),
+            *history_filters(**args),
+        )
+        .order_by(Transaction.created_at.asc(), Transaction.id.asc())
+        .execution_options(yield_per=STATEMENT_CHUNK_SIZE)
+    )
+
+    def generate():
+        if statement_format == "csv":
+            yield ",".join(TRANSACTION_FIELDS) + "\r\n"
+
+        for chunk in db.session.execute(stmt).partitions():
+            buffer = io.StringIO()
+            if statement_format == "csv":
+                writer = csv.writer(buffer)
+                for row in chunk:
+                    transaction = transaction_row_to_dict(row)
+                    writer.writerow(
+                        [csv_value(transaction[field]) for field in TRANSACTION_FIELDS]
+                    )
+            else:
+                for row in chunk:
+                    buffer.write(json.dumps(transaction_row_to_dict(row)) + "\n")
+            yield buffer.getvalue()
+
+    mimetype, extension = STATEMENT_FORMATS[statement_format]
+    return Response(
+        stream_with_context(generate()),
+        mimetype=mimetype,
+        headers={
+            "Content-Disposition": f"attachment; filename=statement-{account.account_number}.{extension}"
+        },
+    )
+
+
 @api.route("/accounts/<int:account_id>", methods=["PUT", "DELETE"])
 @jwt_required()
 def manage_account(account_id):
-    current_user_id = get_jwt_identity()
     account = Account.query.get_or_404(account_id)
 
     # only allows user-owned accounts
-    if account.user_id != int(current_user_id):
+    if not current_principal().owns(account):
         return jsonify({"error": "Unauthorized access"}), 403
 
     if request.method == "PUT":
@@ -274,8 +367,9 @@ def manage_account(account_id):
 
 @api.route("/transactions", methods=["GET", "POST"])
 @jwt_required()
+@rate_limit("transactions", per="identity", methods=["POST"])
 def create_transaction():
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
 
     if request.method == "POST":
         if not request.is_json:
@@ -283,334 +377,182 @@ def create_transaction():
 
         data = request.get_json()
 
-        # validate fields based on the transaction type
-        if data.get("transaction_type") == Transaction.BILL_PAYMENT:
-            required_fields = ["account_id", "transaction_type", "bill_id"]
-        else:
-            required_fields = ["account_id", "amount", "transaction_type"]
-
-        for field in required_fields:
-            if field not in data:
-                return jsonify({"error": f"Missing required field: {field}"}), 400
-
-        # prevent access to another account
-        account = Account.query.get(data["account_id"])
-        if not account:
-            return jsonify({"error": "Account is not found"}), 404
-        if str(account.user_id) != current_user_id:
-            return jsonify({"error": "Unauthorized access to account"}), 403
-
-        if data["transaction_type"] == Transaction.BILL_PAYMENT:
-            if "bill_id" not in data:
-                return (
-                    jsonify(
-                        {"error": "Bill ID (bill_id) is required for bill payments"}
-                    ),
-                    400,
+        # retries carrying the same Idempotency-Key get the first response
+        key = request.headers.get("Idempotency-Key")
+        record = None
+        if key is not None:
+            try:
+                record = claim_idempotency_key(
+                    principal.id,
+                    key,
+                    request_hash(request.method, request.path, data),
+                    current_app.config["IDEMPOTENCY_KEY_TTL"],
                 )
-
-            # check bill id
-            bill = Bill.query.get(data["bill_id"])
-            if not bill:
-                # get pending bills as helper
-                pending_bills = Bill.query.filter_by(
-                    user_id=current_user_id, status="pending"
-                ).all()
-
-                return (
-                    jsonify(
-                        {
-                            "error": "Bill ID is not found",
-                            "details": {
-                                "available_pending_bills": [
-                                    {
-                                        "id": biller.id,
-                                        "account_id": biller.account_id,
-                                        "biller_name": biller.biller_name,
-                                        "amount": float(biller.amount),
-                                        "due_date": biller.due_date.isoformat(),
-                                    }
-                                    for biller in pending_bills
-                                ]
-                            },
-                        }
-                    ),
-                    404,
+            except IdempotencyError as e:
+                db.session.rollback()
+                return jsonify({"error": str(e)}), e.status
+            if record.status_code is not None:
+                response = Response(
+                    record.response_body,
+                    status=record.status_code,
+                    mimetype="application/json",
                 )
+                response.headers["Idempotent-Replayed"] = "true"
+                return response
 
-            # check bill ownership
-            if str(bill.user_id) != current_user_id:
-                # get pending bills as helper
-                pending_bills = Bill.query.filter_by(
-                    user_id=current_user_id, status="pending"
-                ).all()
-
-                return (
-                    jsonify(
-                        {
-                            "error": "Unauthorized access to bill",
-                            "details": {
-                                "available_pending_bills": [
-                                    {
-                                        "id": biller.id,
-                                        "account_id": biller.account_id,
-                                        "biller_name": biller.biller_name,
-                                        "amount": float(biller.amount),
-                                        "due_date": biller.due_date.isoformat(),
-                                    }
-                                    for biller in pending_bills
-                                ]
-                            },
-                        }
-                    ),
-                    403,
-                )
+        try:
+            transaction = process_transaction(data, str(principal.id))
+            db.session.flush()
+            body = json.dumps(transaction.to_dict())
 
-            # check bill status
-            if bill.status != "pending":
-                return (
-                    jsonify(
-                        {
-                            "error": "Cannot pay bill",
-                            "details": {
-                                "bill_id": bill.id,
-                                "biller_name": bill.biller_name,
-                                "status": bill.status,
-                                "reason": f"Bill is already {bill.status}",
-                            },
-                        }
-                    ),
-                    400,
-                )
+            # stored in the same commit as the transaction itself
+            if record is not None:
+                complete_idempotency_key(record, body, 201)
+            db.session.commit()
 
-            # check correct account for paying
-            if bill.account_id != account.id:
-                return (
-                    jsonify(
-                        {
-                            "error": "Invalid account for bill payment",
-                            "details": {
-                                "bill_id": bill.id,
-                                "required_account": bill.account.account_number,
-                                "provided_account": account.account_number,
-                            },
-                        }
-                    ),
-                    400,
-                )
+            return Response(body, status=201, mimetype="application/json")
+        except TransactionError as e:
+            # takes the idempotency claim back too, the key stays reusable
+            db.session.rollback()
+            return jsonify(e.payload), e.status
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 500
+    # GET
+    return reads.respond(reads.transaction_history(principal.id))
 
-            # check for sufficient balance
-            if account.balance < bill.amount:
-                return (
-                    jsonify(
-                        {
-                            "error": "Insufficient funds",
-                            "details": {
-                                "account_balance": float(account.balance),
-                                "bill_amount": float(bill.amount),
-                            },
-                        }
-                    ),
-                    400,
-                )
-            # auto. assign req. amount for bill payment
-            data["amount"] = str(bill.amount)
 
-        # transfer type validation
-        if data["transaction_type"] == Transaction.TRANSFER:
-            if "to_account_number" not in data:
-                return (
-                    jsonify(
-                        {
-                            "error": "Destination account number is required for transfers"
-                        }
-                    ),
-                    400,
-                )
+@api.route("/transactions/batch", methods=["POST"])
+@jwt_required()
+@rate_limit("transactions_batch", per="identity")
+def create_transactions_batch():
+    current_user_id = get_jwt_identity()
 
-            to_account = Account.query.filter_by(
-                account_number=data["to_account_number"]
-            ).first()
-            if not to_account:
-                return jsonify({"error": "Destination account not found"}), 404
+    if not request.is_json:
+        return jsonify({"error": "Missing JSON in request"}), 400
 
-            if account.id == to_account.id:
-                return jsonify({"error": "Cannot transfer to yourself"}), 400
+    data = request.get_json()
 
-        # check if it's payment type
-        if data["transaction_type"] == Transaction.PAYMENT:
-            # check for category_id in req. body
-            if "category_id" not in data:
-                return (
-                    jsonify(
-                        {
-                            "error": "Transaction category (category_id) is required for payment"
-                        }
-                    ),
-                    400,
-                )
+    items = data.get("transactions")
+    if not isinstance(items, list) or not items:
+        return (
+            jsonify({"error": "Transactions (transactions) must be a non-empty list"}),
+            400,
+        )
+    if len(items) > MAX_BATCH_SIZE:
+        return (
+            jsonify(
+                {"error": f"A batch can hold at most {MAX_BATCH_SIZE} transactions"}
+            ),
+            400,
+        )
 
-            category = TransactionCategory.query.get(data["category_id"])
-            if not category:
-                return jsonify({"error": "Invalid transaction category"}), 400
-
-            # check for active budget in this category
-            active_budget = Budget.query.filter(
-                Budget.user_id == current_user_id,
-                Budget.category_id == category.id,
-                Budget.start_date <= datetime.now(),
-                Budget.end_date >= datetime.now(),
-            ).first()
-
-            # check if there's active budget
-            if active_budget:
-                amount = Decimal(str(data["amount"]))
-                if amount > active_budget.remaining_amount:
-                    return (
-                        jsonify(
-                            {
-                                "error": "Payment exceeds remaining budget.",
-                                "details": {
-                                    "requested_amount": float(amount),
-                                    "available_budget": float(
-                                        active_budget.remaining_amount
-                                    ),
-                                    "category": category.name,
-                                    "budget_end_date": active_budget.end_date.isoformat(),
-                                },
-                            }
-                        ),
-                        400,
-                    )
+    # all-or-nothing by default, "atomic": false applies every valid item
+    atomic = data.get("atomic", True)
+    if not isinstance(atomic, bool):
+        return jsonify({"error": "Atomic must be true or false"}), 400
 
-        try:
-            amount = Decimal(str(data["amount"]))
-
-            # prevent 0 transaction or below
-            if amount <= 0:
-                return jsonify({"error": "Amount must be positive"}), 400
-
-            # check balance
-            if data["transaction_type"] in [
-                Transaction.WITHDRAWAL,
-                Transaction.TRANSFER,
-                Transaction.PAYMENT,
-            ]:
-                if account.balance < amount:
-                    return jsonify({"error": "Insufficient funds"}), 400
-
-            transaction = Transaction(
-                amount=amount,
-                transaction_type=data["transaction_type"],
-                description=(
-                    data.get("description", f"Bill payment: {bill.biller_name}")
-                    if data["transaction_type"] == Transaction.BILL_PAYMENT
-                    else data.get("description", "")
-                ),
-                from_account_id=account.id,
-                to_account_id=(
-                    to_account.id
-                    if data["transaction_type"] == Transaction.TRANSFER
-                    else None
-                ),
-                category_id=(
-                    bill.category_id
-                    if data["transaction_type"] == Transaction.BILL_PAYMENT
-                    else (
-                        data["category_id"]
-                        if data["transaction_type"] == Transaction.PAYMENT
-                        else None
-                    )
+    try:
+        lookups = BatchLookups(items)
+        results = []
+        created = {}
+
+        # atomic batches flush all new rows together at the end, partial
+        # batches give each item its own savepoint instead
+        with db.session.no_autoflush:
+            for index, item in enumerate(items):
+                savepoint = None if atomic else db.session.begin_nested()
+                try:
+                    if not isinstance(item, dict):
+                        raise TransactionError(
+                            {"error": "Transaction must be an object"}
+                        )
+                    transaction = process_transaction(item, current_user_id, lookups)
+                    if savepoint:
+                        savepoint.commit()
+                except TransactionError as e:
+                    # anything else is a server error, the whole batch
+                    # rolls back below
+                    if savepoint:
+                        savepoint.rollback()
+                        lookups.expire()
+                    results.append({"index": index, "status": e.status, **e.payload})
+                    if atomic:
+                        break
+                    continue
+
+                created[index] = transaction
+                results.append({"index": index, "status": 201})
+
+        if atomic and len(created) < len(items):
+            db.session.rollback()
+            failed = results[-1]
+            return (
+                jsonify(
+                    {
+                        "error": "Batch rejected, no transaction was applied",
+                        "details": failed,
+                    }
                 ),
+                failed["status"],
             )
 
-            # handle balance updates
-            if transaction.transaction_type == Transaction.BILL_PAYMENT:
-                account.balance -= amount
-                bill.status = "paid"
-            elif transaction.transaction_type == Transaction.DEPOSIT:
-                account.balance += amount
-            elif transaction.transaction_type in [
-                Transaction.WITHDRAWAL,
-                Transaction.PAYMENT,
-            ]:
-                account.balance -= amount
-
-                if (
-                    transaction.transaction_type == Transaction.PAYMENT
-                    and active_budget
-                ):
-                    active_budget.remaining_amount -= amount
-            elif transaction.transaction_type == Transaction.TRANSFER:
-                account.balance -= amount
-                to_account.balance += amount
-            else:
-                return jsonify({"error": "Invalid transaction type"}), 400
-
-            db.session.add(transaction)
-            db.session.commit()
-
-            return jsonify(transaction.to_dict()), 201
-        except ValueError as e:
-            return jsonify({"error": str(e)}), 400
-        except Exception as e:
-            db.session.rollback()
-            return jsonify({"error": str(e)}), 500
-    # GET
-    user = User.query.get(int(current_user_id))
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-
-    # fetch all owned accs for the current logged user
-    user_account_ids = [account.id for account in user.accounts]
+        db.session.flush()
+        created = {index: transaction.id for index, transaction in created.items()}
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": str(e)}), 500
 
-    # filter all transactions made by current user-owned accs (both as sender and receiver)
-    transactions = (
-        Transaction.query.filter(
-            (Transaction.from_account_id.in_(user_account_ids))
-            | (Transaction.to_account_id.in_(user_account_ids))
+    # serialize every created transaction in one query
+    transactions = {
+        transaction["id"]: transaction
+        for transaction in serialize_transactions(
+            transaction_rows().where(Transaction.id.in_(created.values()))
         )
-        .order_by(Transaction.created_at.desc())
-        .all()
-    )
+    }
+    for result in results:
+        if result["index"] in created:
+            result["transaction"] = transactions[created[result["index"]]]
 
-    return jsonify([transaction.to_dict() for transaction in transactions]), 200
+    status = 201 if len(created) == len(items) else 207
+    return jsonify({"results": results}), status
 
 
 @api.route("/transactions/<int:transaction_id>", methods=["GET"])
 @jwt_required()
 def get_transaction_details(transaction_id):
-    current_user_id = get_jwt_identity()
-    user = User.query.get(int(current_user_id))
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    return reads.respond(
+        reads.transaction_details(current_principal().id, transaction_id)
+    )
 
-    user_account_ids = [account.id for account in user.accounts]
 
-    # get transaction data based on the queried id
-    transaction = Transaction.query.get_or_404(transaction_id)
+@api.route("/transactions/categories")
+def categories():
+    categories = list_categories()
+    return jsonify([category.to_dict() for category in categories]), 200
 
-    # only allow viewing for currently logged in user accounts
-    if (
-        transaction.from_account_id not in user_account_ids
-        and transaction.to_account_id not in user_account_ids
-    ):
-        return jsonify({"error": "Unauthorized access to transaction details"}), 403
 
-    return jsonify(transaction.to_dict()), 200
+@api.route("/metrics")
+def metrics():
+    return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
 
 
-@api.route("/transactions/categories")
-def categories():
-    categories = TransactionCategory.query.all()
-    return jsonify([category.to_dict() for category in categories]), 200
+@api.route("/health/pool")
+def pool_health():
+    return pool_status(db.engine)
 
 
 # check db connection
 @api.route("/health")
+@use_primary
 def health_check():
     try:
         db.session.execute(text("SELECT 1"))
-        return {"status": "healthy", "database": "connected"}
+        return {
+            "status": "healthy",
+            "database": "connected",
+            "reference_cache": cache_stats(),
+        }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}, 500
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from app.models.user import User
-from werkzeug.security import check_password_hash
+from app.rate_limit import rate_limit
+from app.passwords import needs_rehash, schedule_rehash, verify_password
 
 auth = Blueprint("auth", __name__)
 
 
 @auth.route("/login", methods=["POST"])
+@rate_limit("login")
 def login():
     if not request.is_json:
         return jsonify({"error": "Missing JSON in request"}), 400
@@ -19,8 +21,12 @@ def login():
 
     user = User.query.filter_by(username=username).first()
 
-    if not user or not check_password_hash(user.password_hash, password):
+    if not user or not verify_password(user.password_hash, password):
         return jsonify({"error": "Invalid username or password"}), 401
 
+    # move old hashes to the configured method and cost
+    if needs_rehash(user.password_hash):
+        schedule_rehash(user.id, user.password_hash, password)
+
     access_token = create_access_token(identity=str(user.id))
     return jsonify(access_token=access_token)
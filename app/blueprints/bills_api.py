@@ -1,11 +1,13 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from decimal import Decimal
 from datetime import datetime
 from app.models.account import Account
-from app.models.transaction_category import TransactionCategory
+from app.models.reference_cache import get_category
 from app.models.bill import Bill
 from app.models import db
+from app.blueprints import reads
+from app.models.principal import current_principal
 
 bills_api = Blueprint("bills_api", __name__)
 
@@ -13,7 +15,7 @@ bills_api = Blueprint("bills_api", __name__)
 @bills_api.route("/bills", methods=["GET", "POST"])
 @jwt_required()
 def bill():
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
 
     if request.method == "POST":
         if not request.is_json:
@@ -40,7 +42,7 @@ def bill():
             account = Account.query.get(data["account_id"])
             if not account:
                 return jsonify({"error": "Account not found"}), 404
-            if str(account.user_id) != current_user_id:
+            if not principal.owns(account):
                 return jsonify({"error": "Unauthorized access to account"}), 403
 
             amount = Decimal(str(data["amount"]))
@@ -83,18 +85,24 @@ def bill():
                     400,
                 )
 
-            category = TransactionCategory.query.get(data["category_id"])
+            category = get_category(data["category_id"])
             if not category:
                 return jsonify({"error": "Transaction category not found"}), 404
 
+            # pay automatically on the due date
+            auto_pay = data.get("auto_pay", False)
+            if not isinstance(auto_pay, bool):
+                return jsonify({"error": "Auto pay must be true or false"}), 400
+
             bill = Bill(
                 biller_name=biller_name,
                 due_date=due_date,
                 amount=amount,
-                user_id=current_user_id,
+                user_id=principal.id,
                 account_id=account.id,
                 category_id=category.id,
                 status="pending",
+                auto_pay=auto_pay,
             )
 
             db.session.add(bill)
@@ -109,23 +117,18 @@ def bill():
             return jsonify({"error": str(e)}), 500
 
     # GET
-    query = Bill.query.filter_by(user_id=current_user_id)
-
-    # sort from the nearest due
-    bills = query.order_by(Bill.due_date.asc()).all()
-
-    return jsonify([bill.to_dict() for bill in bills]), 200
+    return reads.respond(reads.bills(principal.id))
 
 
 @bills_api.route("/bills/<int:bill_id>", methods=["GET", "PUT", "DELETE"])
 @jwt_required()
 def manage_bill(bill_id):
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
     bill = Bill.query.get(bill_id)
     if not bill:
         return jsonify({"error": "Bill ID not found"}), 404
 
-    if str(bill.user_id) != current_user_id:
+    if not principal.owns(bill):
         return jsonify({"error": "Unauthorized access to bill"}), 403
 
     if request.method == "DELETE":
@@ -198,6 +201,10 @@ def manage_bill(bill_id):
                     if due_date < datetime.now():
                         return jsonify({"error": "Due date cannot be in the past"}), 400
                     bill.due_date = due_date
+
+                    # a rescheduled overdue bill is due again
+                    if bill.status == "overdue":
+                        bill.status = "pending"
                 except ValueError:
                     return (
                         jsonify(
@@ -208,8 +215,13 @@ def manage_bill(bill_id):
                         400,
                     )
 
+            if "auto_pay" in data:
+                if not isinstance(data["auto_pay"], bool):
+                    return jsonify({"error": "Auto pay must be true or false"}), 400
+                bill.auto_pay = data["auto_pay"]
+
             if "category_id" in data:
-                category = TransactionCategory.query.get(data["category_id"])
+                category = get_category(data["category_id"])
                 if not category:
                     return jsonify({"error": "Transaction category not found"}), 404
                 bill.category_id = category.id
@@ -218,7 +230,7 @@ def manage_bill(bill_id):
                 account = Account.query.get(data["account_id"])
                 if not account:
                     return jsonify({"error": "Account not found"}), 404
-                if str(account.user_id) != current_user_id:
+                if not principal.owns(account):
                     return jsonify({"error": "Unauthorized access to account"}), 403
                 if account.balance < bill.amount:
                     return (
@@ -252,12 +264,12 @@ def manage_bill(bill_id):
 @bills_api.route("/bills/<int:bill_id>/cancel", methods=["POST"])
 @jwt_required()
 def cancel_bill(bill_id):
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
     bill = Bill.query.get(bill_id)
     if not bill:
         return jsonify({"error": "Bill ID not found"}), 404
 
-    if str(bill.user_id) != current_user_id:
+    if not principal.owns(bill):
         return jsonify({"error": "Unauthorized access to bill"}), 403
 
     if bill.status == "paid":
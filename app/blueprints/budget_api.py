@@ -1,8 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required
 from app.models import db
 from app.models.budget import Budget
-from app.models.transaction_category import TransactionCategory
+from app.blueprints import reads
+from app.models.reference_cache import get_category
+from app.models.principal import current_principal
 from datetime import datetime, timedelta
 from decimal import Decimal, DecimalException
 
@@ -12,7 +14,7 @@ budget_api = Blueprint("budget_api", __name__)
 @budget_api.route("/budgets", methods=["GET", "POST"])
 @jwt_required()
 def budget():
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
 
     if request.method == "POST":
         if not request.is_json:
@@ -33,7 +35,7 @@ def budget():
 
             # check for existing active budget
             existing_budget = Budget.query.filter(
-                Budget.user_id == current_user_id,
+                Budget.user_id == principal.id,
                 Budget.category_id == data["category_id"],
                 Budget.end_date > datetime.now(),
             ).first()
@@ -61,7 +63,7 @@ def budget():
                 return jsonify({"error": "Amount must be positive"}), 400
 
             # check category exists
-            category = TransactionCategory.query.get(data["category_id"])
+            category = get_category(data["category_id"])
             if not category:
                 return jsonify({"error": "Category not found"}), 404
 
@@ -73,7 +75,7 @@ def budget():
                 amount=amount,
                 remaining_amount=amount,
                 end_date=end_date,
-                user_id=current_user_id,
+                user_id=principal.id,
                 category_id=category.id,
             )
 
@@ -89,22 +91,20 @@ def budget():
             return jsonify({"error": str(e)}), 500
 
     # GET
-    budgets = Budget.query.filter_by(user_id=current_user_id)
-
-    return jsonify([budget.to_dict() for budget in budgets]), 200
+    return reads.respond(reads.budgets(principal.id))
 
 
 @budget_api.route("/budgets/<int:budget_id>", methods=["GET", "PUT"])
 @jwt_required()
 def budget_detail(budget_id):
-    current_user_id = get_jwt_identity()
+    principal = current_principal()
 
     budget = Budget.query.get(budget_id)
     if not budget:
         return jsonify({"error": "Budget ID not found"}), 404
 
     # check ownership
-    if str(budget.user_id) != current_user_id:
+    if not principal.owns(budget):
         return jsonify({"error": "Unauthorized access to budget"}), 403
 
     if request.method == "PUT":
@@ -134,14 +134,14 @@ def budget_detail(budget_id):
                     return jsonify({"error": "Duration must be a valid number"}), 400
 
             if "category_id" in data:
-                new_category = TransactionCategory.query.get(data["category_id"])
+                new_category = get_category(data["category_id"])
                 if not new_category:
                     return jsonify({"error": "Category not found"}), 404
 
                 if budget.category_id != new_category.id:
                     existing_budget = Budget.query.filter(
                         Budget.id != budget_id,
-                        Budget.user_id == current_user_id,
+                        Budget.user_id == principal.id,
                         Budget.category_id == new_category.id,
                         Budget.end_date > datetime.now(),
                     ).first()
@@ -0,0 +1,47 @@
+from flask import Blueprint, request, jsonify
+from app.blueprints.admin_api import admin_required
+from app.models.outbox_event import (
+    decode_event_cursor,
+    encode_event_cursor,
+    events_after,
+)
+
+events_api = Blueprint("events_api", __name__)
+
+DEFAULT_EVENTS_LIMIT = 100
+MAX_EVENTS_LIMIT = 1000
+
+
+@events_api.route("/events", methods=["GET"])
+@admin_required
+def events():
+    # the cursor points past the last event the consumer has seen
+    after = request.args.get("after")
+    try:
+        after = decode_event_cursor(after) if after else (0, 0)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    try:
+        limit = int(request.args.get("limit", DEFAULT_EVENTS_LIMIT))
+    except ValueError:
+        return jsonify({"error": "Limit must be a valid number"}), 400
+    if limit < 1 or limit > MAX_EVENTS_LIMIT:
+        return (
+            jsonify({"error": f"Limit must be between 1 and {MAX_EVENTS_LIMIT}"}),
+            400,
+        )
+
+    events = events_after(after, limit)
+    return (
+        jsonify(
+            {
+                "events": [event.to_dict() for event in events],
+                # unchanged when nothing new arrived, poll again with it
+                "next_cursor": encode_event_cursor(
+                    (events[-1].xid, events[-1].id) if events else after
+                ),
+            }
+        ),
+        200,
+    )
@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import abort, jsonify, request
+from sqlalchemy import select
+from app.database import run_statements
+from app.models.account import Account
+from app.models.balance_snapshot import BalanceSnapshot
+from app.models.bill import Bill
+from app.models.budget import Budget
+from app.models.principal import load_user
+from app.models.serializers import (
+    bill_row_to_dict,
+    bill_rows,
+    budget_row_to_dict,
+    budget_rows,
+    transaction_row_to_dict,
+    transaction_rows,
+)
+from app.models.transaction import Transaction
+from app.models.transaction_history import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    decode_cursor,
+    history_filters,
+    history_page_payload,
+    history_page_rows,
+)
+
+# GET views served by both the Flask blueprints and the ASGI entry point
+# (app/asgi.py). Each one is a generator over the current request: it yields
+# the statements it needs, is sent their rows, and returns ``(payload,
+# status, headers)``. respond() runs a view on db.session, asgi.py runs the
+# same view on an async session, so both modes share the queries and the
+# ownership checks.
+
+
+def respond(view):
+    payload, status, headers = run_statements(view)
+    return jsonify(payload), status, headers
+
+
+def parse_limit(value):
+    if value is None:
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ValueError("Limit must be a valid number")
+    if limit < 1 or limit > MAX_PAGE_SIZE:
+        raise ValueError(f"Limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(
+            "Invalid date format. Use YYYY-MM-DD format, example: 2025-04-15"
+        )
+
+
+def parse_history_args(args):
+    """Read the transaction history filters (type, category_id, from, to)."""
+    filters = {}
+
+    transaction_type = args.get("type")
+    if transaction_type:
+        if transaction_type not in Transaction.VALID_TYPES:
+            raise ValueError(
+                f"Invalid transaction type. Must be one of {Transaction.VALID_TYPES}"
+            )
+        filters["transaction_type"] = transaction_type
+
+    category_id = args.get("category_id")
+    if category_id:
+        try:
+            filters["category_id"] = int(category_id)
+        except ValueError:
+            raise ValueError("Category ID must be a valid number")
+
+    # date range, both ends inclusive
+    if args.get("from"):
+        filters["start"] = parse_date(args["from"])
+    if args.get("to"):
+        filters["end"] = parse_date(args["to"]) + timedelta(days=1)
+
+    return filters
+
+
+def profile(user_id):
+    user = yield from load_user(user_id)
+    if not user:
+        return {"error": "User not found"}, 404, {}
+    return user.to_dict(), 200, {}
+
+
+def transaction_history(user_id):
+    user = yield from load_user(user_id)
+    if not user:
+        return {"error": "User not found"}, 404, {}
+
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        cursor = request.args.get("cursor")
+        cursor = decode_cursor(cursor) if cursor else None
+        criteria = history_filters(**parse_history_args(request.args))
+    except ValueError as e:
+        return {"error": str(e)}, 400, {}
+
+    # one page of transactions made by current user-owned accs (both as sender and receiver)
+    rows = yield history_page_rows(
+        sorted(user.account_ids), criteria, cursor=cursor, limit=limit
+    )
+    transactions, next_cursor = history_page_payload(rows, limit)
+    return transactions, 200, {"X-Next-Cursor": next_cursor} if next_cursor else {}
+
+
+def transaction_details(user_id, transaction_id):
+    user = yield from load_user(user_id)
+    if not user:
+        return {"error": "User not found"}, 404, {}
+
+    # get transaction data based on the queried id
+    rows = yield transaction_rows().where(Transaction.id == transaction_id)
+    if not rows:
+        abort(404)
+    transaction = rows[0]
+
+    # only allow viewing for currently logged in user accounts
+    if not (
+        transaction.from_account_id in user.account_ids
+        or transaction.to_account_id in user.account_ids
+    ):
+        return {"error": "Unauthorized access to transaction details"}, 403, {}
+
+    return transaction_row_to_dict(transaction), 200, {}
+
+
+def account_balance(user_id, account_id):
+    rows = yield select(
+        Account.id, Account.account_number, Account.balance, Account.user_id
+    ).where(Account.id == account_id)
+    if not rows:
+        abort(404)
+    account = rows[0]
+
+    # only allows user-owned accounts
+    if account.user_id != user_id:
+        return {"error": "Unauthorized access"}, 403, {}
+
+    at = request.args.get("at")
+    if not at:
+        return (
+            {
+                "account_id": account.id,
+                "account_number": account.account_number,
+                "balance": account.balance,
+                "at": None,
+                "transaction_id": None,
+            },
+            200,
+            {},
+        )
+
+    try:
+        at = datetime.fromisoformat(at)
+    except ValueError:
+        return (
+            {
+                "error": "Invalid timestamp format. Use ISO 8601 format, example: 2025-04-15T08:30:00+07:00"
+            },
+            400,
+            {},
+        )
+
+    # accounts open with a zero balance, before the first snapshot it's 0
+    snapshots = yield BalanceSnapshot.latest_before(account.id, at)
+    return (
+        {
+            "account_id": account.id,
+            "account_number": account.account_number,
+            "balance": snapshots[0].balance_after if snapshots else Decimal("0.00"),
+            "at": at,
+            "transaction_id": snapshots[0].transaction_id if snapshots else None,
+        },
+        200,
+        {},
+    )
+
+
+def bills(user_id):
+    # sort from the nearest due
+    rows = (
+        yield bill_rows().where(Bill.user_id == user_id).order_by(Bill.due_date.asc())
+    )
+    return [bill_row_to_dict(row) for row in rows], 200, {}
+
+
+def budgets(user_id):
+    rows = yield budget_rows().where(Budget.user_id == user_id)
+    return [budget_row_to_dict(row) for row in rows], 200, {}
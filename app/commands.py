@@ -0,0 +1,241 @@
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from app.database import bootstrap_database, without_statement_timeout
+from app.models import db
+from app.models.budget_reconciliation import reconcile_budgets
+from app.models.idempotency_key import sweep_idempotency_keys
+from app.models.outbox_event import sweep_outbox_events
+from app.models.outbox_relay import DEFAULT_BATCH_SIZE as OUTBOX_BATCH_SIZE
+from app.models.outbox_relay import SINKS, make_sink, relay_outbox
+from app.models.bill_scheduler import DEFAULT_BATCH_SIZE, sweep_due_bills
+from app.models.transaction_partitions import (
+    DEFAULT_MONTHS_AHEAD,
+    archive_partitions,
+    detach_partitions,
+    ensure_partitions,
+)
+from app.models.user_import import (
+    DEFAULT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    import_users,
+    read_rows,
+)
+
+logger = logging.getLogger(__name__)
+
+# the outbox worker waits up to this many seconds between failed relays
+MAX_RELAY_BACKOFF = 60
+
+
+@with_appcontext
+def _lift_statement_timeout():
+    # DB_STATEMENT_TIMEOUT_MS is meant for requests, commands run for longer
+    without_statement_timeout(db.engine)
+
+
+def _group(name, help):
+    return AppGroup(name, help=help, callback=_lift_statement_timeout)
+
+
+bills_cli = _group("bills", "Bill scheduler commands.")
+users_cli = _group("users", "User management commands.")
+budgets_cli = _group("budgets", "Budget maintenance commands.")
+idempotency_cli = _group("idempotency", "Idempotency key maintenance commands.")
+outbox_cli = _group("outbox", "Outbox event relay commands.")
+transactions_cli = _group("transactions", "Transaction partition maintenance commands.")
+
+
+def _sink(ctx, param, value):
+    try:
+        return make_sink(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+sink_option = click.option(
+    "--sink",
+    envvar="OUTBOX_SINK",
+    required=True,
+    callback=_sink,
+    help=f"Where events go, <kind>:<path> with kind one of {list(SINKS)}.",
+)
+
+
+@bills_cli.command("sweep")
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True)
+@click.option("--max-batches", type=int, help="Stop after this many batches.")
+def sweep_bills(batch_size, max_batches):
+    """Auto-pay or mark overdue every pending bill that is due."""
+    summary = sweep_due_bills(batch_size=batch_size, max_batches=max_batches)
+    click.echo(json.dumps(summary))
+
+
+@bills_cli.command("worker")
+@click.option(
+    "--interval", default=60, show_default=True, help="Seconds between sweeps."
+)
+@click.option("--batch-size", default=DEFAULT_BATCH_SIZE, show_default=True)
+def bills_worker(interval, batch_size):
+    """Run the bill sweep forever, several workers can share the load."""
+    while True:
+        # a failed sweep is retried on the next tick, committed batches stay
+        try:
+            summary = sweep_due_bills(batch_size=batch_size)
+        except Exception:
+            db.session.rollback()
+            logger.exception("Bill sweep failed, retrying in %s seconds", interval)
+        else:
+            if summary["batches"]:
+                click.echo(json.dumps(summary))
+        time.sleep(interval)
+
+
+@users_cli.command("import")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(IMPORT_FORMATS),
+    help="Input format, guessed from the file extension by default.",
+)
+@click.option("--chunk-size", default=DEFAULT_CHUNK_SIZE, show_default=True)
+@click.option("--workers", type=int, help="Password hashing processes.")
+def import_users_command(source, fmt, chunk_size, workers):
+    """Create users and their main accounts from a CSV or NDJSON file."""
+    fmt = fmt or ("csv" if source.name.endswith(".csv") else "ndjson")
+    summary = import_users(read_rows(source, fmt), chunk_size, workers)
+    click.echo(json.dumps(summary))
+
+
+@budgets_cli.command("reconcile")
+@click.option("--fix", is_flag=True, help="Reset drifted remaining amounts.")
+@click.option("--active-only", is_flag=True, help="Skip budgets that have ended.")
+def reconcile_budgets_command(fix, active_only):
+    """Recompute remaining amounts from payments and report drift."""
+    summary = reconcile_budgets(fix=fix, active_only=active_only)
+    click.echo(json.dumps(summary, default=str))
+
+
+@idempotency_cli.command("sweep")
+@click.option("--batch-size", default=1000, show_default=True)
+def sweep_idempotency_keys_command(batch_size):
+    """Delete idempotency keys whose replay window has passed."""
+    deleted = sweep_idempotency_keys(batch_size=batch_size)
+    click.echo(json.dumps({"deleted": deleted}))
+
+
+@outbox_cli.command("relay")
+@sink_option
+@click.option("--batch-size", default=OUTBOX_BATCH_SIZE, show_default=True)
+@click.option("--max-batches", type=int, help="Stop after this many batches.")
+def relay_outbox_command(sink, batch_size, max_batches):
+    """Publish every unpublished outbox event to the sink."""
+    summary = relay_outbox(sink, batch_size=batch_size, max_batches=max_batches)
+    click.echo(json.dumps(summary))
+
+
+@outbox_cli.command("worker")
+@sink_option
+@click.option(
+    "--interval", default=1.0, show_default=True, help="Seconds between polls."
+)
+@click.option("--batch-size", default=OUTBOX_BATCH_SIZE, show_default=True)
+def outbox_worker(sink, interval, batch_size):
+    """Run the relay forever, several workers can share the load."""
+    delay = interval
+    while True:
+        # unpublished events stay queued, a failed batch is relayed again
+        try:
+            summary = relay_outbox(sink, batch_size=batch_size)
+        except Exception:
+            db.session.rollback()
+            delay = min(delay * 2, MAX_RELAY_BACKOFF)
+            logger.exception("Outbox relay failed, retrying in %s seconds", delay)
+        else:
+            delay = interval
+            if summary["batches"]:
+                click.echo(json.dumps(summary))
+        time.sleep(delay)
+
+
+@outbox_cli.command("sweep")
+@click.option(
+    "--older-than-days",
+    default=7,
+    show_default=True,
+    help="Keep published events this long for GET /api/events.",
+)
+@click.option("--batch-size", default=1000, show_default=True)
+def sweep_outbox_command(older_than_days, batch_size):
+    """Delete published outbox events past their retention."""
+    older_than = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    deleted = sweep_outbox_events(older_than, batch_size=batch_size)
+    click.echo(json.dumps({"deleted": deleted}))
+
+
+def _partition_command(action, *args):
+    try:
+        return action(*args)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+
+
+before_option = click.option(
+    "--before",
+    type=click.DateTime(formats=["%Y-%m"]),
+    required=True,
+    help="First month to keep, YYYY-MM.",
+)
+
+
+@transactions_cli.command("ensure-partitions")
+@click.option("--months-ahead", default=DEFAULT_MONTHS_AHEAD, show_default=True)
+def ensure_partitions_command(months_ahead):
+    """Create the coming monthly partitions, run it daily."""
+    summary = _partition_command(ensure_partitions, months_ahead)
+    click.echo(json.dumps(summary))
+
+
+@transactions_cli.command("detach")
+@before_option
+def detach_partitions_command(before):
+    """Detach the monthly partitions before a month, keeping their tables."""
+    detached = _partition_command(detach_partitions, before)
+    click.echo(json.dumps({"detached": detached}))
+
+
+@transactions_cli.command("archive")
+@before_option
+@click.option(
+    "--to",
+    "directory",
+    required=True,
+    type=click.Path(file_okay=False),
+    help="Directory for the <partition>.csv.gz files.",
+)
+def archive_partitions_command(before, directory):
+    """Write the monthly partitions before a month to files and drop them."""
+    archived = _partition_command(archive_partitions, before, directory)
+    click.echo(json.dumps({"archived": archived}))
+
+
+@click.command("bootstrap")
+def bootstrap_command():
+    """Create the database, its tables and the default categories."""
+    bootstrap_database(current_app)
+    click.echo("Database bootstrapped")
+
+
+def init_commands(app):
+    app.cli.add_command(bootstrap_command)
+    app.cli.add_command(bills_cli)
+    app.cli.add_command(users_cli)
+    app.cli.add_command(budgets_cli)
+    app.cli.add_command(idempotency_cli)
+    app.cli.add_command(outbox_cli)
+    app.cli.add_command(transactions_cli)
@@ -0,0 +1,336 @@
+import logging
+import os
+import threading
+import time
+from functools import wraps
+from os import environ
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.sql.dml import UpdateBase
+from app.metrics import pool_checkout_wait
+
+# Engine options come from the environment, the defaults suit a gunicorn
+# worker talking to PostgreSQL:
+#
+#   DB_POOL_SIZE             connections kept open per worker (5)
+#   DB_MAX_OVERFLOW          extra connections under load (10)
+#   DB_POOL_TIMEOUT          seconds to wait for a free connection (30)
+#   DB_POOL_RECYCLE          reconnect connections older than this (1800)
+#   DB_POOL_PRE_PING         test connections before use (true)
+#   DB_STATEMENT_TIMEOUT_MS  PostgreSQL statement_timeout, 0 disables (30000)
+#
+# The statement timeout guards request handlers. Migrations and the flask
+# maintenance commands lift it with without_statement_timeout.
+#
+# With REPLICA_DATABASE_URL set, reads made while serving GET and HEAD
+# requests go to the replica. Writes, flushes and SELECT ... FOR UPDATE
+# always use the primary, and so does every read by a client that wrote
+# something in the last REPLICA_STICKY_SECONDS, so it sees its own writes.
+
+_timeouts = 0
+_timeouts_lock = threading.Lock()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited."""
+
+    def _do_get(self):
+        global _timeouts
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutError:
+            with _timeouts_lock:
+                _timeouts += 1
+            raise
+        finally:
+            pool_checkout_wait.observe(time.perf_counter() - started)
+
+
+def engine_options(url):
+    if url.startswith("sqlite"):
+        # sqlite picks its own pool, none of these apply
+        return {}
+
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": float(environ.get("DB_POOL_TIMEOUT", 30)),
+        "pool_recycle": int(environ.get("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": environ.get("DB_POOL_PRE_PING", "true").lower() == "true",
+    }
+
+    statement_timeout = int(environ.get("DB_STATEMENT_TIMEOUT_MS", 30000))
+    if statement_timeout and url.startswith("postgresql"):
+        options["connect_args"] = {
+            "options": f"-c statement_timeout={statement_timeout}"
+        }
+    return options
+
+
+def without_statement_timeout(engine):
+    """Open the engine's connections from now on without a statement timeout."""
+    if engine.dialect.name != "postgresql":
+        return
+
+    @event.listens_for(engine, "do_connect")
+    def _no_statement_timeout(dialect, connection_record, cargs, cparams):
+        cparams["options"] = "-c statement_timeout=0"
+
+    # connections already in the pool were opened with the timeout
+    engine.dispose()
+
+
+def init_sqlite_transactions(app):
+    """Have pysqlite begin transactions itself, so SAVEPOINTs work.
+
+    pysqlite only sends BEGIN before an INSERT, UPDATE or DELETE. A SAVEPOINT
+    taken before that opens a transaction of its own, and releasing it
+    commits, so a rollback afterwards can't take back what the savepoint
+    held. This is the workaround from SQLAlchemy's SQLite documentation.
+    """
+    from app.models import db
+
+    with app.app_context():
+        engines = [e for e in db.engines.values() if e.dialect.driver == "pysqlite"]
+    for engine in engines:
+
+        @event.listens_for(engine, "connect")
+        def _no_implicit_begin(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, "begin")
+        def _begin(connection):
+            connection.exec_driver_sql("BEGIN")
+
+
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url):
+    """The same database, through the asyncio driver of its dialect."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver for {backend} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def async_engine_options(url):
+    # the same settings as engine_options, asyncio engines bring their own
+    # pool class and asyncpg takes server settings instead of libpq options
+    options = engine_options(url)
+    options.pop("poolclass", None)
+    if options.pop("connect_args", None):
+        statement_timeout = environ.get("DB_STATEMENT_TIMEOUT_MS", "30000")
+        options["connect_args"] = {
+            "server_settings": {"statement_timeout": statement_timeout}
+        }
+    return options
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return status
+
+    checked_out = pool.checkedout()
+    # the pool's max_overflow isn't public, -1 means unlimited
+    capacity = pool.size() + pool._max_overflow if pool._max_overflow >= 0 else None
+    status.update(
+        {
+            "size": pool.size(),
+            "max_overflow": pool._max_overflow,
+            "checked_in": pool.checkedin(),
+            "checked_out": checked_out,
+            "overflow": max(pool.overflow(), 0),
+            "saturation": round(checked_out / capacity, 3) if capacity else None,
+            "timeouts": _timeouts,
+        }
+    )
+    return status
+
+
+READ_METHODS = ("GET", "HEAD")
+
+
+class RecentWriters:
+    """Clients that wrote recently and must keep reading from the primary.
+
+    Kept per process, so a client whose next request lands on another
+    gunicorn worker can read from the replica inside the window.
+    """
+
+    def __init__(self, max_keys=10000):
+        self._until = {}
+        self._lock = threading.Lock()
+        self.max_keys = max_keys
+
+    def mark(self, key, seconds):
+        now = time.monotonic()
+        with self._lock:
+            self._until[key] = now + seconds
+            if len(self._until) > self.max_keys:
+                for stale in [k for k, until in self._until.items() if until <= now]:
+                    del self._until[stale]
+
+    def active(self, key):
+        return self._until.get(key, 0) > time.monotonic()
+
+
+recent_writers = RecentWriters()
+
+
+def _client_key():
+    try:
+        identity = get_jwt_identity()
+    except RuntimeError:
+        # view isn't behind jwt_required
+        identity = None
+    return f"user:{identity}" if identity else f"ip:{request.remote_addr}"
+
+
+def read_from_replica():
+    # decided once per request, on the first statement
+    if "db_route" not in g:
+        use_replica = (
+            "replica" in current_app.config.get("SQLALCHEMY_BINDS", {})
+            and request.method in READ_METHODS
+            and not recent_writers.active(_client_key())
+        )
+        g.db_route = "replica" if use_replica else "primary"
+    return g.db_route == "replica"
+
+
+class RoutingSession(Session):
+    """Session that sends a read-only request's queries to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (
+            bind is None
+            # flushes ask for a connection without a statement
+            and clause is not None
+            and not isinstance(clause, UpdateBase)
+            and getattr(clause, "_for_update_arg", None) is None
+            and has_request_context()
+            and read_from_replica()
+        ):
+            return self._db.engines["replica"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def use_primary(view):
+    """Serve the view from the primary even for GET requests."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_route = "primary"
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def _remember_writer(response):
+    if (
+        request.method not in READ_METHODS
+        and response.status_code < 400
+        and "replica" in current_app.config.get("SQLALCHEMY_BINDS", {})
+    ):
+        recent_writers.mark(_client_key(), current_app.config["REPLICA_STICKY_SECONDS"])
+    return response
+
+
+def init_replica(app, url):
+    """Register ``url`` as the replica bind, no-op when it's empty."""
+    app.config["REPLICA_STICKY_SECONDS"] = float(
+        environ.get("REPLICA_STICKY_SECONDS", 5)
+    )
+    if not url:
+        return
+    app.config["SQLALCHEMY_BINDS"] = {"replica": {"url": url, **engine_options(url)}}
+    app.after_request(_remember_writer)
+
+
+def run_statements(steps):
+    """Run a generator that yields statements and is sent their rows back.
+
+    Returns what the generator returns. app/asgi.py runs the same
+    generators on an async session.
+    """
+    from app.models import db
+
+    try:
+        stmt = next(steps)
+        while True:
+            stmt = steps.send(db.session.execute(stmt).all())
+    except StopIteration as done:
+        return done.value
+
+
+def bootstrap_database(app):
+    """Create the database if missing, its tables and the default categories.
+
+    New databases are stamped with the latest migration, so `flask db
+    upgrade` only applies the ones that come after. On PostgreSQL their
+    transactions table is partitioned as the migrations leave it. Databases
+    that already carry a migration stamp belong to the migrations, their
+    tables are left alone and the categories are only seeded at the latest
+    one.
+    """
+    # sqlalchemy_utils is slow to import and only needed here
+    from alembic.migration import MigrationContext
+    from sqlalchemy_utils import create_database, database_exists
+    from app.models import db
+    from app.models.seeders import seed_transaction_categories
+    from app.models.transaction_partitions import (
+        LAYOUT_LOCK,
+        PARENT,
+        partition_new_table,
+    )
+
+    url = app.config["SQLALCHEMY_DATABASE_URI"]
+    if not database_exists(url):
+        create_database(url)
+        logging.info("Database created successfully")
+    with app.app_context():
+        with db.engine.begin() as connection:
+            postgresql = connection.dialect.name == "postgresql"
+            if postgresql:
+                # workers booting together create the tables once
+                connection.execute(
+                    text("SELECT pg_advisory_xact_lock(:key)"), {"key": LAYOUT_LOCK}
+                )
+            migrations = _migrations(app)
+            current = MigrationContext.configure(connection).get_current_heads()
+            if current:
+                # create_all would run ahead of `flask db upgrade` and skip
+                # the backfills of the migrations it hasn't applied yet
+                if set(current) != set(migrations.get_heads()):
+                    logging.warning(
+                        "Database is at migration %s, run `flask db upgrade`",
+                        ", ".join(current),
+                    )
+                    return
+            else:
+                new = not inspect(connection).has_table(PARENT)
+                db.metadata.create_all(connection)
+                if new:
+                    if postgresql:
+                        partition_new_table(connection)
+                    MigrationContext.configure(connection).stamp(migrations, "heads")
+        seed_transaction_categories()  # add default categories
+        logging.info("Database tables created successfully")
+
+
+def _migrations(app):
+    from alembic.script import ScriptDirectory
+
+    directory = os.path.join(os.path.dirname(app.root_path), "migrations")
+    return ScriptDirectory(directory)
@@ -0,0 +1,64 @@
+from datetime import date, datetime
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, pip install orjson
+    orjson = None
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Flask's json module, plus native Decimal and ISO 8601 datetime output."""
+
+    # emit amounts as exact strings ("10.50") instead of numbers (10.5)
+    decimal_as_string = False
+
+    def encode_value(self, o):
+        if isinstance(o, Decimal):
+            return str(o) if self.decimal_as_string else float(o)
+        if isinstance(o, (datetime, date)):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", self.encode_value)
+        return super().dumps(obj, **kwargs)
+
+
+class OrjsonProvider(StdlibJSONProvider):
+    """Same output as StdlibJSONProvider, encoded by orjson."""
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.pop("indent", None):
+            option |= orjson.OPT_INDENT_2
+        kwargs.pop("separators", None)
+
+        # anything orjson has no option for goes through the stdlib
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.encode_value, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+
+PROVIDERS = {"stdlib": StdlibJSONProvider, "orjson": OrjsonProvider}
+
+
+def make_json_provider(app, name="auto", decimal_as_string=False):
+    if name == "auto":
+        name = "orjson" if orjson else "stdlib"
+    if name not in PROVIDERS:
+        raise ValueError(f"JSON_PROVIDER must be one of {['auto', *PROVIDERS]}")
+    if name == "orjson" and not orjson:
+        raise ValueError("JSON_PROVIDER is orjson but orjson is not installed")
+
+    provider = PROVIDERS[name](app)
+    provider.decimal_as_string = decimal_as_string
+    return provider
@@ -0,0 +1,210 @@
+import logging
+import random
+import threading
+import time
+from bisect import bisect_left
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Per-request wall time and SQL statistics, kept in process memory and
+# rendered in the Prometheus text format by /api/metrics. Every gunicorn
+# worker keeps its own numbers, Prometheus adds them up per instance.
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+POOL_WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+
+class Histogram:
+    def __init__(self, name, help, labels, buckets):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = {
+                    "buckets": [0] * (len(self.buckets) + 1),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = {key: dict(value) for key, value in self._series.items()}
+        for label_values, values in sorted(series.items()):
+            labels = ",".join(
+                f'{label}="{_escape(value)}"'
+                for label, value in zip(self.labels, label_values)
+            )
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), values["buckets"]):
+                cumulative += count
+                le = f'le="{bound}"'
+                lines.append(
+                    f"{self.name}_bucket{{{labels},{le}}} {cumulative}"
+                    if labels
+                    else f"{self.name}_bucket{{{le}}} {cumulative}"
+                )
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {values['sum']}")
+            lines.append(f"{self.name}_count{suffix} {values['count']}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Wall time of a request.",
+    ("method", "endpoint", "status"),
+    LATENCY_BUCKETS,
+)
+request_queries = Histogram(
+    "http_request_sql_queries",
+    "SQL statements executed by a request.",
+    ("method", "endpoint"),
+    QUERY_COUNT_BUCKETS,
+)
+request_sql_duration = Histogram(
+    "http_request_sql_duration_seconds",
+    "Time a request spent waiting on SQL statements.",
+    ("method", "endpoint"),
+    LATENCY_BUCKETS,
+)
+pool_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool.",
+    (),
+    POOL_WAIT_BUCKETS,
+)
+HISTOGRAMS = [
+    request_duration,
+    request_queries,
+    request_sql_duration,
+    pool_checkout_wait,
+]
+
+
+class SQLStats:
+    """SQL statements run while handling the current request."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = 0.0
+        self.slowest_statement = None
+
+    def record(self, statement, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed >= self.slowest:
+            self.slowest = elapsed
+            self.slowest_statement = statement
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    # one statement runs on a connection at a time; a failed one never gets
+    # to after_cursor_execute and is overwritten by the next
+    conn.info["query_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - conn.info.pop("query_started")
+    if has_request_context() and "sql_stats" in g:
+        g.sql_stats.record(statement, elapsed)
+
+
+def _endpoint():
+    # the route pattern keeps label cardinality bounded
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _start_request():
+    g.request_started = time.perf_counter()
+    g.sql_stats = SQLStats()
+
+
+def _finish_request(response):
+    started = g.pop("request_started", None)
+    stats = g.pop("sql_stats", None)
+    if started is None or stats is None:
+        return response
+
+    elapsed = time.perf_counter() - started
+    endpoint = _endpoint()
+    request_duration.observe(elapsed, request.method, endpoint, response.status_code)
+    request_queries.observe(stats.count, request.method, endpoint)
+    request_sql_duration.observe(stats.total, request.method, endpoint)
+
+    config = current_app.config
+    if elapsed * 1000 >= config["SLOW_REQUEST_THRESHOLD_MS"] and (
+        random.random() < config["SLOW_REQUEST_SAMPLE_RATE"]
+    ):
+        logger.warning(
+            "slow request %s %s status=%s wall_ms=%.1f sql_count=%d sql_ms=%.1f "
+            "slowest_sql_ms=%.1f slowest_sql=%r",
+            request.method,
+            request.path,
+            response.status_code,
+            elapsed * 1000,
+            stats.count,
+            stats.total * 1000,
+            stats.slowest * 1000,
+            (stats.slowest_statement or "")[:500],
+        )
+    return response
+
+
+def render_metrics():
+    from app.database import pool_status
+    from app.models import db
+    from app.models.principal import principal_cache_stats
+    from app.models.reference_cache import cache_stats
+
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+
+    for prefix, stats in (
+        ("reference_cache", cache_stats()),
+        ("principal_cache", principal_cache_stats()),
+    ):
+        for key in ("hits", "misses", "invalidations"):
+            name = f"{prefix}_{key}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {stats[key]}")
+        lines.append(f"# TYPE {prefix}_entries gauge")
+        lines.append(f"{prefix}_entries {stats['entries']}")
+
+    status = pool_status(db.engine)
+    for key in ("size", "checked_out", "overflow", "saturation"):
+        if status.get(key) is not None:
+            lines.append(f"# TYPE db_pool_{key} gauge")
+            lines.append(f"db_pool_{key} {status[key]}")
+    if "timeouts" in status:
+        lines.append("# TYPE db_pool_timeouts_total counter")
+        lines.append(f"db_pool_timeouts_total {status['timeouts']}")
+    return "\n".join(lines) + "\n"
+
+
+def init_metrics(app):
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -1,6 +1,7 @@
 from flask_sqlalchemy import SQLAlchemy
+from app.database import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 
 from .user import User
 from .account import Account
@@ -8,6 +9,10 @@ from .transaction import Transaction
 from .transaction_category import TransactionCategory
 from .budget import Budget
 from .bill import Bill
+from .balance_snapshot import BalanceSnapshot
+from .spending_rollup import SpendingRollup
+from .idempotency_key import IdempotencyKey
+from .outbox_event import OutboxEvent
 
 __all__ = [
     "db",
@@ -17,4 +22,8 @@ __all__ = [
     "TransactionCategory",
     "Budget",
     "Bill",
+    "BalanceSnapshot",
+    "SpendingRollup",
+    "IdempotencyKey",
+    "OutboxEvent",
 ]
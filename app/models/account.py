@@ -1,6 +1,6 @@
 from sqlalchemy.sql import func
-import random
 from app.models import db
+from app.models.account_numbers import next_account_number
 
 
 class Account(db.Model):
@@ -30,16 +30,13 @@ class Account(db.Model):
             "id": self.id,
             "account_number": self.account_number,
             "account_type": self.account_type,
-            "balance": float(self.balance),
+            "balance": self.balance,
             "user_id": self.user_id,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
             "is_main": self.is_main,
         }
 
     @staticmethod
     def generate_unique_account_number():
-        while True:
-            account_number = str(random.randint(1000000000000000, 9999999999999999))
-            if not Account.query.filter_by(account_number=account_number).first():
-                return account_number
+        return next_account_number()
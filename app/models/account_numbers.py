@@ -0,0 +1,103 @@
+import os
+import random
+import threading
+from sqlalchemy import Sequence, select
+from sqlalchemy.exc import IntegrityError
+from app.models import db
+
+# Account numbers are 15 digits from a counter plus a Luhn check digit.
+# On PostgreSQL every process reserves a block of BLOCK_SIZE numbers with a
+# single nextval() and hands them out from memory, so creating an account
+# needs no lookup query and concurrent workers never share a number.
+
+BLOCK_SIZE = 100
+FIRST_NUMBER = 10**14
+MAX_ATTEMPTS = 3
+
+account_number_seq = Sequence(
+    "account_number_seq",
+    start=FIRST_NUMBER,
+    increment=BLOCK_SIZE,
+    metadata=db.metadata,
+)
+
+
+def luhn_check_digit(body):
+    total = 0
+    # double every second digit counting from the right of the full number,
+    # the check digit itself sits in the rightmost spot
+    for i, digit in enumerate(reversed(body)):
+        value = int(digit)
+        if i % 2 == 0:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_account_number(number):
+    number = str(number)
+    return (
+        len(number) == 16
+        and number.isdigit()
+        and luhn_check_digit(number[:-1]) == number[-1]
+    )
+
+
+class _Block:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.next = self.end = 0
+
+
+_block = _Block()
+
+# a forked worker must not hand out numbers from its parent's block
+os.register_at_fork(after_in_child=_block.reset)
+
+
+def _next_body():
+    if not db.engine.dialect.supports_sequences:
+        # no sequences (sqlite), the unique constraint and the retry in
+        # commit_with_new_account_numbers catch the rare collision
+        return random.randint(FIRST_NUMBER, 10**15 - 1)
+
+    with _block.lock:
+        if _block.next >= _block.end:
+            start = db.session.scalar(select(account_number_seq.next_value()))
+            _block.next, _block.end = start, start + BLOCK_SIZE
+        body = _block.next
+        _block.next += 1
+    return body
+
+
+def next_account_number():
+    body = str(_next_body())
+    return body + luhn_check_digit(body)
+
+
+def is_account_number_conflict(error):
+    return "account_number" in str(error.orig)
+
+
+def commit_with_new_account_numbers(build, attempts=MAX_ATTEMPTS):
+    """Call ``build`` to add new rows to the session and commit them.
+
+    Numbers handed out before the sequence existed were random, so a new
+    number can still hit an old one. On that conflict the session is rolled
+    back and ``build`` runs again with fresh numbers. Any other integrity
+    error is raised after the rollback.
+    """
+    for attempt in range(attempts):
+        result = build()
+        try:
+            db.session.commit()
+            return result
+        except IntegrityError as e:
+            db.session.rollback()
+            if attempt == attempts - 1 or not is_account_number_conflict(e):
+                raise
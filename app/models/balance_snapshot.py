@@ -0,0 +1,79 @@
+from sqlalchemy import DateTime, select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app.models import db
+from app.models.transaction_history import stored_time
+
+
+class clock_now(FunctionElement):
+    """The time of the statement, not of the transaction it runs in."""
+
+    type = DateTime(timezone=True)
+    inherit_cache = True
+
+
+@compiles(clock_now)
+def _compile_clock_now(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(clock_now, "postgresql")
+def _compile_clock_now_postgresql(element, compiler, **kw):
+    # now() is when the transaction began, possibly before it waited for the
+    # account row; snapshots are inserted after the ledger update holding it,
+    # so their times follow the order the balances were written in
+    return "clock_timestamp()"
+
+
+class BalanceSnapshot(db.Model):
+    __tablename__ = "balance_snapshots"
+    __table_args__ = (
+        # point-in-time balance lookups
+        db.Index(
+            "ix_balance_snapshots_account_id_created_at",
+            "account_id",
+            "created_at",
+            "id",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    balance_after = db.Column(db.Numeric(10, 2), nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=clock_now())
+
+    # FK
+    account_id = db.Column(db.Integer, db.ForeignKey("accounts.id"), nullable=False)
+    # no foreign key, transaction ids aren't unique across the partitions of
+    # transactions, and archived months take their transactions with them
+    transaction_id = db.Column(db.Integer, nullable=False)
+
+    # relationships
+    transaction = db.relationship(
+        "Transaction",
+        primaryjoin="foreign(BalanceSnapshot.transaction_id) == Transaction.id",
+        backref="balance_snapshots",
+    )
+
+    def __repr__(self):
+        return f"<BalanceSnapshot {self.account_id}: Rp. {self.balance_after}>"
+
+    def to_dict(self):
+        return {
+            "account_id": self.account_id,
+            "transaction_id": self.transaction_id,
+            "balance": self.balance_after,
+            "created_at": self.created_at,
+        }
+
+    @staticmethod
+    def latest_before(account_id, at):
+        """Select the newest snapshot of the account taken at or before ``at``."""
+        return (
+            select(BalanceSnapshot.balance_after, BalanceSnapshot.transaction_id)
+            .where(
+                BalanceSnapshot.account_id == account_id,
+                BalanceSnapshot.created_at <= stored_time(at),
+            )
+            .order_by(BalanceSnapshot.created_at.desc(), BalanceSnapshot.id.desc())
+            .limit(1)
+        )
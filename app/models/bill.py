@@ -4,6 +4,12 @@ from app.models import db
 
 class Bill(db.Model):
     __tablename__ = "bills"
+    __table_args__ = (
+        # due bill sweeps of the scheduler
+        db.Index("ix_bills_status_due_date", "status", "due_date"),
+        # auto pay retries of overdue bills
+        db.Index("ix_bills_status_next_attempt_at", "status", "next_attempt_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     biller_name = db.Column(db.String(255), nullable=False)
@@ -12,6 +18,10 @@ class Bill(db.Model):
     created_at = db.Column(db.DateTime(timezone=True), default=func.now())
     updated_at = db.Column(db.DateTime(timezone=True), onupdate=func.now())
     status = db.Column(db.String(20), default="pending")
+    auto_pay = db.Column(db.Boolean, default=False, nullable=False)
+    # failed auto payments so far, and when the scheduler tries again
+    auto_pay_attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime(timezone=True))
 
     # FK
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -25,7 +35,8 @@ class Bill(db.Model):
     account = db.relationship("Account", backref="bills")
     category = db.relationship("TransactionCategory", backref="bills")
 
-    VALID_STATUSES = ["pending", "paid", "cancelled"]
+    VALID_STATUSES = ["pending", "paid", "cancelled", "overdue"]
+    PAYABLE_STATUSES = ["pending", "overdue"]
 
     def __repr__(self):
         return f"<Bill {self.biller_name}>"
@@ -34,12 +45,13 @@ class Bill(db.Model):
         return {
             "id": self.id,
             "biller_name": self.biller_name,
-            "due_date": self.due_date.isoformat(),
-            "amount": float(self.amount),
+            "due_date": self.due_date,
+            "amount": self.amount,
             "status": self.status,
+            "auto_pay": self.auto_pay,
             "account_id": self.account_id,
             "account": self.account.account_number,
             "category": self.category.name,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
         }
@@ -0,0 +1,90 @@
+from datetime import datetime, timedelta
+from sqlalchemy import and_, or_
+from app.models import db
+from app.models.bill import Bill
+from app.models.transaction import Transaction
+from app.models.transaction_service import TransactionError, process_transaction
+
+DEFAULT_BATCH_SIZE = 100
+# a failed auto payment is tried again after 1, 2, 4 and 8 hours, then the
+# bill stays overdue until the user pays it
+MAX_AUTO_PAY_ATTEMPTS = 5
+AUTO_PAY_RETRY_DELAY = timedelta(hours=1)
+
+
+def _due_bills(now, batch_size):
+    # rows locked by another worker are skipped, so sweeps can run in parallel
+    return (
+        Bill.query.filter(
+            or_(
+                and_(Bill.status == "pending", Bill.due_date <= now),
+                and_(
+                    Bill.status == "overdue",
+                    Bill.auto_pay.is_(True),
+                    Bill.next_attempt_at <= now,
+                ),
+            )
+        )
+        .order_by(Bill.due_date.asc(), Bill.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def sweep_due_bills(now=None, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """Pay or mark overdue every pending bill due at ``now``.
+
+    Bills with auto pay are paid through the same validation as a
+    ``bill_payment`` request, the rest (and auto pay bills that can't be paid)
+    become overdue. Overdue auto pay bills are tried again once their
+    ``next_attempt_at`` comes, up to MAX_AUTO_PAY_ATTEMPTS times in all. Each
+    batch is committed on its own. A bill that isn't paid is only picked up
+    again at a later ``now``, so running the sweep again for the same ``now``
+    does nothing.
+    """
+    now = now or datetime.now()
+    summary = {"paid": [], "overdue": [], "batches": 0}
+
+    while max_batches is None or summary["batches"] < max_batches:
+        bills = _due_bills(now, batch_size)
+        if not bills:
+            break
+
+        for bill in bills:
+            if bill.auto_pay:
+                savepoint = db.session.begin_nested()
+                try:
+                    process_transaction(
+                        {
+                            "account_id": bill.account_id,
+                            "transaction_type": Transaction.BILL_PAYMENT,
+                            "bill_id": bill.id,
+                        },
+                        str(bill.user_id),
+                    )
+                    savepoint.commit()
+                    summary["paid"].append(bill.id)
+                    continue
+                except TransactionError as e:
+                    savepoint.rollback()
+                    summary["overdue"].append({"id": bill.id, "reason": str(e)})
+                _schedule_retry(bill, now)
+            else:
+                summary["overdue"].append({"id": bill.id, "reason": "Bill is due"})
+
+            bill.status = "overdue"
+
+        db.session.commit()
+        summary["batches"] += 1
+
+    return summary
+
+
+def _schedule_retry(bill, now):
+    bill.auto_pay_attempts += 1
+    if bill.auto_pay_attempts < MAX_AUTO_PAY_ATTEMPTS:
+        delay = AUTO_PAY_RETRY_DELAY * 2 ** (bill.auto_pay_attempts - 1)
+        bill.next_attempt_at = now + delay
+    else:
+        bill.next_attempt_at = None
@@ -4,6 +4,15 @@ from app.models import db
 
 class Budget(db.Model):
     __tablename__ = "budgets"
+    __table_args__ = (
+        # active budget lookup when a payment is charged
+        db.Index(
+            "ix_budgets_user_id_category_id_end_date",
+            "user_id",
+            "category_id",
+            "end_date",
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255), nullable=False)
@@ -32,9 +41,9 @@ class Budget(db.Model):
         return {
             "id": self.id,
             "name": self.name,
-            "amount": float(self.amount),
-            "remaining_amount": float(self.remaining_amount),
-            "start_date": self.start_date.isoformat(),
-            "end_date": self.end_date.isoformat(),
+            "amount": self.amount,
+            "remaining_amount": self.remaining_amount,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
             "category": self.category.name,
         }
@@ -0,0 +1,86 @@
+from sqlalchemy import func, select, update
+from app.models import db
+from app.models.account import Account
+from app.models.budget import Budget
+from app.models.outbox_event import record_event
+from app.models.transaction import Transaction
+
+
+def _spent():
+    # payments in the budget's category and window, from the owner's accounts
+    return (
+        select(func.coalesce(func.sum(Transaction.amount), 0))
+        .join(Account, Transaction.from_account_id == Account.id)
+        .where(
+            Account.user_id == Budget.user_id,
+            Transaction.category_id == Budget.category_id,
+            Transaction.transaction_type == Transaction.PAYMENT,
+            Transaction.created_at >= Budget.start_date,
+            Transaction.created_at <= Budget.end_date,
+        )
+        .correlate(Budget)
+        .scalar_subquery()
+    )
+
+
+def reconcile_budgets(fix=False, active_only=False):
+    """Compare every budget's remaining amount with its actual payments.
+
+    The expected remaining amount is the budget amount minus the payments
+    made in its window. Returns the budgets that drifted, with ``fix`` their
+    remaining amount is reset to the expected one in a single UPDATE.
+    """
+    expected = Budget.amount - _spent()
+    criteria = [Budget.remaining_amount != expected]
+    if active_only:
+        criteria.append(Budget.end_date >= func.now())
+
+    drifted = [
+        {
+            "budget_id": row.id,
+            "user_id": row.user_id,
+            "remaining_amount": row.remaining_amount,
+            "expected": row.expected,
+            "drift": row.remaining_amount - row.expected,
+        }
+        for row in db.session.execute(
+            select(
+                Budget.id,
+                Budget.user_id,
+                Budget.remaining_amount,
+                expected.label("expected"),
+            )
+            .where(*criteria)
+            .order_by(Budget.id)
+        )
+    ]
+
+    if fix and drifted:
+        fixed = db.session.execute(
+            update(Budget)
+            .where(Budget.id.in_([row["budget_id"] for row in drifted]))
+            .values(remaining_amount=expected)
+            .returning(Budget.id, Budget.remaining_amount),
+            execution_options={"synchronize_session": False},
+        )
+        # a Core UPDATE, the outbox doesn't see it on its own
+        for row in fixed.all():
+            record_event(
+                "budget",
+                row.id,
+                "updated",
+                {
+                    "id": row.id,
+                    "remaining_amount": row.remaining_amount,
+                    "changed": ["remaining_amount"],
+                },
+            )
+        db.session.commit()
+
+    return {
+        "checked": db.session.scalar(
+            select(func.count(Budget.id)).where(*criteria[1:])
+        ),
+        "drifted": drifted,
+        "fixed": fix and bool(drifted),
+    }
@@ -0,0 +1,132 @@
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import func
+from app.models import db
+
+# A client sends the same Idempotency-Key header on every retry of one
+# request. The key row is inserted in the same transaction as the work it
+# guards and holds the response once that commits, so a retry replays the
+# stored response instead of running again. A duplicate arriving while the
+# first request is still running waits on the unique index and then replays
+# the winner's response. Failed requests roll the key back with everything
+# else, so they can be retried with the same key.
+
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class IdempotencyKey(db.Model):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+        # ttl sweep
+        db.Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(MAX_KEY_LENGTH), nullable=False)
+    request_hash = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer)
+    response_body = db.Column(db.Text)
+    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    expires_at = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    # FK
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+    def __repr__(self):
+        return f"<IdempotencyKey {self.key}>"
+
+    @property
+    def expired(self):
+        expires_at = self.expires_at
+        if expires_at.tzinfo is None:
+            # sqlite hands timestamps back without a timezone
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        return expires_at <= datetime.now(timezone.utc)
+
+
+def request_hash(method, path, payload):
+    raw = json.dumps([method, path, payload], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _find(user_id, key):
+    return db.session.execute(
+        select(IdempotencyKey).where(
+            IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+        )
+    ).scalar()
+
+
+def _check(record, fingerprint):
+    if record.request_hash != fingerprint:
+        raise IdempotencyError(
+            "Idempotency key was already used for a different request", 422
+        )
+    return record
+
+
+def claim_idempotency_key(user_id, key, fingerprint, ttl):
+    """Return the stored record for a repeated key, or claim the key.
+
+    A stored record has ``status_code`` set and should be replayed. A fresh
+    claim has no response yet, ``complete_idempotency_key`` fills it in
+    before the caller commits.
+    """
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise IdempotencyError(
+            f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters"
+        )
+
+    record = _find(user_id, key)
+    if record is not None:
+        if not record.expired:
+            return _check(record, fingerprint)
+        db.session.delete(record)
+
+    record = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=fingerprint,
+        expires_at=datetime.now(timezone.utc) + timedelta(seconds=ttl),
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(record)
+    except IntegrityError:
+        # a concurrent request with this key committed first
+        db.session.rollback()
+        record = _find(user_id, key)
+        if record is None:
+            raise IdempotencyError("Request with this key is in progress", 409)
+        return _check(record, fingerprint)
+    return record
+
+
+def complete_idempotency_key(record, body, status_code):
+    record.response_body = body
+    record.status_code = status_code
+
+
+def sweep_idempotency_keys(batch_size=1000):
+    """Delete expired keys a batch at a time, return how many went."""
+    deleted = 0
+    while True:
+        ids = select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= func.now())
+        result = db.session.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.id.in_(ids.limit(batch_size))),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,161 @@
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from app.models import db
+from app.models.account import Account
+from app.models.bill import Bill
+from app.models.budget import Budget
+from app.models.outbox_event import record_event
+
+# Balance changes are single conditional UPDATE ... RETURNING statements, the
+# funds check and the write happen under the same row lock so concurrent
+# workers can never both spend the same money.
+
+
+class LedgerError(Exception):
+    pass
+
+
+class InsufficientFundsError(LedgerError):
+    def __init__(self, account_id):
+        super().__init__("Insufficient funds")
+        self.account_id = account_id
+
+
+class BillNotPayableError(LedgerError):
+    def __init__(self, bill_id):
+        super().__init__("Bill is no longer payable")
+        self.bill_id = bill_id
+
+
+class BudgetExceededError(LedgerError):
+    def __init__(self, budget):
+        super().__init__("Payment exceeds remaining budget.")
+        self.budget = budget
+
+
+def _sync(model, pk, row):
+    # keep an already loaded instance in step with the row we just wrote
+    instance = db.session.identity_map.get(identity_key(model, pk))
+    if instance is not None:
+        for key, value in row._mapping.items():
+            set_committed_value(instance, key, value)
+
+
+def _update_balance(account_id, new_balance, *criteria):
+    row = db.session.execute(
+        update(Account)
+        .where(Account.id == account_id, *criteria)
+        .values(balance=new_balance)
+        .returning(Account.balance, Account.updated_at),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is not None:
+        _sync(Account, account_id, row)
+    return row
+
+
+def debit(account_id, amount):
+    """Take ``amount`` from the account, return the new balance."""
+    row = _update_balance(
+        account_id, Account.balance - amount, Account.balance >= amount
+    )
+    if row is None:
+        raise InsufficientFundsError(account_id)
+    return row.balance
+
+
+def credit(account_id, amount):
+    """Add ``amount`` to the account, return the new balance."""
+    row = _update_balance(account_id, Account.balance + amount)
+    if row is None:
+        raise LedgerError("Account is not found")
+    return row.balance
+
+
+def lock_accounts(*account_ids):
+    # always lock in id order, so two opposite transfers can't deadlock
+    db.session.execute(
+        select(Account.id)
+        .where(Account.id.in_(account_ids))
+        .order_by(Account.id)
+        .with_for_update()
+    )
+
+
+def transfer(from_account_id, to_account_id, amount):
+    """Move ``amount`` between accounts, return both new balances."""
+    lock_accounts(from_account_id, to_account_id)
+    return debit(from_account_id, amount), credit(to_account_id, amount)
+
+
+def settle_bill(bill_id):
+    """Mark an unpaid bill as paid, fails if someone else got there first."""
+    row = db.session.execute(
+        update(Bill)
+        .where(Bill.id == bill_id, Bill.status.in_(Bill.PAYABLE_STATUSES))
+        .values(status="paid")
+        .returning(Bill.status, Bill.updated_at),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is None:
+        raise BillNotPayableError(bill_id)
+    _sync(Bill, bill_id, row)
+    record_event(
+        "bill",
+        bill_id,
+        "updated",
+        {"id": bill_id, "status": "paid", "changed": ["status"]},
+    )
+
+
+def _active_budget_id(user_id, category_id):
+    now = datetime.now()
+    return (
+        select(Budget.id)
+        .where(
+            Budget.user_id == user_id,
+            Budget.category_id == category_id,
+            Budget.start_date <= now,
+            Budget.end_date >= now,
+        )
+        .order_by(Budget.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def consume_budget(user_id, category_id, amount):
+    """Take ``amount`` from the active budget of the category, if there is one.
+
+    Returns the budget's new remaining amount, or None without an active
+    budget. Raises BudgetExceededError if the budget can't cover it.
+    """
+    budget_id = _active_budget_id(user_id, category_id)
+    row = db.session.execute(
+        update(Budget)
+        .where(Budget.id == budget_id, Budget.remaining_amount >= amount)
+        .values(remaining_amount=Budget.remaining_amount - amount)
+        .returning(Budget.id, Budget.remaining_amount),
+        execution_options={"synchronize_session": False},
+    ).first()
+    if row is not None:
+        _sync(Budget, row.id, row)
+        record_event(
+            "budget",
+            row.id,
+            "updated",
+            {
+                "id": row.id,
+                "remaining_amount": row.remaining_amount,
+                "changed": ["remaining_amount"],
+            },
+        )
+        return row.remaining_amount
+
+    # nothing was updated, either there's no budget or it ran out
+    budget = db.session.execute(select(Budget).where(Budget.id == budget_id)).scalar()
+    if budget is not None:
+        raise BudgetExceededError(budget)
+    return None
@@ -0,0 +1,237 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from sqlalchemy import BigInteger, delete, event, insert, inspect, select, text, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from app.database import RoutingSession
+from app.models import db
+from app.models.bill import Bill
+from app.models.budget import Budget
+from app.models.transaction import Transaction
+
+# Transactional outbox. Every flush that inserts, updates or deletes a
+# transaction, bill or budget writes one compact event row per change in the
+# same database transaction, so an event exists exactly when its change was
+# committed. Writes that bypass the ORM record their events explicitly with
+# record_event. The relay (outbox_relay.py) publishes unpublished events,
+# consumers can also tail GET /api/events with a cursor, see events_after.
+
+CENTS = Decimal("0.01")
+
+# aggregate name and the columns copied into the payload; server generated
+# columns are left out, reading them would cost a query inside the flush
+TRACKED = {
+    Transaction: (
+        "transaction",
+        (
+            "id",
+            "transaction_type",
+            "amount",
+            "description",
+            "from_account_id",
+            "to_account_id",
+            "category_id",
+        ),
+    ),
+    Bill: (
+        "bill",
+        (
+            "id",
+            "user_id",
+            "account_id",
+            "category_id",
+            "biller_name",
+            "amount",
+            "due_date",
+            "status",
+            "auto_pay",
+        ),
+    ),
+    Budget: (
+        "budget",
+        (
+            "id",
+            "user_id",
+            "category_id",
+            "name",
+            "amount",
+            "remaining_amount",
+            "end_date",
+        ),
+    ),
+}
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+class current_xid(FunctionElement):
+    """Id of the writing top-level transaction, 0 where writes are serial."""
+
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(current_xid)
+def _compile_current_xid(element, compiler, **kw):
+    return "0"
+
+
+@compiles(current_xid, "postgresql")
+def _compile_current_xid_postgresql(element, compiler, **kw):
+    # the top-level xid, savepoints included
+    return "pg_current_xact_id()::text::bigint"
+
+
+class OutboxEvent(db.Model):
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # the relay's queue, published rows drop out of it
+        db.Index(
+            "ix_outbox_events_unpublished",
+            "id",
+            postgresql_where=db.text("published_at IS NULL"),
+            sqlite_where=db.text("published_at IS NULL"),
+        ),
+        # GET /api/events reads in (xid, id) order
+        db.Index("ix_outbox_events_xid_id", "xid", "id"),
+    )
+
+    id = db.Column(db.BigInteger().with_variant(db.Integer, "sqlite"), primary_key=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    aggregate_type = db.Column(db.String(20), nullable=False)
+    aggregate_id = db.Column(db.Integer, nullable=False)
+    payload = db.Column(db.JSON, nullable=False)
+    xid = db.Column(
+        db.BigInteger, default=current_xid(), server_default="0", nullable=False
+    )
+    created_at = db.Column(db.DateTime(timezone=True), default=_now, nullable=False)
+    published_at = db.Column(db.DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<OutboxEvent {self.id}: {self.event_type}>"
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "event_type": self.event_type,
+            "aggregate_type": self.aggregate_type,
+            "aggregate_id": self.aggregate_id,
+            "payload": self.payload,
+            "created_at": self.created_at,
+        }
+
+
+def _jsonable(value):
+    if isinstance(value, Decimal):
+        # every amount is Numeric(10, 2), as loaded from the database
+        return str(value.quantize(CENTS))
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _event_row(aggregate_type, aggregate_id, action, payload):
+    return {
+        "event_type": f"{aggregate_type}.{action}",
+        "aggregate_type": aggregate_type,
+        "aggregate_id": aggregate_id,
+        "payload": {key: _jsonable(value) for key, value in payload.items()},
+    }
+
+
+def record_event(aggregate_type, aggregate_id, action, payload):
+    """Add an event for a change made without the ORM, e.g. a Core UPDATE."""
+    db.session.add(
+        OutboxEvent(**_event_row(aggregate_type, aggregate_id, action, payload))
+    )
+
+
+def _capture(instance, action):
+    aggregate_type, fields = TRACKED[type(instance)]
+    state = inspect(instance)
+    # the instance dict never triggers a load, expired columns are skipped
+    payload = {key: state.dict[key] for key in fields if key in state.dict}
+    if action == "updated":
+        changed = [
+            key
+            for key in fields
+            if key in state.attrs and state.attrs[key].history.has_changes()
+        ]
+        if not changed:
+            return None
+        payload["changed"] = changed
+    # identity keys are only assigned once the flush is over
+    return _event_row(aggregate_type, state.dict["id"], action, payload)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _write_events(session, flush_context):
+    # new/dirty/deleted still describe what this flush just wrote
+    rows = []
+    for instances, action in (
+        (session.new, "created"),
+        (session.dirty, "updated"),
+        (session.deleted, "deleted"),
+    ):
+        for instance in instances:
+            if type(instance) in TRACKED:
+                row = _capture(instance, action)
+                if row:
+                    rows.append(row)
+    if rows:
+        session.connection().execute(insert(OutboxEvent), rows)
+
+
+def encode_event_cursor(position):
+    # "<xid>.<id>" of the last event served
+    return "%d.%d" % position
+
+
+def decode_event_cursor(token):
+    try:
+        xid, event_id = token.split(".")
+        return int(xid), int(event_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+
+def events_after(after, limit):
+    """Events past the ``(xid, id)`` cursor ``after``, oldest first.
+
+    Ids are handed out at insert time but become visible at commit, so a
+    transaction still running can commit an id lower than one already
+    served. On PostgreSQL events are read in the order of the transaction
+    that wrote them, and only from transactions older than every one still
+    running: nothing can commit behind the cursor anymore. A long running
+    transaction holds the feed back until it ends. Other databases
+    serialize their writers, the xid is always 0 there and ids commit in
+    order.
+    """
+    query = select(OutboxEvent).where(tuple_(OutboxEvent.xid, OutboxEvent.id) > after)
+    if db.session.get_bind().dialect.name == "postgresql":
+        query = query.where(
+            OutboxEvent.xid
+            < text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+        )
+    return (
+        db.session.execute(query.order_by(OutboxEvent.xid, OutboxEvent.id).limit(limit))
+        .scalars()
+        .all()
+    )
+
+
+def sweep_outbox_events(older_than, batch_size=1000):
+    """Delete events published before ``older_than``, return how many went."""
+    deleted = 0
+    while True:
+        ids = select(OutboxEvent.id).where(OutboxEvent.published_at < older_than)
+        result = db.session.execute(
+            delete(OutboxEvent).where(OutboxEvent.id.in_(ids.limit(batch_size))),
+            execution_options={"synchronize_session": False},
+        )
+        db.session.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from sqlalchemy import select, update
+from app.models import db
+from app.models.outbox_event import OutboxEvent
+
+# The relay moves unpublished outbox events to a sink a batch at a time.
+# A batch is marked published in the transaction that locked it, after the
+# sink accepted it, so delivery is at least once: a relay that dies between
+# the two sends the batch again. Consumers dedupe on the event id. Rows
+# locked by another relay are skipped, several relays can run side by side
+# on PostgreSQL but then batches may reach the sink out of id order. SQLite
+# has no SKIP LOCKED, run a single relay there.
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _lines(events):
+    return "".join(json.dumps(event, default=_encode) + "\n" for event in events)
+
+
+class NdjsonSink:
+    """Append events to a newline-delimited JSON file."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def publish(self, events):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_lines(events))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+class SpoolSink:
+    """Local stand-in for a message queue, one NDJSON file per batch.
+
+    Files are named after the first and last event id and renamed into
+    place once written, a consumer never sees half a batch.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def publish(self, events):
+        name = f"{events[0]['id']:020d}-{events[-1]['id']:020d}.ndjson"
+        fd, partial = tempfile.mkstemp(
+            dir=self.directory, prefix=".", suffix=".partial"
+        )
+        with open(fd, "w", encoding="utf-8") as f:
+            f.write(_lines(events))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(partial, os.path.join(self.directory, name))
+
+
+SINKS = {"ndjson": NdjsonSink, "spool": SpoolSink}
+
+
+def make_sink(spec):
+    """Build a sink from ``kind:target``, e.g. ``ndjson:events.ndjson``."""
+    kind, _, target = spec.partition(":")
+    if kind not in SINKS or not target:
+        raise ValueError(f"Sink must be <kind>:<path> with kind one of {list(SINKS)}")
+    return SINKS[kind](target)
+
+
+def relay_batch(sink, batch_size=DEFAULT_BATCH_SIZE):
+    """Publish the oldest unpublished events, return how many were sent."""
+    events = (
+        db.session.execute(
+            select(OutboxEvent)
+            .where(OutboxEvent.published_at.is_(None))
+            .order_by(OutboxEvent.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    if not events:
+        db.session.rollback()
+        return 0
+
+    try:
+        sink.publish([event.to_dict() for event in events])
+    except Exception:
+        db.session.rollback()
+        raise
+
+    db.session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_([event.id for event in events]))
+        .values(published_at=datetime.now(timezone.utc)),
+        execution_options={"synchronize_session": False},
+    )
+    db.session.commit()
+    return len(events)
+
+
+def relay_outbox(sink, batch_size=DEFAULT_BATCH_SIZE, max_batches=None):
+    """Publish batches until the outbox is drained or ``max_batches`` ran."""
+    summary = {"published": 0, "batches": 0}
+    while max_batches is None or summary["batches"] < max_batches:
+        published = relay_batch(sink, batch_size)
+        if not published:
+            break
+        summary["published"] += published
+        summary["batches"] += 1
+    return summary
@@ -0,0 +1,160 @@
+from dataclasses import dataclass
+from datetime import datetime
+from functools import cached_property
+from flask import current_app, g, has_app_context
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, select
+from sqlalchemy.orm import object_session
+from app.database import RoutingSession, run_statements
+from app.models.account import Account
+from app.models.reference_cache import TTLCache
+from app.models.user import User
+
+# The logged in user of a request, resolved from the JWT identity. The user's
+# profile and owned account ids are loaded together on first use, kept in
+# ``g`` for the rest of the request and in a short-lived process cache keyed
+# by user id for the requests after it. Writes to the user or their accounts
+# drop the cached copy, other processes pick the change up when it expires.
+
+DEFAULT_TTL = 30
+
+
+@dataclass(frozen=True)
+class CachedUser:
+    """Detached, read-only copy of a User row and its account ids."""
+
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+    created_at: datetime
+    updated_at: datetime
+    account_ids: frozenset
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "first_name": self.first_name,
+            "last_name": self.last_name,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+
+
+cache = TTLCache()
+
+
+def cache_ttl():
+    return current_app.config.get("PRINCIPAL_CACHE_TTL", DEFAULT_TTL)
+
+
+def principal_rows(user_id):
+    # one row per account, a user without accounts still gets one
+    return (
+        select(
+            User.id,
+            User.username,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.created_at,
+            User.updated_at,
+            Account.id.label("account_id"),
+        )
+        .outerjoin(Account, Account.user_id == User.id)
+        .where(User.id == user_id)
+    )
+
+
+def principal_from_rows(rows):
+    if not rows:
+        return None
+    return CachedUser(
+        *rows[0][:-1],
+        account_ids=frozenset(
+            row.account_id for row in rows if row.account_id is not None
+        ),
+    )
+
+
+def load_user(user_id):
+    """The cached user, or the statement that loads it (see run_statements)."""
+    found, user = cache.lookup(user_id)
+    if not found:
+        user = principal_from_rows((yield principal_rows(user_id)))
+        cache.store(user_id, user, cache_ttl())
+    return user
+
+
+class Principal:
+    """The logged in user, ``id`` comes from the JWT without a query."""
+
+    def __init__(self, user_id):
+        self.id = user_id
+
+    @cached_property
+    def user(self):
+        return run_statements(load_user(self.id))
+
+    @property
+    def account_ids(self):
+        return self.user.account_ids if self.user else frozenset()
+
+    def owns(self, record):
+        """True for rows with a ``user_id`` that belong to this user."""
+        return record.user_id == self.id
+
+    def owns_account(self, account_id):
+        return account_id in self.account_ids
+
+
+def current_principal():
+    """The principal of the current request, behind ``jwt_required``."""
+    if "principal" not in g:
+        g.principal = Principal(int(get_jwt_identity()))
+    return g.principal
+
+
+def invalidate_principal(user_id=None):
+    cache.invalidate(user_id)
+    if has_app_context() and "principal" in g and user_id in (None, g.principal.id):
+        g.pop("principal")
+
+
+def principal_cache_stats():
+    return cache.stats()
+
+
+# drop the copy as soon as the row changes, and again after the commit so a
+# request that reloaded it in between can't keep the uncommitted state
+@event.listens_for(Account, "after_insert")
+@event.listens_for(Account, "after_delete")
+def _on_account_write(mapper, connection, target):
+    _stale(target, target.user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _on_user_write(mapper, connection, target):
+    _stale(target, target.id)
+
+
+def _stale(target, user_id):
+    invalidate_principal(user_id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("stale_principals", set()).add(user_id)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    for user_id in session.info.pop("stale_principals", ()):
+        invalidate_principal(user_id)
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("stale_principals", None)
@@ -0,0 +1,131 @@
+import threading
+import time
+from dataclasses import dataclass
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app.database import RoutingSession
+from app.models.transaction_category import TransactionCategory
+
+DEFAULT_TTL = 300
+
+
+@dataclass(frozen=True)
+class CachedCategory:
+    """Detached, read-only copy of a TransactionCategory row."""
+
+    id: int
+    name: str
+    description: str
+
+    def __repr__(self):
+        return f"<Category {self.name}>"
+
+    def to_dict(self):
+        return {"id": self.id, "name": self.name, "description": self.description}
+
+
+class TTLCache:
+    """Process-local cache, entries expire ``ttl`` seconds after loading."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key, loader, ttl):
+        found, value = self.lookup(key)
+        if not found:
+            value = loader()
+            self.store(key, value, ttl)
+        return value
+
+    def lookup(self, key):
+        """Return ``(found, value)``, for callers that load asynchronously."""
+        entry = self._entries.get(key)
+        found = entry is not None and entry[0] > time.monotonic()
+        with self._lock:
+            if found:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return found, entry[1] if found else None
+
+    def store(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            self.invalidations += 1
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "entries": len(self._entries),
+        }
+
+
+cache = TTLCache()
+
+
+def _load_categories():
+    return {
+        category.id: CachedCategory(category.id, category.name, category.description)
+        for category in TransactionCategory.query.order_by(TransactionCategory.id)
+    }
+
+
+def _categories():
+    ttl = current_app.config.get("REFERENCE_CACHE_TTL", DEFAULT_TTL)
+    return cache.get("categories", _load_categories, ttl)
+
+
+def get_category(category_id):
+    try:
+        return _categories().get(int(category_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def list_categories():
+    return list(_categories().values())
+
+
+def invalidate_categories():
+    cache.invalidate("categories")
+
+
+def cache_stats():
+    return cache.stats()
+
+
+# any committed ORM write to the categories drops this process's copy, other
+# processes pick the change up when their entry expires; dropping it at
+# flush time would let a concurrent request cache the old rows again
+@event.listens_for(TransactionCategory, "after_insert")
+@event.listens_for(TransactionCategory, "after_update")
+@event.listens_for(TransactionCategory, "after_delete")
+def _on_category_write(mapper, connection, target):
+    session = object_session(target)
+    if session is not None:
+        session.info["stale_categories"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    if session.info.pop("stale_categories", False):
+        invalidate_categories()
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("stale_categories", None)
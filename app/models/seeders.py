@@ -15,14 +15,23 @@ def seed_transaction_categories():
         {"name": "Financial", "description": "Investments, savings, debts"},
     ]
 
+    # one query for all of them, most boots find every category in place
+    existing = {
+        name
+        for (name,) in db.session.query(TransactionCategory.name).filter(
+            TransactionCategory.name.in_([c["name"] for c in default_categories])
+        )
+    }
     for category in default_categories:
-        exists = TransactionCategory.query.filter_by(name=category["name"]).first()
-        if not exists:
+        if category["name"] not in existing:
             new_category = TransactionCategory(
                 name=category["name"], description=category["description"]
             )
             db.session.add(new_category)
 
+    if len(existing) == len(default_categories):
+        return
+
     try:
         db.session.commit()
     except Exception as e:
@@ -0,0 +1,131 @@
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from app.models import db
+from app.models.account import Account
+from app.models.bill import Bill
+from app.models.budget import Budget
+from app.models.transaction import Transaction
+from app.models.transaction_category import TransactionCategory
+
+# list payloads are built from one column-projected query per endpoint,
+# the related names are joined in so no relationship is ever lazy loaded
+
+
+TRANSACTION_FIELDS = (
+    "id",
+    "amount",
+    "transaction_type",
+    "description",
+    "from_account_id",
+    "to_account_id",
+    "category",
+    "created_at",
+    "from_account",
+    "to_account",
+)
+
+
+def transaction_rows():
+    from_account = aliased(Account)
+    to_account = aliased(Account)
+    return (
+        select(
+            Transaction.id,
+            Transaction.amount,
+            Transaction.transaction_type,
+            Transaction.description,
+            Transaction.from_account_id,
+            Transaction.to_account_id,
+            TransactionCategory.name.label("category"),
+            Transaction.created_at,
+            from_account.account_number.label("from_account"),
+            to_account.account_number.label("to_account"),
+        )
+        .outerjoin(
+            TransactionCategory, Transaction.category_id == TransactionCategory.id
+        )
+        .outerjoin(from_account, Transaction.from_account_id == from_account.id)
+        .outerjoin(to_account, Transaction.to_account_id == to_account.id)
+    )
+
+
+def transaction_row_to_dict(row):
+    # same shape as Transaction.to_dict()
+    return {
+        "id": row.id,
+        "amount": row.amount,
+        "transaction_type": row.transaction_type,
+        "description": row.description,
+        "from_account_id": row.from_account_id,
+        "to_account_id": row.to_account_id,
+        "category": row.category,
+        "created_at": row.created_at,
+        "from_account": row.from_account,
+        "to_account": row.to_account,
+    }
+
+
+def bill_rows():
+    return (
+        select(
+            Bill.id,
+            Bill.biller_name,
+            Bill.due_date,
+            Bill.amount,
+            Bill.status,
+            Bill.auto_pay,
+            Bill.account_id,
+            Account.account_number.label("account"),
+            TransactionCategory.name.label("category"),
+            Bill.created_at,
+            Bill.updated_at,
+        )
+        .join(Account, Bill.account_id == Account.id)
+        .join(TransactionCategory, Bill.category_id == TransactionCategory.id)
+    )
+
+
+def bill_row_to_dict(row):
+    # same shape as Bill.to_dict()
+    return {
+        "id": row.id,
+        "biller_name": row.biller_name,
+        "due_date": row.due_date,
+        "amount": row.amount,
+        "status": row.status,
+        "auto_pay": row.auto_pay,
+        "account_id": row.account_id,
+        "account": row.account,
+        "category": row.category,
+        "created_at": row.created_at,
+        "updated_at": row.updated_at,
+    }
+
+
+def budget_rows():
+    return select(
+        Budget.id,
+        Budget.name,
+        Budget.amount,
+        Budget.remaining_amount,
+        Budget.start_date,
+        Budget.end_date,
+        TransactionCategory.name.label("category"),
+    ).join(TransactionCategory, Budget.category_id == TransactionCategory.id)
+
+
+def budget_row_to_dict(row):
+    # same shape as Budget.to_dict()
+    return {
+        "id": row.id,
+        "name": row.name,
+        "amount": row.amount,
+        "remaining_amount": row.remaining_amount,
+        "start_date": row.start_date,
+        "end_date": row.end_date,
+        "category": row.category,
+    }
+
+
+def serialize_transactions(stmt):
+    return [transaction_row_to_dict(row) for row in db.session.execute(stmt)]
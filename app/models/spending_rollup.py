@@ -0,0 +1,55 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql import func
+from app.models import db
+
+
+class SpendingRollup(db.Model):
+    """Spending per user, category and day, kept up to date on every payment."""
+
+    __tablename__ = "spending_rollups"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "user_id",
+            "category_id",
+            "day",
+            name="uq_spending_rollups_user_category_day",
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    # FK
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    category_id = db.Column(
+        db.Integer, db.ForeignKey("transaction_categories.id"), nullable=False
+    )
+
+    INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+    def __repr__(self):
+        return f"<SpendingRollup {self.user_id}/{self.category_id} {self.day}>"
+
+    @staticmethod
+    def record(user_id, category_id, amount):
+        """Add one payment to today's row, in the caller's transaction."""
+        insert = SpendingRollup.INSERTS[db.session.get_bind().dialect.name]
+        stmt = insert(SpendingRollup).values(
+            user_id=user_id,
+            category_id=category_id,
+            day=func.current_date(),
+            total_amount=amount,
+            transaction_count=1,
+        )
+        db.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["user_id", "category_id", "day"],
+                set_={
+                    "total_amount": SpendingRollup.total_amount
+                    + stmt.excluded.total_amount,
+                    "transaction_count": SpendingRollup.transaction_count + 1,
+                },
+            )
+        )
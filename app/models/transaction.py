@@ -4,12 +4,28 @@ from app.models import db
 
 class Transaction(db.Model):
     __tablename__ = "transactions"
+    # on PostgreSQL the table is partitioned by month on created_at and its
+    # primary key is (id, created_at), see transaction_partitions.py; a lookup
+    # by id alone visits every partition, filter on created_at when known
+    __table_args__ = (
+        # keyset pagination of account history (sender and receiver side)
+        db.Index(
+            "ix_transactions_from_account_id_created_at",
+            "from_account_id",
+            "created_at",
+        ),
+        db.Index(
+            "ix_transactions_to_account_id_created_at", "to_account_id", "created_at"
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     amount = db.Column(db.Numeric(10, 2), default=0.00)
     transaction_type = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(255), nullable=False, default="")
-    created_at = db.Column(db.DateTime(timezone=True), default=func.now())
+    created_at = db.Column(
+        db.DateTime(timezone=True), default=func.now(), nullable=False
+    )
 
     # FK
     from_account_id = db.Column(
@@ -40,6 +56,8 @@ class Transaction(db.Model):
     BILL_PAYMENT = "bill_payment"
 
     VALID_TYPES = [DEPOSIT, WITHDRAWAL, TRANSFER, PAYMENT, BILL_PAYMENT]
+    # categorized money going out, counted by the spending analytics
+    SPENDING_TYPES = [PAYMENT, BILL_PAYMENT]
 
     def __init__(self, **kwargs):
         super(Transaction, self).__init__(**kwargs)
@@ -54,7 +72,7 @@ class Transaction(db.Model):
     def to_dict(self):
         return {
             "id": self.id,
-            "amount": float(self.amount),
+            "amount": self.amount,
             "transaction_type": self.transaction_type,
             "description": self.description,
             "from_account_id": self.from_account_id,
@@ -62,7 +80,7 @@ class Transaction(db.Model):
             "category": (
                 self.transaction_category.name if self.transaction_category else None
             ),
-            "created_at": self.created_at.isoformat(),
+            "created_at": self.created_at,
             "from_account": (
                 self.from_account.account_number if self.from_account else None
             ),
@@ -0,0 +1,139 @@
+import base64
+from datetime import datetime
+from sqlalchemy import DateTime, String, and_, or_, select, type_coerce, union
+from sqlalchemy.types import TypeDecorator
+from app.models import db
+from app.models.serializers import transaction_row_to_dict, transaction_rows
+from app.models.transaction import Transaction
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class StoredTime(TypeDecorator):
+    """A timestamp compared with created_at the way the column stores it.
+
+    SQLite keeps func.now() as text with whole seconds, "2026-10-18
+    19:03:10", while a bound datetime is sent with microseconds, so equal
+    times compare as different strings.
+    """
+
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(self.impl)
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and dialect.name == "sqlite":
+            return str(value.replace(tzinfo=None))
+        return value
+
+
+def stored_time(value):
+    return type_coerce(value, StoredTime())
+
+
+def encode_cursor(transaction):
+    # opaque "<created_at>|<id>" token of the last row on a page
+    raw = f"{transaction.created_at.isoformat()}|{transaction.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        raw = base64.urlsafe_b64decode(token.encode()).decode()
+        created_at, transaction_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def history_filters(transaction_type=None, category_id=None, start=None, end=None):
+    criteria = []
+    if transaction_type:
+        criteria.append(Transaction.transaction_type == transaction_type)
+    if category_id is not None:
+        criteria.append(Transaction.category_id == category_id)
+    if start:
+        criteria.append(Transaction.created_at >= stored_time(start))
+    if end:
+        criteria.append(Transaction.created_at < stored_time(end))
+    return criteria
+
+
+def _newest_first(stmt):
+    return stmt.order_by(Transaction.created_at.desc(), Transaction.id.desc())
+
+
+def _side_page(column, account_ids, criteria, limit):
+    # each side walks its own (account_id, created_at) index
+    return (
+        _newest_first(
+            select(Transaction.id, Transaction.created_at).where(
+                column.in_(account_ids), *criteria
+            )
+        )
+        .limit(limit)
+        .subquery()
+        .select()
+    )
+
+
+def history_page_ids(account_ids, criteria=(), cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Subquery with the ids of one page of transactions touching the accounts.
+
+    Sent and received transactions are paged separately and merged, so the
+    cost of a page depends on ``limit`` and not on the size of the history.
+    ``limit`` rows are selected; callers ask for one extra row to find out
+    whether another page exists.
+    """
+    criteria = list(criteria)
+    if cursor:
+        created_at, transaction_id = cursor
+        created_at = stored_time(created_at)
+        criteria.append(Transaction.created_at <= created_at)  # partition pruning
+        criteria.append(
+            or_(
+                Transaction.created_at < created_at,
+                and_(
+                    Transaction.created_at == created_at,
+                    Transaction.id < transaction_id,
+                ),
+            )
+        )
+
+    return union(
+        _side_page(Transaction.from_account_id, account_ids, criteria, limit),
+        _side_page(Transaction.to_account_id, account_ids, criteria, limit),
+    ).subquery()
+
+
+def history_page(account_ids, criteria=(), cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """Return ``(payload, next_cursor)`` for one page, newest first."""
+    stmt = history_page_rows(account_ids, criteria, cursor, limit)
+    return history_page_payload(db.session.execute(stmt).all(), limit)
+
+
+def history_page_rows(account_ids, criteria=(), cursor=None, limit=DEFAULT_PAGE_SIZE):
+    # one row more than the page, to tell whether another one follows
+    page = history_page_ids(account_ids, criteria, cursor, limit + 1)
+    # created_at leads each lookup to the partition holding the row
+    return _newest_first(
+        transaction_rows().join(
+            page,
+            and_(
+                Transaction.id == page.c.id, Transaction.created_at == page.c.created_at
+            ),
+        )
+    ).limit(limit + 1)
+
+
+def history_page_payload(rows, limit=DEFAULT_PAGE_SIZE):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1])
+    return [transaction_row_to_dict(row) for row in rows], next_cursor
@@ -0,0 +1,231 @@
+import gzip
+import os
+import re
+from datetime import datetime, timezone
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+from app.models import db
+from app.models.transaction import Transaction
+
+# On PostgreSQL the transactions table is split into monthly range
+# partitions on created_at (migration 6e0d9b3f7a21), named
+# transactions_y<year>m<month> and bounded in UTC. Rows with no partition
+# of their own land in transactions_default, so a missing partition never
+# fails a write. ensure_partitions, run daily, creates the coming months and
+# moves anything the default partition caught into its month. Old months
+# leave the table by detaching them, or by archiving them to a gzipped CSV
+# file and dropping them. Queries bounded on created_at (history ranges and
+# cursors, statements with from/to) only read the months they cover. New
+# databases get the same layout from bootstrap_database (app/database.py)
+# through partition_new_table.
+
+PARENT = "transactions"
+DEFAULT_PARTITION = "transactions_default"
+DEFAULT_MONTHS_AHEAD = 3
+PARTITION_NAME = re.compile(r"^transactions_y(\d{4})m(\d{2})$")
+# partition layout changes run one at a time
+LAYOUT_LOCK = 7160823
+
+
+def month_start(value):
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month):
+    return f"{PARENT}_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(connection):
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+            "WHERE partrelid = to_regclass(:name))"
+        ),
+        {"name": PARENT},
+    ).scalar()
+
+
+def partition_months(connection):
+    """Months with a partition of their own, oldest first."""
+    names = connection.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass(:name)"
+        ),
+        {"name": PARENT},
+    ).scalars()
+    months = []
+    for name in names:
+        match = PARTITION_NAME.match(name)
+        if match:
+            months.append(
+                datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)
+            )
+    return sorted(months)
+
+
+def _layout_connection():
+    connection = db.session.connection()
+    if not is_partitioned(connection):
+        raise ValueError(
+            "transactions is not partitioned, this needs PostgreSQL at the "
+            "latest migration"
+        )
+    connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LAYOUT_LOCK})
+    # moving rows and copying months out can outlast the request timeout
+    connection.execute(text("SET LOCAL statement_timeout = 0"))
+    return connection
+
+
+def _create_partition(connection, month):
+    # built next to the table and attached, so rows the default partition
+    # holds for the month can move in first; ATTACH rejects the month while
+    # the default partition still has rows in it
+    name = partition_name(month)
+    connection.execute(text(f"CREATE TABLE {name} (LIKE {PARENT} INCLUDING DEFAULTS)"))
+    moved = connection.execute(
+        text(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+            "WHERE created_at >= :start AND created_at < :end RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ),
+        {"start": month, "end": add_months(month, 1)},
+    ).rowcount
+    connection.execute(
+        text(
+            f"ALTER TABLE {PARENT} ATTACH PARTITION {name} FOR VALUES "
+            f"FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        )
+    )
+    return moved
+
+
+def partition_new_table(connection, months_ahead=DEFAULT_MONTHS_AHEAD, now=None):
+    """Partition the empty transactions table create_all just made.
+
+    Leaves it as migration 6e0d9b3f7a21 does: the model's columns, id
+    sequence, foreign keys and indexes, (id, created_at) as primary key,
+    the default partition and one per month up to ``months_ahead``.
+    """
+    aside = f"{PARENT}_unpartitioned"
+    connection.execute(text(f"ALTER TABLE {PARENT} RENAME TO {aside}"))
+    connection.execute(
+        text(
+            f"CREATE TABLE {PARENT} (LIKE {aside} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (created_at)"
+        )
+    )
+    connection.execute(text(f"ALTER SEQUENCE {PARENT}_id_seq OWNED BY {PARENT}.id"))
+    connection.execute(text(f"DROP TABLE {aside}"))
+
+    connection.execute(text(f"ALTER TABLE {PARENT} ADD PRIMARY KEY (id, created_at)"))
+    for constraint in Transaction.__table__.foreign_key_constraints:
+        connection.execute(AddConstraint(constraint))
+    for index in Transaction.__table__.indexes:
+        connection.execute(CreateIndex(index))
+
+    connection.execute(
+        text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT")
+    )
+    current = month_start(now or datetime.now(timezone.utc))
+    for offset in range(months_ahead + 1):
+        _create_partition(connection, add_months(current, offset))
+
+
+def ensure_partitions(months_ahead=DEFAULT_MONTHS_AHEAD, now=None):
+    """Create the partitions from this month to ``months_ahead`` months on.
+
+    Months the default partition has rows for get a partition too, and the
+    rows move into it. Returns the created partitions and the moved rows.
+    """
+    connection = _layout_connection()
+    existing = set(partition_months(connection))
+    current = month_start(now or datetime.now(timezone.utc))
+    wanted = {add_months(current, offset) for offset in range(months_ahead + 1)}
+    wanted.update(
+        month_start(value)
+        for value in connection.execute(
+            text(
+                "SELECT DISTINCT date_trunc('month', created_at AT TIME ZONE 'UTC') "
+                f"FROM {DEFAULT_PARTITION}"
+            )
+        ).scalars()
+    )
+
+    summary = {"created": [], "moved": 0}
+    for month in sorted(wanted - existing):
+        summary["moved"] += _create_partition(connection, month)
+        summary["created"].append(partition_name(month))
+    db.session.commit()
+    return summary
+
+
+def _months_before(connection, before):
+    before = month_start(before)
+    if before > month_start(datetime.now(timezone.utc)):
+        raise ValueError("Only months before the current one can leave the table")
+    return [
+        month
+        for month in partition_months(connection)
+        if add_months(month, 1) <= before
+    ]
+
+
+def detach_partitions(before):
+    """Detach the partitions of the months before ``before``.
+
+    The detached tables keep their names and rows but no query on
+    transactions reads them anymore.
+    """
+    connection = _layout_connection()
+    detached = []
+    for month in _months_before(connection, before):
+        name = partition_name(month)
+        connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        detached.append(name)
+    db.session.commit()
+    return detached
+
+
+def archive_partitions(before, directory):
+    """Copy the months before ``before`` to gzipped CSV files and drop them.
+
+    Each month is written to ``<directory>/<partition>.csv.gz`` and dropped
+    in its own transaction, the file is complete on disk before the drop
+    commits. Returns one entry per archived partition.
+    """
+    os.makedirs(directory, exist_ok=True)
+    archived = []
+    for month in _months_before(_layout_connection(), before):
+        connection = _layout_connection()
+        name = partition_name(month)
+        path = os.path.join(directory, f"{name}.csv.gz")
+        # late inserts into the month wait until it is gone
+        connection.execute(text(f"LOCK TABLE {name} IN SHARE MODE"))
+        rows = _copy_to_file(connection, name, path)
+        connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        connection.execute(text(f"DROP TABLE {name}"))
+        db.session.commit()
+        archived.append({"partition": name, "rows": rows, "path": path})
+    db.session.commit()
+    return archived
+
+
+def _copy_to_file(connection, name, path):
+    partial = f"{path}.partial"
+    cursor = connection.connection.cursor()
+    with open(partial, "wb") as raw:
+        with gzip.GzipFile(fileobj=raw, mode="wb") as f:
+            cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", f)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(partial, path)
+    return cursor.rowcount
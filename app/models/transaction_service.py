@@ -0,0 +1,346 @@
+from decimal import Decimal, InvalidOperation
+from app.models import db, ledger
+from app.models.account import Account
+from app.models.balance_snapshot import BalanceSnapshot
+from app.models.bill import Bill
+from app.models.spending_rollup import SpendingRollup
+from app.models.transaction import Transaction
+from app.models.reference_cache import get_category
+
+
+class TransactionError(Exception):
+    """A transaction request that was rejected, carries the JSON error body."""
+
+    def __init__(self, payload, status=400):
+        super().__init__(payload["error"])
+        self.payload = payload
+        self.status = status
+
+
+class Lookups:
+    """Loads the rows a transaction request refers to, one query each."""
+
+    def account(self, account_id):
+        return Account.query.get(account_id)
+
+    def account_by_number(self, account_number):
+        return Account.query.filter_by(account_number=account_number).first()
+
+    def bill(self, bill_id):
+        return Bill.query.get(bill_id)
+
+    def category(self, category_id):
+        return get_category(category_id)
+
+    def pending_bills(self, user_id):
+        return Bill.query.filter(
+            Bill.user_id == user_id, Bill.status.in_(Bill.PAYABLE_STATUSES)
+        ).all()
+
+
+def _int_keys(values):
+    keys = set()
+    for value in values:
+        try:
+            keys.add(int(value))
+        except (TypeError, ValueError):
+            pass
+    return keys
+
+
+def _get(rows, key):
+    try:
+        return rows.get(int(key))
+    except (TypeError, ValueError):
+        return None
+
+
+class BatchLookups(Lookups):
+    """Resolves everything a batch of requests refers to in a few IN queries."""
+
+    def __init__(self, items):
+        items = [item for item in items if isinstance(item, dict)]
+
+        account_ids = _int_keys(item.get("account_id") for item in items)
+        account_numbers = {
+            str(item["to_account_number"])
+            for item in items
+            if item.get("to_account_number") is not None
+        }
+        bill_ids = _int_keys(item.get("bill_id") for item in items)
+
+        self._bills = {
+            bill.id: bill for bill in Bill.query.filter(Bill.id.in_(bill_ids))
+        }
+        account_ids |= {bill.account_id for bill in self._bills.values()}
+
+        accounts = Account.query.filter(
+            Account.id.in_(account_ids) | Account.account_number.in_(account_numbers)
+        ).all()
+        self._accounts = {account.id: account for account in accounts}
+        self._accounts_by_number = {
+            account.account_number: account for account in accounts
+        }
+
+    def account(self, account_id):
+        return _get(self._accounts, account_id)
+
+    def account_by_number(self, account_number):
+        return self._accounts_by_number.get(str(account_number))
+
+    def bill(self, bill_id):
+        return _get(self._bills, bill_id)
+
+    def expire(self):
+        """Reload the rows on next use, after a savepoint rolled back.
+
+        The ledger keeps loaded rows in step with its UPDATEs without marking
+        them dirty, so rolling back a savepoint doesn't expire them.
+        """
+        for instance in (*self._accounts.values(), *self._bills.values()):
+            db.session.expire(instance)
+
+
+def _pending_bills_details(lookups, user_id):
+    # get pending bills as helper
+    return {
+        "available_pending_bills": [
+            {
+                "id": biller.id,
+                "account_id": biller.account_id,
+                "biller_name": biller.biller_name,
+                "amount": float(biller.amount),
+                "due_date": biller.due_date.isoformat(),
+            }
+            for biller in lookups.pending_bills(user_id)
+        ]
+    }
+
+
+def process_transaction(data, current_user_id, lookups=None):
+    """Validate a transaction request and apply it to the session.
+
+    Balance changes go through the ledger and the new Transaction is added to
+    the session, committing is left to the caller. Rejected requests raise
+    TransactionError, the caller must roll back the session.
+    """
+    lookups = lookups or Lookups()
+
+    # validate fields based on the transaction type
+    if data.get("transaction_type") == Transaction.BILL_PAYMENT:
+        required_fields = ["account_id", "transaction_type", "bill_id"]
+    else:
+        required_fields = ["account_id", "amount", "transaction_type"]
+
+    for field in required_fields:
+        if field not in data:
+            raise TransactionError({"error": f"Missing required field: {field}"})
+    if data["transaction_type"] not in Transaction.VALID_TYPES:
+        raise TransactionError(
+            {
+                "error": "Invalid transaction type. Must be one of "
+                f"{Transaction.VALID_TYPES}"
+            }
+        )
+
+    # prevent access to another account
+    account = lookups.account(data["account_id"])
+    if not account:
+        raise TransactionError({"error": "Account is not found"}, 404)
+    if str(account.user_id) != current_user_id:
+        raise TransactionError({"error": "Unauthorized access to account"}, 403)
+
+    bill = to_account = category = None
+
+    if data["transaction_type"] == Transaction.BILL_PAYMENT:
+        # check bill id
+        bill = lookups.bill(data["bill_id"])
+        if not bill:
+            raise TransactionError(
+                {
+                    "error": "Bill ID is not found",
+                    "details": _pending_bills_details(lookups, current_user_id),
+                },
+                404,
+            )
+
+        # check bill ownership
+        if str(bill.user_id) != current_user_id:
+            raise TransactionError(
+                {
+                    "error": "Unauthorized access to bill",
+                    "details": _pending_bills_details(lookups, current_user_id),
+                },
+                403,
+            )
+
+        # check bill status
+        if bill.status not in Bill.PAYABLE_STATUSES:
+            raise TransactionError(
+                {
+                    "error": "Cannot pay bill",
+                    "details": {
+                        "bill_id": bill.id,
+                        "biller_name": bill.biller_name,
+                        "status": bill.status,
+                        "reason": f"Bill is already {bill.status}",
+                    },
+                }
+            )
+
+        # check correct account for paying
+        if bill.account_id != account.id:
+            raise TransactionError(
+                {
+                    "error": "Invalid account for bill payment",
+                    "details": {
+                        "bill_id": bill.id,
+                        "required_account": lookups.account(
+                            bill.account_id
+                        ).account_number,
+                        "provided_account": account.account_number,
+                    },
+                }
+            )
+
+        # check for sufficient balance
+        if account.balance < bill.amount:
+            raise TransactionError(
+                {
+                    "error": "Insufficient funds",
+                    "details": {
+                        "account_balance": float(account.balance),
+                        "bill_amount": float(bill.amount),
+                    },
+                }
+            )
+        # auto. assign req. amount for bill payment
+        data["amount"] = str(bill.amount)
+
+    # transfer type validation
+    if data["transaction_type"] == Transaction.TRANSFER:
+        if "to_account_number" not in data:
+            raise TransactionError(
+                {"error": "Destination account number is required for transfers"}
+            )
+
+        to_account = lookups.account_by_number(data["to_account_number"])
+        if not to_account:
+            raise TransactionError({"error": "Destination account not found"}, 404)
+
+        if account.id == to_account.id:
+            raise TransactionError({"error": "Cannot transfer to yourself"})
+
+    # check if it's payment type
+    if data["transaction_type"] == Transaction.PAYMENT:
+        # check for category_id in req. body
+        if "category_id" not in data:
+            raise TransactionError(
+                {"error": "Transaction category (category_id) is required for payment"}
+            )
+
+        category = lookups.category(data["category_id"])
+        if not category:
+            raise TransactionError({"error": "Invalid transaction category"})
+
+    try:
+        amount = Decimal(str(data["amount"]))
+    except InvalidOperation:
+        amount = None
+    if amount is None or not amount.is_finite():
+        raise TransactionError({"error": "Amount must be a valid number"})
+
+    # prevent 0 transaction or below
+    if amount <= 0:
+        raise TransactionError({"error": "Amount must be positive"})
+
+    # check balance
+    if data["transaction_type"] in [
+        Transaction.WITHDRAWAL,
+        Transaction.TRANSFER,
+        Transaction.PAYMENT,
+    ]:
+        if account.balance < amount:
+            raise TransactionError({"error": "Insufficient funds"})
+
+    transaction = Transaction(
+        amount=amount,
+        transaction_type=data["transaction_type"],
+        description=(
+            data.get("description", f"Bill payment: {bill.biller_name}")
+            if data["transaction_type"] == Transaction.BILL_PAYMENT
+            else data.get("description", "")
+        ),
+        from_account_id=account.id,
+        to_account_id=(
+            to_account.id if data["transaction_type"] == Transaction.TRANSFER else None
+        ),
+        category_id=(
+            bill.category_id
+            if data["transaction_type"] == Transaction.BILL_PAYMENT
+            else (
+                data["category_id"]
+                if data["transaction_type"] == Transaction.PAYMENT
+                else None
+            )
+        ),
+    )
+
+    # handle balance updates, each one is a conditional UPDATE so the
+    # funds check above can't be raced by a concurrent request
+    balances = {}
+    try:
+        if transaction.transaction_type == Transaction.BILL_PAYMENT:
+            ledger.settle_bill(bill.id)
+            balances[account.id] = ledger.debit(account.id, amount)
+        elif transaction.transaction_type == Transaction.DEPOSIT:
+            balances[account.id] = ledger.credit(account.id, amount)
+        elif transaction.transaction_type in [
+            Transaction.WITHDRAWAL,
+            Transaction.PAYMENT,
+        ]:
+            # the category's active budget, if any, is charged first so an
+            # over-budget payment is refused before touching the balance
+            if transaction.transaction_type == Transaction.PAYMENT:
+                ledger.consume_budget(account.user_id, category.id, amount)
+            balances[account.id] = ledger.debit(account.id, amount)
+        elif transaction.transaction_type == Transaction.TRANSFER:
+            balances[account.id], balances[to_account.id] = ledger.transfer(
+                account.id, to_account.id, amount
+            )
+    except ledger.InsufficientFundsError:
+        raise TransactionError({"error": "Insufficient funds"})
+    except ledger.BudgetExceededError as e:
+        raise TransactionError(
+            {
+                "error": "Payment exceeds remaining budget.",
+                "details": {
+                    "requested_amount": float(amount),
+                    "available_budget": float(e.budget.remaining_amount),
+                    "category": category.name,
+                    "budget_end_date": e.budget.end_date.isoformat(),
+                },
+            }
+        )
+    except ledger.BillNotPayableError as e:
+        raise TransactionError(
+            {
+                "error": "Cannot pay bill",
+                "details": {"bill_id": e.bill_id, "reason": str(e)},
+            }
+        )
+
+    db.session.add(transaction)
+
+    # keep the per-category spending rollup in the same commit
+    if transaction.transaction_type in Transaction.SPENDING_TYPES:
+        SpendingRollup.record(account.user_id, transaction.category_id, amount)
+
+    # running balance of every account the transaction touched
+    for account_id, balance in balances.items():
+        db.session.add(
+            BalanceSnapshot(
+                account_id=account_id, balance_after=balance, transaction=transaction
+            )
+        )
+    return transaction
@@ -0,0 +1,195 @@
+import csv
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from flask import current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from app.models import db
+from app.models.account import Account
+from app.models.account_numbers import MAX_ATTEMPTS, is_account_number_conflict
+from app.models.user import User
+from app.passwords import hash_password, strength_check
+
+# Bulk onboarding: rows are validated and checked for existing usernames and
+# emails a chunk at a time with IN queries, passwords are hashed on a process
+# pool (the CLI) or in the calling process (the admin endpoint, a web worker
+# must not fork), and each chunk's users and main accounts go in as two
+# multi-row INSERTs and one commit.
+
+REQUIRED_FIELDS = ["username", "email", "password", "first_name", "last_name"]
+DEFAULT_CHUNK_SIZE = 1000
+IMPORT_FORMATS = ["csv", "ndjson"]
+
+
+def read_rows(stream, fmt):
+    """Yield ``(line, row)`` pairs, ``row`` is None for unparsable lines."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            row = json.loads(text)
+        except ValueError:
+            row = None
+        yield line, row if isinstance(row, dict) else None
+
+
+def _validate(row):
+    if row is None:
+        return "Invalid row"
+    for field in REQUIRED_FIELDS:
+        if not isinstance(row.get(field), str) or not row[field]:
+            return f"Missing required field: {field}"
+    weak_password = strength_check(row["password"])
+    if weak_password:
+        return "Password is too weak: " + "; ".join(weak_password)
+    return None
+
+
+def _existing(column, values):
+    return set(db.session.scalars(select(column).where(column.in_(values))))
+
+
+class UserImport:
+    """Imports users with their main savings account, a chunk per commit."""
+
+    def __init__(self, pool=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        # None hashes in this process
+        self.pool = pool
+        self.chunk_size = chunk_size
+        # pool processes have no app context to read the setting from
+        self.hash_method = current_app.config["PASSWORD_HASH_METHOD"]
+        self.created = 0
+        self.errors = []
+        self._usernames = set()
+        self._emails = set()
+
+    def fail(self, line, row, error):
+        username = row.get("username") if isinstance(row, dict) else None
+        self.errors.append({"line": line, "username": username, "error": error})
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk)
+        return {
+            "created": self.created,
+            "failed": len(self.errors),
+            "errors": self.errors,
+        }
+
+    def _import_chunk(self, chunk):
+        candidates = []
+        for line, row in chunk:
+            error = _validate(row)
+            if error is None and row["username"] in self._usernames:
+                error = "Duplicate username in import"
+            if error is None and row["email"] in self._emails:
+                error = "Duplicate email in import"
+            if error:
+                self.fail(line, row, error)
+                continue
+            self._usernames.add(row["username"])
+            self._emails.add(row["email"])
+            candidates.append((line, row))
+
+        taken_usernames = _existing(
+            User.username, [r["username"] for _, r in candidates]
+        )
+        taken_emails = _existing(User.email, [r["email"] for _, r in candidates])
+        valid = []
+        for line, row in candidates:
+            if row["username"] in taken_usernames:
+                self.fail(line, row, "Username already exists")
+            elif row["email"] in taken_emails:
+                self.fail(line, row, "Email already exists")
+            else:
+                valid.append((line, row))
+        if not valid:
+            return
+
+        hash_one = partial(hash_password, method=self.hash_method)
+        passwords = [row["password"] for _, row in valid]
+        if self.pool is None:
+            hashes = map(hash_one, passwords)
+        else:
+            hashes = self.pool.map(
+                hash_one, passwords, chunksize=max(1, len(valid) // 32)
+            )
+        user_rows = [
+            {
+                "username": row["username"],
+                "email": row["email"],
+                "password_hash": password_hash,
+                "first_name": row["first_name"],
+                "last_name": row["last_name"],
+            }
+            for (_, row), password_hash in zip(valid, hashes)
+        ]
+
+        try:
+            self._insert(user_rows)
+            db.session.commit()
+            self.created += len(user_rows)
+        except IntegrityError:
+            # someone registered one of these meanwhile, or an account number
+            # clashed, find out which rows by inserting them one at a time
+            db.session.rollback()
+            for (line, row), user_row in zip(valid, user_rows):
+                self._import_one(line, row, user_row)
+
+    def _insert(self, user_rows):
+        user_ids = db.session.scalars(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            user_rows,
+        ).all()
+        db.session.execute(
+            insert(Account),
+            [
+                {
+                    "account_number": Account.generate_unique_account_number(),
+                    "account_type": "savings",
+                    "balance": 0,
+                    "is_main": True,
+                    "user_id": user_id,
+                }
+                for user_id in user_ids
+            ],
+        )
+
+    def _import_one(self, line, row, user_row):
+        for attempt in range(MAX_ATTEMPTS):
+            try:
+                with db.session.begin_nested():
+                    self._insert([user_row])
+                db.session.commit()
+                self.created += 1
+                return
+            except IntegrityError as e:
+                if attempt < MAX_ATTEMPTS - 1 and is_account_number_conflict(e):
+                    continue
+                self.fail(line, row, "Username or email already exists")
+                return
+
+
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """Create a user and main account for every valid row.
+
+    ``rows`` are ``(line, row)`` pairs as yielded by ``read_rows``. Returns a
+    summary with the number created and one error entry per rejected row.
+    ``workers=1`` hashes in the calling process instead of starting a pool.
+    """
+    if workers == 1:
+        return UserImport(None, chunk_size).run(rows)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return UserImport(pool, chunk_size).run(rows)
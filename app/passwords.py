@@ -0,0 +1,189 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from flask import current_app
+from sqlalchemy import update
+from werkzeug.security import (
+    DEFAULT_PBKDF2_ITERATIONS,
+    check_password_hash,
+    generate_password_hash,
+)
+
+try:
+    import argon2
+except ImportError:  # optional, only needed for argon2id
+    argon2 = None
+
+# Hashes carry their own algorithm and cost, werkzeug as
+# "scrypt:32768:8:1$salt$hash" or "pbkdf2:sha256:1000000$salt$hash", argon2
+# as "$argon2id$v=19$m=65536,t=3,p=4$salt$hash". PASSWORD_HASH_METHOD picks
+# what new hashes use:
+#
+#   scrypt, scrypt:N:r:p            werkzeug scrypt (default scrypt:32768:8:1)
+#   pbkdf2, pbkdf2:sha256:ITER      werkzeug pbkdf2
+#   argon2id, argon2id:T:M:P        argon2-cffi, time cost, memory KiB, lanes
+#
+# Any stored hash still verifies after the setting changes, a login with an
+# out of date hash rewrites it in the background.
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HASH_METHOD = "scrypt"
+
+
+@lru_cache
+def _policy():
+    # password_strength is imported on first use, not at worker boot
+    from password_strength import PasswordPolicy
+
+    return PasswordPolicy.from_names(
+        length=8,  # min length: 8
+        uppercase=1,  # need min. 1 uppercase letters
+        numbers=1,  # need min. 1 digits
+        special=1,  # need min. 1 special characters
+        # nonletters=2,  # need min. 2 non-letter characters (digits, specials, anything)
+    )
+
+
+def strength_check(pw):
+    test = _policy().test(pw)
+    if test:
+        error_messages = []
+        for failed_test in test:
+            test_type = failed_test.__class__.__name__
+
+            if test_type == "Length":
+                error_messages.append("Password must be at least 8 characters")
+            elif test_type == "Uppercase":
+                error_messages.append(
+                    "Password must contain at least 1 uppercase letter"
+                )
+            elif test_type == "Numbers":
+                error_messages.append("Password must contain at least 1 number")
+            elif test_type == "Special":
+                error_messages.append(
+                    "Password must contain at least 1 special character"
+                )
+        return error_messages
+    return None
+
+
+@lru_cache
+def _argon2_hasher(method):
+    if argon2 is None:
+        raise ValueError("argon2id needs the argon2-cffi package")
+    params = method.split(":")[1:]
+    if not params:
+        return argon2.PasswordHasher()
+    if len(params) != 3:
+        raise ValueError(f"Invalid password hash method: {method}")
+    time_cost, memory_cost, parallelism = map(int, params)
+    return argon2.PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+
+
+def _werkzeug_prefix(method):
+    # the "method:params" part werkzeug writes in front of the salt, worked
+    # out like werkzeug does it instead of paying for a hash at startup
+    name, *args = method.split(":")
+    if name == "scrypt" and len(args) in (0, 3):
+        n, r, p = map(int, args) if args else (2**15, 8, 1)
+        return f"scrypt:{n}:{r}:{p}"
+    if name == "pbkdf2" and len(args) <= 2:
+        hash_name = args[0] if args else "sha256"
+        iterations = int(args[1]) if len(args) == 2 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    raise ValueError(f"Invalid password hash method: {method}")
+
+
+def _is_argon2(method_or_hash):
+    return method_or_hash.startswith(("argon2", "$argon2"))
+
+
+def check_hash_method(method):
+    """Raise ValueError if ``method`` can't be used to hash passwords."""
+    if _is_argon2(method):
+        _argon2_hasher(method)
+    else:
+        _werkzeug_prefix(method)
+
+
+def _configured_method():
+    return current_app.config.get("PASSWORD_HASH_METHOD", DEFAULT_HASH_METHOD)
+
+
+def hash_password(password, method=None):
+    method = method or _configured_method()
+    if _is_argon2(method):
+        return _argon2_hasher(method).hash(password)
+    return generate_password_hash(password, method)
+
+
+def verify_password(password_hash, password):
+    if _is_argon2(password_hash):
+        if argon2 is None:
+            # not the user's fault, every argon2 user is locked out until
+            # the package is installed again
+            logger.error(
+                "Can't verify an argon2 password hash, argon2-cffi is not installed"
+            )
+            return False
+        try:
+            return argon2.PasswordHasher().verify(password_hash, password)
+        except argon2.exceptions.Argon2Error:
+            return False
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash, method=None):
+    """True if the hash wasn't made with the configured method and cost."""
+    method = method or _configured_method()
+    if _is_argon2(method):
+        return not _is_argon2(password_hash) or _argon2_hasher(
+            method
+        ).check_needs_rehash(password_hash)
+    return password_hash.split("$", 1)[0] != _werkzeug_prefix(method)
+
+
+# queued rehashes hold the plaintext password, past this many the login
+# skips it and a later one rewrites the hash
+MAX_PENDING_REHASHES = 32
+
+_rehash_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rehash")
+_rehash_slots = threading.BoundedSemaphore(MAX_PENDING_REHASHES)
+
+
+def _rehash(app, user_id, old_hash, password):
+    from app.models import db
+    from app.models.user import User
+
+    with app.app_context():
+        try:
+            # only replace the hash we checked, a password change made in
+            # the meantime wins
+            db.session.execute(
+                update(User)
+                .where(User.id == user_id, User.password_hash == old_hash)
+                .values(password_hash=hash_password(password)),
+                execution_options={"synchronize_session": False},
+            )
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Password rehash failed for user %s", user_id)
+        finally:
+            _rehash_slots.release()
+
+
+def schedule_rehash(user_id, old_hash, password):
+    """Rewrite the user's hash with the configured method off the request.
+
+    Returns False when too many rehashes are already waiting.
+    """
+    if not _rehash_slots.acquire(blocking=False):
+        return False
+    app = current_app._get_current_object()
+    _rehash_executor.submit(_rehash, app, user_id, old_hash, password)
+    return True
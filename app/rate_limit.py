@@ -0,0 +1,165 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+
+# Token buckets: a limit of "10/minute" holds up to 10 tokens and refills
+# one every 6 seconds, each request takes one. Limits are set per endpoint
+# in RATE_LIMITS and counted per client IP or per JWT identity.
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+DEFAULT_LIMITS = {
+    "login": "10/minute",
+    "transactions": "60/minute",
+    "transactions_batch": "10/minute",
+}
+
+
+class Limit:
+    def __init__(self, capacity, period):
+        self.capacity = capacity
+        self.rate = capacity / period
+
+    @classmethod
+    def parse(cls, value):
+        """Parse "<count>/<second|minute|hour>"."""
+        try:
+            count, period = value.split("/")
+            return cls(int(count), PERIODS[period.strip()])
+        except (ValueError, KeyError):
+            raise ValueError(f"Invalid rate limit: {value}")
+
+
+def _refill(state, limit, now):
+    # returns the new bucket state and how long to wait, 0 if allowed
+    tokens, updated = state if state else (limit.capacity, now)
+    tokens = min(limit.capacity, tokens + (now - updated) * limit.rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / limit.rate
+
+
+class MemoryStore:
+    """Buckets of this process, split over stripes that each have a lock.
+
+    Requests only wait for others whose key falls in the same stripe, there
+    is no global lock. Full buckets are dropped once a stripe grows past
+    ``max_keys`` so one-off clients don't accumulate.
+    """
+
+    def __init__(self, stripes=64, max_keys=10000):
+        self._stripes = [(threading.Lock(), {}) for _ in range(stripes)]
+        self.max_keys = max_keys
+
+    def take(self, key, limit):
+        lock, buckets = self._stripes[hash(key) % len(self._stripes)]
+        now = time.monotonic()
+        with lock:
+            state, _ = buckets.get(key, (None, None))
+            state, retry_after = _refill(state, limit, now)
+            # a stripe holds buckets of different limits, each one keeps the
+            # time it will be full again and is the same as a new one after
+            full_at = now + (limit.capacity - state[0]) / limit.rate
+            buckets[key] = (state, full_at)
+            if len(buckets) > self.max_keys:
+                self._prune(buckets, now)
+        return retry_after
+
+    @staticmethod
+    def _prune(buckets, now):
+        for key, (_, full_at) in list(buckets.items()):
+            if full_at <= now:
+                del buckets[key]
+
+
+class SharedStore:
+    """Buckets kept in a store shared by every worker.
+
+    ``backend`` needs ``get(key)`` and an atomic
+    ``compare_and_set(key, expected, new)``, which a Redis WATCH/MULTI or Lua
+    script provides. The bucket update is an optimistic retry loop, so no
+    worker ever holds a lock on the shared store.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def take(self, key, limit):
+        while True:
+            current = self.backend.get(key)
+            state, retry_after = _refill(current, limit, time.time())
+            if self.backend.compare_and_set(key, current, state):
+                return retry_after
+
+
+class LocalBackend:
+    """In-process stand-in for a shared backend, for tests and development."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def get(self, key):
+        return self._values.get(key)
+
+    def compare_and_set(self, key, expected, new):
+        with self._lock:
+            if self._values.get(key) != expected:
+                return False
+            self._values[key] = new
+            return True
+
+
+STORES = {
+    "memory": MemoryStore,
+    "local": lambda: SharedStore(LocalBackend()),
+}
+
+
+def _client_ip():
+    # the real client behind TRUSTED_PROXY_HOPS proxies, see create_app
+    return request.remote_addr or "unknown"
+
+
+def rate_limit(name, per="ip", methods=None):
+    """Limit the view with the RATE_LIMITS[name] setting.
+
+    ``per="identity"`` counts per JWT identity and must sit below
+    ``jwt_required``. ``methods`` limits only those HTTP methods.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            store = current_app.extensions.get("rate_limit")
+            if store is None or (methods and request.method not in methods):
+                return view(*args, **kwargs)
+
+            limit = current_app.config["RATE_LIMITS"][name]
+            client = get_jwt_identity() if per == "identity" else None
+            key = f"{name}:user:{client}" if client else f"{name}:ip:{_client_ip()}"
+
+            retry_after = store.take(key, limit)
+            if retry_after:
+                seconds = math.ceil(retry_after)
+                response = jsonify(
+                    {"error": "Too many requests", "retry_after": seconds}
+                )
+                response.headers["Retry-After"] = str(seconds)
+                return response, 429
+            return view(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def init_rate_limit(app, storage="memory"):
+    if not app.config.get("RATE_LIMIT_ENABLED", True):
+        return
+    if storage not in STORES:
+        raise ValueError(f"Invalid rate limit storage: {storage}")
+    app.extensions["rate_limit"] = STORES[storage]()
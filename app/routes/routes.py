@@ -2,6 +2,9 @@ from app.blueprints.api import api
 from app.blueprints.auth import auth
 from app.blueprints.budget_api import budget_api
 from app.blueprints.bills_api import bills_api
+from app.blueprints.analytics_api import analytics_api
+from app.blueprints.admin_api import admin_api
+from app.blueprints.events_api import events_api
 
 
 def init_routes(app):
@@ -9,3 +12,6 @@ def init_routes(app):
     app.register_blueprint(auth, url_prefix="/api")
     app.register_blueprint(budget_api, url_prefix="/api")
     app.register_blueprint(bills_api, url_prefix="/api")
+    app.register_blueprint(analytics_api, url_prefix="/api")
+    app.register_blueprint(admin_api, url_prefix="/api")
+    app.register_blueprint(events_api, url_prefix="/api")
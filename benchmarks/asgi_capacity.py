@@ -0,0 +1,187 @@
+"""Concurrent connection capacity, sync gunicorn against the ASGI entry point.
+
+Usage:
+    python benchmarks/asgi_capacity.py [--database-url URL] [--users 20]
+        [--transactions 500] [--levels 8,32,128] [--requests-per-connection 10]
+        [--workers 4] [--db-latency-ms 0] [--output results.json]
+
+The database is seeded like load_test.py. Both servers get the same worker
+count, ``gunicorn -w <workers> run:app`` and ``uvicorn asgi:app --workers
+<workers>``, and for every --levels entry that many keep-alive connections
+read GET /api/transactions, /api/bills and /api/budgets in turn. A sync
+worker serves one connection at a time and the rest wait in the listen
+queue, an ASGI worker keeps serving while its queries wait on the database.
+Reported per server and level: throughput, p50/p99 latency and errors.
+
+With --db-latency-ms the servers reach PostgreSQL through a local proxy that
+holds every reply for that long, like a database in another zone. That is
+where the two models differ, on a local database both are CPU bound.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import PASSWORD, run_endpoint, seed, start_server  # noqa: E402
+
+PATHS = ["/api/transactions", "/api/bills", "/api/budgets"]
+
+
+class LatencyProxy(threading.Thread):
+    """TCP proxy to PostgreSQL that delays every reply by ``delay`` seconds."""
+
+    def __init__(self, database_url, delay):
+        super().__init__(daemon=True)
+        from sqlalchemy.engine import make_url
+
+        self.url = make_url(database_url)
+        self.delay = delay
+        self.ready = threading.Event()
+
+    def proxied_url(self):
+        query = {k: v for k, v in self.url.query.items() if k != "host"}
+        return self.url.set(host="127.0.0.1", port=self.port, query=query)
+
+    async def _connect(self):
+        # libpq style ?host=/dir points at a unix socket directory
+        host = self.url.query.get("host")
+        if host and host.startswith("/"):
+            path = os.path.join(host, f".s.PGSQL.{self.url.port or 5432}")
+            return await asyncio.open_unix_connection(path)
+        return await asyncio.open_connection(
+            self.url.host or "127.0.0.1", self.url.port or 5432
+        )
+
+    async def _pipe(self, reader, writer, delay):
+        try:
+            while data := await reader.read(65536):
+                if delay:
+                    await asyncio.sleep(delay)
+                writer.write(data)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _client(self, client_reader, client_writer):
+        server_reader, server_writer = await self._connect()
+        await asyncio.gather(
+            self._pipe(client_reader, server_writer, 0),
+            self._pipe(server_reader, client_writer, self.delay),
+        )
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._client, "127.0.0.1", 0)
+        self.port = server.sockets[0].getsockname()[1]
+        self.ready.set()
+        await server.serve_forever()
+
+    def run(self):
+        asyncio.run(self._serve())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--transactions", type=int, default=500)
+    parser.add_argument("--levels", default="8,32,128")
+    parser.add_argument("--requests-per-connection", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--db-latency-ms", type=float, default=0)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    levels = [int(level) for level in args.levels.split(",")]
+
+    database_url = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    os.environ["POSTGRESQL_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+    # every connection can get a database connection, on either server
+    os.environ.setdefault("DB_MAX_OVERFLOW", str(max(levels)))
+    os.environ.setdefault("ASGI_WSGI_THREADS", str(max(levels)))
+
+    from app import create_app
+
+    users = seed(create_app(), args.users, 2, args.transactions)
+
+    if args.db_latency_ms:
+        if not database_url.startswith("postgresql"):
+            parser.error("--db-latency-ms needs a PostgreSQL --database-url")
+        proxy = LatencyProxy(database_url, args.db_latency_ms / 1000)
+        proxy.start()
+        proxy.ready.wait()
+        os.environ["POSTGRESQL_URL"] = proxy.proxied_url().render_as_string(
+            hide_password=False
+        )
+
+    results = []
+    for server in ("gunicorn", "uvicorn"):
+        process, target = start_server(server, dict(os.environ), args.workers)
+        try:
+            tokens = []
+            for user in users:
+                status, body = target.request(
+                    "POST",
+                    "/api/login",
+                    json={"username": user["username"], "password": PASSWORD},
+                )
+                if status != 200:
+                    raise RuntimeError(f"login failed for {user['username']}: {body}")
+                tokens.append(body["access_token"])
+
+            def make_request(i):
+                return "GET", PATHS[i % len(PATHS)], None, tokens[i % len(tokens)], 200
+
+            for level in levels:
+                result = run_endpoint(
+                    target,
+                    "GET reads",
+                    make_request,
+                    level * args.requests_per_connection,
+                    level,
+                )
+                results.append({"server": server, "connections": level, **result})
+        finally:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "config": {
+            "database": database_url.split("://")[0],
+            "workers": args.workers,
+            "users": args.users,
+            "transactions_per_user": args.transactions,
+            "requests_per_connection": args.requests_per_connection,
+            "db_latency_ms": args.db_latency_ms,
+        },
+        "results": results,
+    }
+
+    print(
+        f"{'server':<10} {'connections':>11} {'rps':>8} {'p50 ms':>8} "
+        f"{'p99 ms':>8} {'errors':>7}"
+    )
+    for result in results:
+        print(
+            f"{result['server']:<10} {result['connections']:>11} "
+            f"{result['throughput_rps']:>8} {result['p50_ms']:>8} "
+            f"{result['p99_ms']:>8} {result['errors']:>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
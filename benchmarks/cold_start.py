@@ -0,0 +1,100 @@
+"""Worker cold start time, with and without AUTO_BOOTSTRAP.
+
+Usage:
+    python benchmarks/cold_start.py [--database-url URL] [--runs 5] [--json]
+
+Each run is a fresh interpreter, like a new gunicorn worker, that imports the
+app and calls create_app(). Reported per mode: median import time, median
+create_app() time and the number of SQL statements sent during startup.
+Without --database-url a SQLite file stands in for PostgreSQL.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER = """
+import json, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *args: statements.append(1))
+from app import create_app
+imported = time.perf_counter()
+create_app()
+booted = time.perf_counter()
+print(json.dumps({
+    "import_s": imported - started,
+    "create_app_s": booted - imported,
+    "statements": len(statements),
+}))
+"""
+
+
+def boot(env):
+    output = subprocess.run(
+        [sys.executable, "-c", WORKER],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON only.")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["POSTGRESQL_URL"] = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    env.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+
+    # the first boot creates the schema so both modes start from the same state
+    boot(dict(env, AUTO_BOOTSTRAP="true"))
+
+    results = []
+    for auto_bootstrap in ("true", "false"):
+        runs = [
+            boot(dict(env, AUTO_BOOTSTRAP=auto_bootstrap)) for _ in range(args.runs)
+        ]
+        results.append(
+            {
+                "auto_bootstrap": auto_bootstrap == "true",
+                "import_ms": round(
+                    statistics.median(r["import_s"] for r in runs) * 1000, 1
+                ),
+                "create_app_ms": round(
+                    statistics.median(r["create_app_s"] for r in runs) * 1000, 1
+                ),
+                "statements": runs[-1]["statements"],
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'auto_bootstrap':<15} {'import ms':>10} {'create_app ms':>14} {'sql':>5}")
+    for result in results:
+        print(
+            f"{str(result['auto_bootstrap']):<15} {result['import_ms']:>10} "
+            f"{result['create_app_ms']:>14} {result['statements']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Compare the JSON providers on transaction list payloads.
+
+Usage:
+    python benchmarks/json_providers.py [--rows 10000] [--repeat 20]
+
+Each provider encodes the same list of transaction rows (the shape returned
+by GET /api/transactions, with Decimal amounts and aware datetimes), best and
+median wall time per encode are reported.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from app.json_provider import PROVIDERS, orjson
+
+
+def make_payload(rows):
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "amount": Decimal(f"{(i * 7919) % 100000}.{i % 100:02d}"),
+            "transaction_type": "transfer" if i % 3 else "payment",
+            "description": f"Transaction {i}",
+            "from_account_id": i % 500,
+            "to_account_id": (i + 1) % 500 if i % 3 else None,
+            "category": None if i % 3 else "Essential",
+            "created_at": start + timedelta(seconds=i * 37),
+            "from_account": f"{1000000000000000 + i}",
+            "to_account": f"{2000000000000000 + i}" if i % 3 else None,
+        }
+        for i in range(rows)
+    ]
+
+
+def bench(provider, payload, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        provider.dumps(payload, separators=(",", ":"))
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = make_payload(args.rows)
+
+    results = []
+    for name, provider_class in PROVIDERS.items():
+        if name == "orjson" and not orjson:
+            print("orjson is not installed, skipping", file=sys.stderr)
+            continue
+        for decimal_as_string in (False, True):
+            provider = provider_class(app)
+            provider.decimal_as_string = decimal_as_string
+            timings = bench(provider, payload, args.repeat)
+            results.append(
+                {
+                    "provider": name,
+                    "decimal_as_string": decimal_as_string,
+                    "rows": args.rows,
+                    "best_ms": round(min(timings) * 1000, 2),
+                    "median_ms": round(statistics.median(timings) * 1000, 2),
+                }
+            )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'provider':<10} {'amounts':<8} {'best ms':>10} {'median ms':>10}")
+    for result in results:
+        amounts = "string" if result["decimal_as_string"] else "number"
+        print(
+            f"{result['provider']:<10} {amounts:<8} "
+            f"{result['best_ms']:>10} {result['median_ms']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
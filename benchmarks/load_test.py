@@ -0,0 +1,403 @@
+"""Throughput and latency benchmark for the core banking endpoints.
+
+Usage:
+    python benchmarks/load_test.py [--database-url URL] [--users 20]
+        [--accounts 2] [--transactions 500] [--requests 200]
+        [--concurrency 8] [--server testclient|gunicorn|uvicorn] [--workers 4]
+        [--output results.json]
+
+The database is wiped and seeded with N users, each with M accounts and K
+transactions (plus a few bills and budgets). Without --database-url a SQLite
+file in a temporary directory stands in for PostgreSQL.
+
+Every endpoint gets --requests calls spread over --concurrency threads:
+
+    POST /api/login, POST /api/transactions, GET /api/transactions,
+    GET /api/bills, GET /api/budgets
+
+--server testclient runs the app in-process through Flask's test client,
+--server gunicorn starts ``gunicorn -w <workers> run:app`` and goes over
+HTTP, --server uvicorn does the same with the ASGI entry point
+(``uvicorn asgi:app --workers <workers>``). Results (throughput and p50/p95/p99 latency per endpoint) are printed
+and, with --output, written as JSON so runs can be compared between releases.
+"""
+
+import argparse
+import http.client
+import json as jsonlib
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PASSWORD = "Bench@1234"
+
+
+def percentile(values, pct):
+    # nearest-rank percentile of an already sorted list
+    if not values:
+        return None
+    rank = max(1, round(pct / 100 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+def seed(app, users, accounts_per_user, transactions_per_user):
+    from sqlalchemy import insert
+    from werkzeug.security import generate_password_hash
+    from app.models import db, Account, Bill, Budget, Transaction, User
+
+    rng = random.Random(42)
+    now = datetime.now(timezone.utc)
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        from app.models.seeders import seed_transaction_categories
+
+        seed_transaction_categories()
+
+        # hashing is deliberately slow, every user shares one hash
+        password_hash = generate_password_hash(PASSWORD)
+        user_ids = db.session.scalars(
+            insert(User).returning(User.id),
+            [
+                {
+                    "username": f"bench{i}",
+                    "email": f"bench{i}@example.com",
+                    "password_hash": password_hash,
+                    "first_name": "Bench",
+                    "last_name": f"User{i}",
+                }
+                for i in range(users)
+            ],
+        ).all()
+
+        account_rows = []
+        for n, user_id in enumerate(user_ids):
+            for j in range(accounts_per_user):
+                account_rows.append(
+                    {
+                        "account_number": f"{9000000000000000 + n * 100 + j}",
+                        "account_type": "savings" if j == 0 else "checking",
+                        "balance": Decimal("10000000.00"),
+                        "is_main": j == 0,
+                        "user_id": user_id,
+                    }
+                )
+        account_ids = db.session.scalars(
+            insert(Account).returning(Account.id), account_rows
+        ).all()
+        accounts_by_user = {}
+        for row, account_id in zip(account_rows, account_ids):
+            accounts_by_user.setdefault(row["user_id"], []).append(account_id)
+
+        transaction_rows = []
+        bill_rows = []
+        budget_rows = []
+        for user_id, owned in accounts_by_user.items():
+            for k in range(transactions_per_user):
+                kind = rng.choice(["deposit", "withdrawal", "transfer", "payment"])
+                transaction_rows.append(
+                    {
+                        "amount": Decimal(rng.randint(1, 50000)) / 100,
+                        "transaction_type": kind,
+                        "description": "",
+                        "created_at": now - timedelta(minutes=k),
+                        "from_account_id": rng.choice(owned),
+                        "to_account_id": (
+                            rng.choice(account_ids) if kind == "transfer" else None
+                        ),
+                        "category_id": 1 if kind == "payment" else None,
+                    }
+                )
+            for k in range(5):
+                bill_rows.append(
+                    {
+                        "biller_name": f"Biller {k}",
+                        "due_date": now + timedelta(days=k + 1),
+                        "amount": Decimal("10.00"),
+                        "status": "pending",
+                        "user_id": user_id,
+                        "account_id": owned[0],
+                        "category_id": 1,
+                    }
+                )
+            budget_rows.append(
+                {
+                    "name": "Bench budget",
+                    "amount": Decimal("1000000.00"),
+                    "remaining_amount": Decimal("1000000.00"),
+                    "start_date": now,
+                    "end_date": now + timedelta(days=30),
+                    "user_id": user_id,
+                    "category_id": 2,
+                }
+            )
+
+        for chunk in range(0, len(transaction_rows), 5000):
+            db.session.execute(
+                insert(Transaction), transaction_rows[chunk : chunk + 5000]
+            )
+        db.session.execute(insert(Bill), bill_rows)
+        db.session.execute(insert(Budget), budget_rows)
+        db.session.commit()
+
+        return [
+            {"username": f"bench{i}", "account_id": accounts_by_user[user_id][0]}
+            for i, user_id in enumerate(user_ids)
+        ]
+
+
+class TestClientTarget:
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, token=None):
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = client.open(path, method=method, json=json, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+
+class HttpTarget:
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._local = threading.local()
+
+    def request(self, method, path, json=None, token=None):
+        # one keep-alive connection per benchmark thread
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(
+                self.host, self.port, timeout=30
+            )
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        body = jsonlib.dumps(json) if json is not None else None
+        connection.request(method, path, body=body, headers=headers)
+        response = connection.getresponse()
+        payload = response.read()
+        try:
+            return response.status, jsonlib.loads(payload)
+        except ValueError:
+            return response.status, None
+
+
+SERVERS = {
+    "gunicorn": lambda port, workers: [
+        "gunicorn",
+        "-w",
+        str(workers),
+        "-b",
+        f"127.0.0.1:{port}",
+        "run:app",
+    ],
+    "uvicorn": lambda port, workers: [
+        "uvicorn",
+        "--workers",
+        str(workers),
+        "--port",
+        str(port),
+        "--no-access-log",
+        "asgi:app",
+    ],
+}
+
+
+def start_server(server, env, workers):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", *SERVERS[server](port, workers)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=1):
+                return process, HttpTarget("127.0.0.1", port)
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"{server} did not come up within 60 seconds")
+
+
+def run_endpoint(target, name, make_request, total, concurrency):
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    counter = iter(range(total))
+
+    def worker():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            method, path, body, token, expected = make_request(i)
+            start = time.perf_counter()
+            status, _ = target.request(method, path, json=body, token=token)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                if status != expected:
+                    errors.append(status)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "endpoint": name,
+        "requests": total,
+        "errors": len(errors),
+        "throughput_rps": round(total / duration, 1),
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=2)
+    parser.add_argument("--transactions", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--server", choices=["testclient", *SERVERS], default="testclient"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    database_url = args.database_url or (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    os.environ["POSTGRESQL_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    # measure the endpoints, not the throttling
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    from app import create_app
+
+    app = create_app()
+    users = seed(app, args.users, args.accounts, args.transactions)
+
+    process = None
+    if args.server in SERVERS:
+        process, target = start_server(args.server, dict(os.environ), args.workers)
+    else:
+        target = TestClientTarget(app)
+
+    try:
+        tokens = []
+        for user in users:
+            status, body = target.request(
+                "POST",
+                "/api/login",
+                json={"username": user["username"], "password": PASSWORD},
+            )
+            if status != 200:
+                raise RuntimeError(f"login failed for {user['username']}: {body}")
+            tokens.append(body["access_token"])
+
+        def pick(i):
+            return users[i % len(users)], tokens[i % len(tokens)]
+
+        def login(i):
+            user, _ = pick(i)
+            body = {"username": user["username"], "password": PASSWORD}
+            return "POST", "/api/login", body, None, 200
+
+        def create_transaction(i):
+            user, token = pick(i)
+            body = {
+                "account_id": user["account_id"],
+                "amount": 1,
+                "transaction_type": "deposit",
+            }
+            return "POST", "/api/transactions", body, token, 201
+
+        def get(path):
+            def make_request(i):
+                _, token = pick(i)
+                return "GET", path, None, token, 200
+
+            return make_request
+
+        endpoints = [
+            ("POST /api/login", login),
+            ("POST /api/transactions", create_transaction),
+            ("GET /api/transactions", get("/api/transactions")),
+            ("GET /api/bills", get("/api/bills")),
+            ("GET /api/budgets", get("/api/budgets")),
+        ]
+        results = [
+            run_endpoint(target, name, make_request, args.requests, args.concurrency)
+            for name, make_request in endpoints
+        ]
+    finally:
+        if process:
+            process.terminate()
+            process.wait()
+
+    report = {
+        "config": {
+            "database": database_url.split("://")[0],
+            "server": args.server,
+            "workers": args.workers if args.server in SERVERS else None,
+            "users": args.users,
+            "accounts_per_user": args.accounts,
+            "transactions_per_user": args.transactions,
+            "requests_per_endpoint": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "results": results,
+    }
+
+    print(
+        f"{'endpoint':<26} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}"
+    )
+    for result in results:
+        print(
+            f"{result['endpoint']:<26} {result['throughput_rps']:>8} "
+            f"{result['p50_ms']:>8} {result['p95_ms']:>8} {result['p99_ms']:>8} "
+            f"{result['errors']:>7}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            jsonlib.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
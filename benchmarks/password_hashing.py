@@ -0,0 +1,121 @@
+"""Login throughput per core for each password hashing setting.
+
+Usage:
+    python benchmarks/password_hashing.py [--logins 20] [--json]
+        [--method scrypt --method pbkdf2:sha256:600000 ...]
+
+For every PASSWORD_HASH_METHOD it measures hashing and verifying on their own
+and POST /api/login end to end through the Flask test client (SQLite file,
+one thread), which is what a single worker core can sustain.
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from app.passwords import argon2, hash_password, verify_password  # noqa: E402
+
+PASSWORD = "Bench@1234"
+DEFAULT_METHODS = [
+    "scrypt",
+    "scrypt:16384:8:1",
+    "pbkdf2:sha256:1000000",
+    "pbkdf2:sha256:600000",
+    "argon2id",
+    "argon2id:2:19456:1",
+]
+
+
+def per_second(fn, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return repeat / (time.perf_counter() - started)
+
+
+def login_throughput(method, logins):
+    from app import create_app
+    from app.models import db, User
+
+    os.environ["PASSWORD_HASH_METHOD"] = method
+    app = create_app()
+    with app.app_context():
+        db.session.execute(db.delete(User))
+        db.session.add(
+            User(
+                username="bench",
+                email="bench@example.com",
+                password_hash=hash_password(PASSWORD),
+                first_name="Bench",
+                last_name="User",
+            )
+        )
+        db.session.commit()
+
+    client = app.test_client()
+    body = {"username": "bench", "password": PASSWORD}
+
+    def login():
+        response = client.post("/api/login", json=body)
+        assert response.status_code == 200, response.get_json()
+
+    login()  # warm up
+    return per_second(login, logins)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--method", action="append", dest="methods")
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print JSON only.")
+    args = parser.parse_args()
+
+    os.environ["POSTGRESQL_URL"] = (
+        f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    )
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-0123456789abcdef")
+    # measure the endpoints, not the throttling
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    results = []
+    for method in args.methods or DEFAULT_METHODS:
+        if method.startswith("argon2") and argon2 is None:
+            continue
+        password_hash = hash_password(PASSWORD, method)
+        results.append(
+            {
+                "method": method,
+                "hash_per_s": round(
+                    per_second(lambda: hash_password(PASSWORD, method), args.logins),
+                    1,
+                ),
+                "verify_per_s": round(
+                    per_second(
+                        lambda: verify_password(password_hash, PASSWORD), args.logins
+                    ),
+                    1,
+                ),
+                "login_per_s": round(login_throughput(method, args.logins), 1),
+            }
+        )
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'method':<24} {'hash/s':>8} {'verify/s':>9} {'login/s':>8}")
+    for result in results:
+        print(
+            f"{result['method']:<24} {result['hash_per_s']:>8} "
+            f"{result['verify_per_s']:>9} {result['login_per_s']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
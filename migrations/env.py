@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from app.database import without_statement_timeout
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -95,6 +97,8 @@ def run_migrations_online():
         conf_args["process_revision_directives"] = process_revision_directives
 
     connectable = get_engine()
+    # the request statement timeout would cut long migrations short
+    without_statement_timeout(connectable)
 
     with connectable.connect() as connection:
         context.configure(
@@ -0,0 +1,29 @@
+"""add account number sequence
+
+Revision ID: 5d2c7e9b4f18
+Revises: 0b6d4e83a7f1
+Create Date: 2026-10-18 13:42:07.215306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2c7e9b4f18'
+down_revision = '0b6d4e83a7f1'
+branch_labels = None
+depends_on = None
+
+# each nextval() reserves a block of 100 account numbers for one process
+account_number_seq = sa.Sequence('account_number_seq', start=10**14, increment=100)
+
+
+def upgrade():
+    if op.get_bind().dialect.supports_sequences:
+        op.execute(sa.schema.CreateSequence(account_number_seq, if_not_exists=True))
+
+
+def downgrade():
+    if op.get_bind().dialect.supports_sequences:
+        op.execute(sa.schema.DropSequence(account_number_seq, if_exists=True))
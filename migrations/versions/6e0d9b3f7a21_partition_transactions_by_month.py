@@ -0,0 +1,118 @@
+"""partition transactions by month
+
+Revision ID: 6e0d9b3f7a21
+Revises: 42376af89637
+Create Date: 2026-10-18 18:21:45.903114
+
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e0d9b3f7a21'
+down_revision = '42376af89637'
+branch_labels = None
+depends_on = None
+
+# PostgreSQL only, other databases keep the plain table. The table is
+# rebuilt and every row copied, which holds an exclusive lock on
+# transactions for the duration: run it in a maintenance window.
+
+COLUMNS = (
+    'id, amount, transaction_type, description, created_at, '
+    'from_account_id, to_account_id, category_id'
+)
+MONTHS_AHEAD = 3
+
+
+def _month(year, month):
+    return datetime(year + (month - 1) // 12, (month - 1) % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_table(created_at, partition_by=''):
+    # the columns of the original table, constraints and indexes come after
+    # the rows are in
+    op.execute(f"""
+        CREATE TABLE transactions (
+            id INTEGER NOT NULL DEFAULT nextval('transactions_id_seq'),
+            amount NUMERIC(10, 2),
+            transaction_type VARCHAR(50) NOT NULL,
+            description VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE {created_at},
+            from_account_id INTEGER NOT NULL,
+            to_account_id INTEGER,
+            category_id INTEGER
+        ) {partition_by}
+    """)
+
+
+def _set_aside_table():
+    # the id sequence stays, the new table takes it over
+    op.execute('ALTER SEQUENCE transactions_id_seq OWNED BY NONE')
+    op.execute('ALTER TABLE transactions RENAME TO transactions_old')
+
+
+def _fill_table(select_columns, primary_key):
+    op.execute(f'INSERT INTO transactions ({COLUMNS}) SELECT {select_columns} FROM transactions_old')
+    op.execute('DROP TABLE transactions_old')
+    op.execute('ALTER SEQUENCE transactions_id_seq OWNED BY transactions.id')
+
+    op.create_primary_key('transactions_pkey', 'transactions', primary_key)
+    op.create_foreign_key('transactions_from_account_id_fkey', 'transactions', 'accounts', ['from_account_id'], ['id'])
+    op.create_foreign_key('transactions_to_account_id_fkey', 'transactions', 'accounts', ['to_account_id'], ['id'])
+    op.create_foreign_key('transactions_category_id_fkey', 'transactions', 'transaction_categories', ['category_id'], ['id'])
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('ix_transactions_from_account_id_created_at', ['from_account_id', 'created_at'], unique=False)
+        batch_op.create_index('ix_transactions_to_account_id_created_at', ['to_account_id', 'created_at'], unique=False)
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # every row is copied, don't let a statement timeout stop it halfway
+    op.execute('SET LOCAL statement_timeout = 0')
+
+    # a primary key on a partitioned table must hold the partition key, so
+    # ids are only unique per month and can't be referenced by a foreign key
+    op.drop_constraint('balance_snapshots_transaction_id_fkey', 'balance_snapshots', type_='foreignkey')
+
+    _set_aside_table()
+    _create_table('NOT NULL', 'PARTITION BY RANGE (created_at)')
+
+    # one partition per month from the oldest row to a few months ahead,
+    # the default partition takes anything past that
+    oldest = op.get_bind().execute(sa.text(
+        "SELECT date_trunc('month', min(created_at) AT TIME ZONE 'UTC') FROM transactions_old"
+    )).scalar()
+    now = datetime.now(timezone.utc)
+    month = _month(*(oldest or now).timetuple()[:2])
+    last = _month(now.year, now.month + MONTHS_AHEAD)
+    while month <= last:
+        following = _month(month.year, month.month + 1)
+        op.execute(
+            f"CREATE TABLE transactions_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF transactions FOR VALUES "
+            f"FROM ('{month.isoformat()}') TO ('{following.isoformat()}')"
+        )
+        month = following
+    op.execute('CREATE TABLE transactions_default PARTITION OF transactions DEFAULT')
+
+    _fill_table(COLUMNS.replace('created_at', 'COALESCE(created_at, now())'), ['id', 'created_at'])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    # every row is copied, don't let a statement timeout stop it halfway
+    op.execute('SET LOCAL statement_timeout = 0')
+
+    # detached months stay as they are, archived months are gone; snapshots
+    # of either would fail the foreign key below
+    _set_aside_table()
+    _create_table('')
+    _fill_table(COLUMNS, ['id'])
+
+    op.create_foreign_key('balance_snapshots_transaction_id_fkey', 'balance_snapshots', 'transactions', ['transaction_id'], ['id'])
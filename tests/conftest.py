@@ -0,0 +1,114 @@
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PASSWORD = "Passw0rd!"
+
+
+def _clear_process_caches():
+    # module level caches outlive the app, ids repeat across test databases
+    from app.models.principal import invalidate_principal
+    from app.models.reference_cache import invalidate_categories
+
+    invalidate_principal()
+    invalidate_categories()
+
+
+def make_app(database_url, **env):
+    environ = {
+        "POSTGRESQL_URL": database_url,
+        "JWT_SECRET_KEY": "test-secret-key-0123456789abcdef",
+        "RATE_LIMIT_ENABLED": "false",
+        "AUTO_BOOTSTRAP": "true",
+        **env,
+    }
+    saved = {key: os.environ.get(key) for key in environ}
+    os.environ.update(environ)
+    try:
+        from app import create_app
+
+        _clear_process_caches()
+        return create_app()
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = make_app(f"sqlite:///{tmp_path / 'test.db'}")
+    yield app
+    with app.app_context():
+        from app.models import db
+
+        db.engine.dispose()
+    _clear_process_caches()
+
+
+@pytest.fixture
+def pg_url():
+    """A throwaway database next to TEST_POSTGRESQL_URL, skips without one."""
+    url = os.environ.get("TEST_POSTGRESQL_URL")
+    if not url:
+        pytest.skip("TEST_POSTGRESQL_URL is not set")
+    from sqlalchemy.engine import make_url
+    from sqlalchemy_utils import create_database, drop_database
+
+    url = make_url(url).set(database=f"test_{uuid.uuid4().hex[:8]}")
+    url = url.render_as_string(hide_password=False)
+    create_database(url)
+    try:
+        yield url
+    finally:
+        drop_database(url)
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def register(client, username):
+    """Create a user with a main account, return ``(account, headers)``."""
+    response = client.post(
+        "/api/users",
+        json={
+            "username": username,
+            "email": f"{username}@example.com",
+            "password": PASSWORD,
+            "first_name": username,
+            "last_name": "Test",
+        },
+    )
+    assert response.status_code == 201, response.get_json()
+    token = client.post(
+        "/api/login", json={"username": username, "password": PASSWORD}
+    ).get_json()["access_token"]
+    return response.get_json()["account"], {"Authorization": f"Bearer {token}"}
+
+
+@contextmanager
+def count_statements(app):
+    """Count the SQL statements sent to the app's database."""
+    from app.models import db
+
+    with app.app_context():
+        engine = db.engine
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,32 @@
+import pytest
+from conftest import register
+from app.models.account_numbers import is_valid_account_number, luhn_check_digit
+
+
+@pytest.mark.parametrize(
+    "body, digit",
+    [("7992739871", "3"), ("453914880343646", "7"), ("100000000000000", "8")],
+)
+def test_luhn_check_digit(body, digit):
+    assert luhn_check_digit(body) == digit
+
+
+def test_account_numbers_catch_typos():
+    number = "1000000000000008"
+    assert is_valid_account_number(number)
+    assert not is_valid_account_number(number[:-1] + "9")  # wrong digit
+    assert not is_valid_account_number("0100000000000008")  # swapped digits
+    assert not is_valid_account_number(number[1:])  # too short
+    assert not is_valid_account_number("100000000000000x")
+
+
+def test_a_taken_number_is_replaced(client, monkeypatch):
+    from app.models import account
+
+    alice, _ = register(client, "alice")
+    # the first number bob gets is alice's, the commit is retried
+    numbers = iter([alice["account_number"], "1000000000000008"])
+    monkeypatch.setattr(account, "next_account_number", lambda: next(numbers))
+
+    bob, _ = register(client, "bob")
+    assert bob["account_number"] == "1000000000000008"
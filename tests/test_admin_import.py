@@ -0,0 +1,48 @@
+import json
+from conftest import PASSWORD, make_app
+
+ADMIN_KEY = "test-admin-key"
+
+
+def import_users(client, count):
+    body = "".join(
+        json.dumps(
+            {
+                "username": f"user{i}",
+                "email": f"user{i}@example.com",
+                "password": PASSWORD,
+                "first_name": "User",
+                "last_name": str(i),
+            }
+        )
+        + "\n"
+        for i in range(count)
+    )
+    return client.post(
+        "/api/admin/users/import",
+        data=body,
+        content_type="application/x-ndjson",
+        headers={"X-Admin-Key": ADMIN_KEY},
+    )
+
+
+def test_imports_past_the_row_limit_are_turned_down(tmp_path):
+    from sqlalchemy import func, select
+    from app.models import User, db
+
+    app = make_app(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        ADMIN_API_KEY=ADMIN_KEY,
+        ADMIN_IMPORT_MAX_ROWS="3",
+    )
+    client = app.test_client()
+
+    response = import_users(client, 4)
+    assert response.status_code == 413
+    assert "flask users import" in response.get_json()["error"]
+    with app.app_context():
+        assert db.session.scalar(select(func.count(User.id))) == 0
+
+    response = import_users(client, 3)
+    assert response.status_code == 201, response.get_json()
+    assert response.get_json()["created"] == 3
@@ -0,0 +1,84 @@
+import asyncio
+import pytest
+from conftest import register
+
+pytest.importorskip("asgiref")
+pytest.importorskip("aiosqlite")
+
+
+def asgi_get(asgi_app, path, headers, query_string=""):
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "query_string": query_string.encode(),
+        "headers": [(key.lower().encode(), value.encode()) for key, value in headers],
+        "http_version": "1.1",
+        "scheme": "http",
+        "server": ("localhost", 80),
+        "client": ("127.0.0.1", 50000),
+        "root_path": "",
+    }
+    response = {"body": b""}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        else:
+            response["body"] += message.get("body", b"")
+
+    async def call():
+        await asgi_app(scope, receive, send)
+        for engine in asgi_app.engines.values():
+            await engine.dispose()
+
+    asyncio.run(call())
+    return response
+
+
+def test_both_modes_answer_the_same(app, client):
+    from app.asgi import create_asgi_app
+
+    alice, alice_headers = register(client, "alice")
+    _, bob_headers = register(client, "bob")
+    client.post(
+        "/api/transactions",
+        json={"account_id": alice["id"], "amount": 10, "transaction_type": "deposit"},
+        headers=alice_headers,
+    )
+    client.post(
+        "/api/transactions",
+        json={"account_id": alice["id"], "amount": 3, "transaction_type": "withdrawal"},
+        headers=alice_headers,
+    )
+    balance = f"/api/accounts/{alice['id']}/balance"
+    cases = [
+        ("/api/users/me", alice_headers, ""),
+        ("/api/transactions", alice_headers, ""),
+        ("/api/transactions", alice_headers, "limit=1"),
+        ("/api/transactions", alice_headers, "limit=abc"),
+        ("/api/transactions/1", alice_headers, ""),
+        ("/api/transactions/1", bob_headers, ""),
+        ("/api/transactions/999", alice_headers, ""),
+        (balance, alice_headers, ""),
+        (balance, alice_headers, "at=2099-01-01T00:00:00"),
+        (balance, bob_headers, ""),
+        ("/api/bills", alice_headers, ""),
+        ("/api/budgets", alice_headers, ""),
+        ("/api/budgets", {"Authorization": "Bearer junk"}, ""),
+    ]
+
+    asgi_app = create_asgi_app(app)
+    for path, headers, query_string in cases:
+        flask = client.get(path, headers=headers, query_string=query_string)
+        asgi = asgi_get(asgi_app, path, dict(headers).items(), query_string)
+        case = (path, query_string)
+        assert asgi["status"] == flask.status_code, case
+        assert asgi["body"] == flask.get_data(), case
+        assert asgi["headers"].get(b"x-next-cursor", b"").decode() == (
+            flask.headers.get("X-Next-Cursor", "")
+        ), case
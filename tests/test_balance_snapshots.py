@@ -0,0 +1,69 @@
+from conftest import make_app, register
+
+
+def test_the_balance_at_a_point_in_time(client):
+    account, headers = register(client, "alice")
+    for amount, transaction_type in ((10, "deposit"), (3, "withdrawal")):
+        response = client.post(
+            "/api/transactions",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "transaction_type": transaction_type,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201, response.get_json()
+    last = response.get_json()["id"]
+
+    def balance_at(at):
+        response = client.get(
+            f"/api/accounts/{account['id']}/balance",
+            query_string={"at": at},
+            headers=headers,
+        )
+        assert response.status_code == 200, response.get_json()
+        body = response.get_json()
+        return body["balance"], body["transaction_id"]
+
+    assert balance_at("2000-01-01T00:00:00") == (0.0, None)
+    # both snapshots may share a timestamp, the later one wins
+    assert balance_at("2099-01-01T00:00:00") == (7.0, last)
+
+
+def test_a_snapshot_written_last_is_the_latest(pg_url):
+    from datetime import datetime, timezone
+    from sqlalchemy import insert
+    from app.models import db
+    from app.models.balance_snapshot import BalanceSnapshot
+
+    app = make_app(pg_url)
+    client = app.test_client()
+    account, headers = register(client, "alice")
+    with app.app_context():
+        engine = db.engine
+
+    with engine.connect() as early:
+        # a writer whose transaction began before another one committed
+        early.exec_driver_sql("SELECT 1")
+        client.post(
+            "/api/transactions",
+            json={
+                "account_id": account["id"],
+                "amount": 10,
+                "transaction_type": "deposit",
+            },
+            headers=headers,
+        )
+        early.execute(
+            insert(BalanceSnapshot),
+            [{"account_id": account["id"], "balance_after": 15, "transaction_id": 0}],
+        )
+        early.commit()
+
+    with engine.connect() as connection:
+        latest = connection.execute(
+            BalanceSnapshot.latest_before(account["id"], datetime.now(timezone.utc))
+        ).one()
+    assert latest.transaction_id == 0
+    engine.dispose()
@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from conftest import register
+
+
+def add_bill(app, account, due_date):
+    from app.models import Bill, db
+
+    with app.app_context():
+        bill = Bill(
+            biller_name="Power",
+            amount=Decimal("50.00"),
+            due_date=due_date,
+            auto_pay=True,
+            user_id=account["user_id"],
+            account_id=account["id"],
+            category_id=1,
+        )
+        db.session.add(bill)
+        db.session.commit()
+        return bill.id
+
+
+def sweep(app, now):
+    from app.models.bill_scheduler import sweep_due_bills
+
+    with app.app_context():
+        summary = sweep_due_bills(now=now)
+    return summary["paid"], [bill["id"] for bill in summary["overdue"]]
+
+
+def test_a_failed_auto_payment_is_retried(app, client):
+    account, headers = register(client, "alice")
+    now = datetime(2026, 10, 18, 12, 0)
+    bill_id = add_bill(app, account, now - timedelta(minutes=1))
+
+    # no funds, tried again in an hour
+    assert sweep(app, now) == ([], [bill_id])
+    assert sweep(app, now + timedelta(minutes=30)) == ([], [])
+
+    client.post(
+        "/api/transactions",
+        json={"account_id": account["id"], "amount": 80, "transaction_type": "deposit"},
+        headers=headers,
+    )
+    assert sweep(app, now + timedelta(hours=1)) == ([bill_id], [])
+    assert sweep(app, now + timedelta(days=1)) == ([], [])
+
+
+def test_auto_payment_retries_stop_at_the_cap(app, client):
+    from app.models import Bill, db
+    from app.models.bill_scheduler import MAX_AUTO_PAY_ATTEMPTS
+
+    account, _ = register(client, "bob")
+    now = datetime(2026, 10, 18, 12, 0)
+    bill_id = add_bill(app, account, now)
+
+    attempts = 0
+    for day in range(10):
+        attempts += len(sweep(app, now + timedelta(days=day))[1])
+    assert attempts == MAX_AUTO_PAY_ATTEMPTS
+    with app.app_context():
+        bill = db.session.get(Bill, bill_id)
+        assert bill.status == "overdue"
+        assert bill.next_attempt_at is None
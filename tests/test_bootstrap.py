@@ -0,0 +1,56 @@
+from conftest import make_app
+
+
+def current_revisions(app):
+    from alembic.migration import MigrationContext
+    from app.models import db
+
+    with app.app_context(), db.engine.connect() as connection:
+        return MigrationContext.configure(connection).get_current_heads()
+
+
+def head_revisions(app):
+    from app.database import _migrations
+
+    return tuple(_migrations(app).get_heads())
+
+
+def test_a_new_database_is_stamped(app):
+    assert current_revisions(app) == head_revisions(app)
+
+
+def test_a_new_postgresql_database_is_partitioned(pg_url):
+    from app.models import db
+    from app.models.transaction_partitions import ensure_partitions, is_partitioned
+
+    app = make_app(pg_url)
+    # booting again leaves the tables alone
+    app = make_app(pg_url)
+    try:
+        assert current_revisions(app) == head_revisions(app)
+        with app.app_context():
+            assert is_partitioned(db.session.connection())
+            assert ensure_partitions(months_ahead=0)["created"] == []
+            assert len(ensure_partitions(months_ahead=4)["created"]) == 1
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+
+
+def test_a_migrated_database_is_left_to_the_migrations(tmp_path):
+    from alembic.migration import MigrationContext
+    from sqlalchemy import inspect, text
+    from app.database import _migrations
+    from app.models import db
+
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    app = make_app(url)
+    # a database from before the outbox migration
+    with app.app_context(), db.engine.begin() as connection:
+        connection.execute(text("DROP TABLE outbox_events"))
+        MigrationContext.configure(connection).stamp(_migrations(app), "c47e2b1a9d05")
+
+    app = make_app(url)
+    assert current_revisions(app) == ("c47e2b1a9d05",)
+    with app.app_context():
+        assert not inspect(db.engine).has_table("outbox_events")
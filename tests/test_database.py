@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+import pytest
+from sqlalchemy import event
+from conftest import make_app, register
+
+
+def test_maintenance_commands_run_without_the_statement_timeout(pg_url):
+    from app.models import db
+
+    app = make_app(pg_url, DB_STATEMENT_TIMEOUT_MS="1500")
+
+    def statement_timeout():
+        with app.app_context(), db.engine.connect() as connection:
+            return connection.exec_driver_sql("SHOW statement_timeout").scalar()
+
+    try:
+        assert statement_timeout() == "1500ms"
+        result = app.test_cli_runner().invoke(args=["budgets", "reconcile"])
+        assert result.exit_code == 0, result.output
+        assert statement_timeout() == "0"
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+
+
+@pytest.fixture
+def replica_app(tmp_path, monkeypatch):
+    """An app with an empty SQLite replica next to its SQLite primary."""
+    from app import database
+    from app.models import db
+
+    monkeypatch.setattr(database, "recent_writers", database.RecentWriters())
+    app = make_app(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        REPLICA_DATABASE_URL=f"sqlite:///{tmp_path / 'replica.db'}",
+        REPLICA_STICKY_SECONDS="60",
+    )
+    with app.app_context():
+        db.metadata.create_all(db.engines["replica"])
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@contextmanager
+def routed(app):
+    """Name the engine, primary or replica, of every statement sent."""
+    from app.models import db
+
+    with app.app_context():
+        engines = {
+            "primary": db.engines[None],
+            "replica": db.engines["replica"],
+        }
+    names = []
+
+    def listener(name):
+        def before_cursor_execute(conn, cursor, statement, *args):
+            # SQLite engines send their own BEGIN, see init_sqlite_transactions
+            if statement != "BEGIN":
+                names.append(name)
+
+        return before_cursor_execute
+
+    listeners = {name: listener(name) for name in engines}
+    for name, engine in engines.items():
+        event.listen(engine, "before_cursor_execute", listeners[name])
+    try:
+        yield names
+    finally:
+        for name, engine in engines.items():
+            event.remove(engine, "before_cursor_execute", listeners[name])
+
+
+def deposit(client, account, headers):
+    response = client.post(
+        "/api/transactions",
+        json={"account_id": account["id"], "amount": 5, "transaction_type": "deposit"},
+        headers=headers,
+    )
+    assert response.status_code == 201, response.get_json()
+
+
+def test_reads_go_to_the_replica(replica_app):
+    client = replica_app.test_client()
+    _, headers = register(client, "alice")
+    with routed(replica_app) as names:
+        assert client.get("/api/bills", headers=headers).status_code == 200
+    assert names and set(names) == {"replica"}
+
+
+def test_writes_go_to_the_primary_and_stick_to_it(replica_app):
+    client = replica_app.test_client()
+    account, headers = register(client, "alice")
+    with routed(replica_app) as names:
+        deposit(client, account, headers)
+    assert names and set(names) == {"primary"}
+
+    # the writer reads its own writes for REPLICA_STICKY_SECONDS
+    with routed(replica_app) as names:
+        client.get("/api/bills", headers=headers)
+    assert set(names) == {"primary"}
+
+    replica_app.config["REPLICA_STICKY_SECONDS"] = 0
+    deposit(client, account, headers)
+    with routed(replica_app) as names:
+        client.get("/api/bills", headers=headers)
+    assert set(names) == {"replica"}
+
+
+def test_locks_and_flushes_use_the_primary(replica_app):
+    from sqlalchemy import select
+    from app.models import TransactionCategory, db
+
+    with replica_app.test_request_context("/api/bills"), routed(replica_app) as names:
+        db.session.execute(select(TransactionCategory.id))
+        db.session.execute(select(TransactionCategory.id).with_for_update())
+        db.session.add(TransactionCategory(name="Pets"))
+        db.session.flush()
+        db.session.rollback()
+    assert names[0] == "replica"
+    assert set(names[1:]) == {"primary"}
+
+
+def test_use_primary_pins_the_view(replica_app):
+    client = replica_app.test_client()
+    with routed(replica_app) as names:
+        assert client.get("/api/health").get_json()["status"] == "healthy"
+    assert names and set(names) == {"primary"}
@@ -0,0 +1,135 @@
+import pytest
+from conftest import make_app, register
+
+ADMIN_KEY = "test-admin-key"
+
+
+def make_events_app(database_url):
+    return make_app(database_url, ADMIN_API_KEY=ADMIN_KEY)
+
+
+def read_feed(client, after=None, limit=100):
+    query = {"limit": limit}
+    if after is not None:
+        query["after"] = after
+    response = client.get(
+        "/api/events", query_string=query, headers={"X-Admin-Key": ADMIN_KEY}
+    )
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    return body["events"], body["next_cursor"]
+
+
+@pytest.fixture
+def events_client(tmp_path):
+    return make_events_app(f"sqlite:///{tmp_path / 'test.db'}").test_client()
+
+
+def test_paging_serves_every_event_once(events_client):
+    account, headers = register(events_client, "alice")
+    for amount in (1, 2, 3):
+        events_client.post(
+            "/api/transactions",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "transaction_type": "deposit",
+            },
+            headers=headers,
+        )
+
+    everything, _ = read_feed(events_client)
+    seen, cursor = [], None
+    while True:
+        page, cursor = read_feed(events_client, cursor, limit=1)
+        if not page:
+            break
+        seen.extend(page)
+    assert len(everything) == 3
+    assert [event["id"] for event in seen] == [event["id"] for event in everything]
+    # nothing new, the cursor stays put
+    assert read_feed(events_client, cursor) == ([], cursor)
+
+
+def test_a_malformed_cursor_is_rejected(events_client):
+    response = events_client.get(
+        "/api/events?after=12", headers={"X-Admin-Key": ADMIN_KEY}
+    )
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_a_late_commit_is_not_skipped(pg_url):
+    from sqlalchemy import insert
+    from app.models import db
+    from app.models.outbox_event import OutboxEvent
+
+    app = make_events_app(pg_url)
+    client = app.test_client()
+    with app.app_context():
+        engine = db.engine
+
+    def event(aggregate_id):
+        return {
+            "event_type": "transaction.created",
+            "aggregate_type": "transaction",
+            "aggregate_id": aggregate_id,
+            "payload": {},
+        }
+
+    _, cursor = read_feed(client)
+    # the first writer takes the lower id but commits last
+    with engine.connect() as early:
+        early.execute(insert(OutboxEvent), [event(1)])
+        with engine.begin() as late:
+            late.execute(insert(OutboxEvent), [event(2)])
+        assert read_feed(client, cursor) == ([], cursor)
+        early.commit()
+
+    events, _ = read_feed(client, cursor)
+    assert [event["aggregate_id"] for event in events] == [1, 2]
+    engine.dispose()
+
+
+def test_budget_changes_made_without_the_orm_are_recorded(events_client):
+    from sqlalchemy import update
+    from app.models import db
+    from app.models.budget import Budget
+    from app.models.budget_reconciliation import reconcile_budgets
+
+    account, headers = register(events_client, "alice")
+    budget = events_client.post(
+        "/api/budgets",
+        json={"name": "Food", "amount": 100, "category_id": 1, "duration_minutes": 60},
+        headers=headers,
+    ).get_json()
+    for transaction in (
+        {"amount": 50, "transaction_type": "deposit"},
+        {"amount": 20, "transaction_type": "payment", "category_id": 1},
+    ):
+        response = events_client.post(
+            "/api/transactions",
+            json={"account_id": account["id"], **transaction},
+            headers=headers,
+        )
+        assert response.status_code == 201, response.get_json()
+
+    events, cursor = read_feed(events_client)
+    budget_events = [e for e in events if e["aggregate_type"] == "budget"]
+    assert [e["event_type"] for e in budget_events] == [
+        "budget.created",
+        "budget.updated",
+    ]
+    assert budget_events[-1]["aggregate_id"] == budget["id"]
+    assert budget_events[-1]["payload"]["remaining_amount"] == "80.00"
+
+    # reconcile --fix puts a drifted budget back
+    with events_client.application.app_context():
+        db.session.execute(update(Budget).values(remaining_amount=1))
+        db.session.commit()
+        assert reconcile_budgets(fix=True)["fixed"]
+
+    events, _ = read_feed(events_client, cursor)
+    assert [(e["event_type"], e["payload"]["remaining_amount"]) for e in events] == [
+        ("budget.updated", "80.00")
+    ]
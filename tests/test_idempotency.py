@@ -0,0 +1,56 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from conftest import make_app, register
+
+
+def deposit(client, account, headers, amount, transaction_type="deposit"):
+    return client.post(
+        "/api/transactions",
+        json={
+            "account_id": account["id"],
+            "amount": amount,
+            "transaction_type": transaction_type,
+        },
+        headers={**headers, "Idempotency-Key": "deposit-1"},
+    )
+
+
+def transaction_count(app):
+    from sqlalchemy import func, select
+    from app.models import Transaction, db
+
+    with app.app_context():
+        return db.session.scalar(select(func.count(Transaction.id)))
+
+
+def test_a_rejected_request_leaves_the_key_free(app, client):
+    account, headers = register(client, "alice")
+    for amount, transaction_type in ((5, "bogus"), ("abc", "deposit")):
+        response = deposit(client, account, headers, amount, transaction_type)
+        assert response.status_code == 400, response.get_json()
+
+    response = deposit(client, account, headers, 5)
+    assert response.status_code == 201, response.get_json()
+    assert deposit(client, account, headers, 5).headers["Idempotent-Replayed"]
+    assert transaction_count(app) == 1
+
+
+def test_concurrent_retries_run_once(pg_url):
+    from app.models import db
+
+    app = make_app(pg_url)
+    account, headers = register(app.test_client(), "alice")
+    start = threading.Barrier(2)
+
+    def send(_):
+        client = app.test_client()
+        start.wait()
+        return deposit(client, account, headers, 5).status_code
+
+    try:
+        with ThreadPoolExecutor(2) as pool:
+            assert sorted(pool.map(send, range(2))) == [201, 201]
+        assert transaction_count(app) == 1
+    finally:
+        with app.app_context():
+            db.engine.dispose()
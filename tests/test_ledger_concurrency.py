@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+import pytest
+from conftest import make_app, register
+
+# Needs a PostgreSQL server (TEST_POSTGRESQL_URL), SQLite serializes every
+# writer anyway.
+
+THREADS = 16
+ROUNDS = 25
+
+
+@pytest.fixture
+def pg_app(pg_url):
+    app = make_app(pg_url, DB_MAX_OVERFLOW=str(THREADS))
+    yield app
+    with app.app_context():
+        from app.models import db
+
+        db.engine.dispose()
+
+
+def _hammer(app, jobs):
+    def run(job):
+        return (
+            app.test_client()
+            .post("/api/transactions", json=job["body"], headers=job["headers"])
+            .status_code
+        )
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        return list(pool.map(run, jobs))
+
+
+def _ledger_balance(app, account_id):
+    # what the transactions say the balance is
+    from sqlalchemy import func, select
+    from app.models import Transaction, db
+
+    with app.app_context():
+        incoming = db.session.scalar(
+            select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+                (
+                    (Transaction.transaction_type == Transaction.DEPOSIT)
+                    & (Transaction.from_account_id == account_id)
+                )
+                | (
+                    (Transaction.transaction_type == Transaction.TRANSFER)
+                    & (Transaction.to_account_id == account_id)
+                )
+            )
+        )
+        outgoing = db.session.scalar(
+            select(func.coalesce(func.sum(Transaction.amount), 0)).where(
+                Transaction.transaction_type != Transaction.DEPOSIT,
+                Transaction.from_account_id == account_id,
+            )
+        )
+        return Decimal(incoming) - Decimal(outgoing)
+
+
+def _balance(app, account_id):
+    from app.models import Account, db
+
+    with app.app_context():
+        return db.session.get(Account, account_id).balance
+
+
+def test_concurrent_debits_never_overdraw(pg_app):
+    client = pg_app.test_client()
+    alice, alice_headers = register(client, "alice")
+    bob, bob_headers = register(client, "bob")
+    for account, headers in ((alice, alice_headers), (bob, bob_headers)):
+        response = client.post(
+            "/api/transactions",
+            json={
+                "account_id": account["id"],
+                "amount": 100,
+                "transaction_type": "deposit",
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+
+    # far more is asked for than either account holds, from both sides at
+    # once, transfers in opposite directions included
+    jobs = []
+    for i in range(THREADS * ROUNDS):
+        account, headers, other = (
+            (alice, alice_headers, bob) if i % 2 else (bob, bob_headers, alice)
+        )
+        body = {"account_id": account["id"], "amount": 3}
+        if i % 3:
+            body.update(
+                transaction_type="transfer",
+                to_account_number=other["account_number"],
+            )
+        else:
+            body["transaction_type"] = "withdrawal"
+        jobs.append({"body": body, "headers": headers})
+
+    statuses = _hammer(pg_app, jobs)
+
+    assert set(statuses) <= {201, 400}, set(statuses)
+    assert statuses.count(400), "the accounts never ran dry, raise ROUNDS"
+    for account in (alice, bob):
+        balance = _balance(pg_app, account["id"])
+        assert balance >= 0
+        assert balance == _ledger_balance(pg_app, account["id"])
+    # withdrawals leave the system, transfers only move money around
+    withdrawn = sum(
+        3
+        for job, status in zip(jobs, statuses)
+        if status == 201 and job["body"]["transaction_type"] == "withdrawal"
+    )
+    assert _balance(pg_app, alice["id"]) + _balance(pg_app, bob["id"]) == (
+        200 - withdrawn
+    )
+
+
+def test_a_bill_is_paid_once(pg_app):
+    client = pg_app.test_client()
+    account, headers = register(client, "carol")
+    client.post(
+        "/api/transactions",
+        json={
+            "account_id": account["id"],
+            "amount": 100,
+            "transaction_type": "deposit",
+        },
+        headers=headers,
+    )
+    bill = client.post(
+        "/api/bills",
+        json={
+            "biller_name": "PLN",
+            "due_date": "2099-01-01",
+            "amount": 7,
+            "account_id": account["id"],
+            "category_id": 1,
+        },
+        headers=headers,
+    ).get_json()
+
+    job = {
+        "body": {
+            "account_id": account["id"],
+            "transaction_type": "bill_payment",
+            "bill_id": bill["id"],
+        },
+        "headers": headers,
+    }
+    statuses = _hammer(pg_app, [job] * THREADS)
+
+    assert statuses.count(201) == 1, statuses
+    assert _balance(pg_app, account["id"]) == Decimal("93.00")
+    assert _ledger_balance(pg_app, account["id"]) == Decimal("93.00")
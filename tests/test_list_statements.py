@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+import pytest
+from conftest import count_statements, register
+
+LIST_ENDPOINTS = ["/api/transactions", "/api/bills", "/api/budgets"]
+
+
+def seed(app, user_id, account_ids, rows):
+    """Add ``rows`` transactions, bills and budgets touching every account."""
+    from app.models import Bill, Budget, Transaction, db
+
+    with app.app_context():
+        for i in range(rows):
+            from_id = account_ids[i % len(account_ids)]
+            to_id = account_ids[(i + 1) % len(account_ids)]
+            db.session.add(
+                Transaction(
+                    amount=Decimal("1.00"),
+                    transaction_type=Transaction.PAYMENT if i % 2 else "transfer",
+                    from_account_id=from_id,
+                    to_account_id=None if i % 2 else to_id,
+                    category_id=1 if i % 2 else None,
+                )
+            )
+            db.session.add(
+                Bill(
+                    user_id=user_id,
+                    account_id=from_id,
+                    category_id=1 + i % 3,
+                    biller_name=f"Biller {i}",
+                    amount=Decimal("5.00"),
+                    due_date=datetime.now() + timedelta(days=30),
+                )
+            )
+            db.session.add(
+                Budget(
+                    user_id=user_id,
+                    category_id=1 + i % 3,
+                    name=f"Budget {i}",
+                    amount=Decimal("100.00"),
+                    remaining_amount=Decimal("100.00"),
+                    end_date=datetime.now() - timedelta(days=i + 1),
+                )
+            )
+        db.session.commit()
+
+
+def statements_per_endpoint(app, client, headers):
+    counts = {}
+    for path in LIST_ENDPOINTS:
+        with count_statements(app) as statements:
+            response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        counts[path] = (len(statements), len(response.get_json()))
+    return counts
+
+
+def test_list_endpoints_run_a_constant_number_of_statements(app, client):
+    account, headers = register(client, "alice")
+    # two more accounts, so rows join different accounts
+    for _ in range(2):
+        assert (
+            client.post(
+                "/api/accounts", json={"account_type": "savings"}, headers=headers
+            ).status_code
+            == 201
+        )
+    with app.app_context():
+        from app.models import Account
+
+        account_ids = [
+            a.id for a in Account.query.filter_by(user_id=account["user_id"])
+        ]
+
+    seed(app, account["user_id"], account_ids, 3)
+    # warm the principal and category caches, both are covered elsewhere
+    statements_per_endpoint(app, client, headers)
+    few = statements_per_endpoint(app, client, headers)
+
+    seed(app, account["user_id"], account_ids, 30)
+    many = statements_per_endpoint(app, client, headers)
+
+    for path in LIST_ENDPOINTS:
+        assert many[path][1] > few[path][1], path
+        assert many[path][0] == few[path][0], path
+
+
+@pytest.mark.parametrize("path", LIST_ENDPOINTS)
+def test_list_endpoints_never_lazy_load(app, client, path):
+    from sqlalchemy import event
+
+    account, headers = register(client, "bob")
+    seed(app, account["user_id"], [account["id"]], 5)
+
+    loads = []
+
+    def on_load(target, context):
+        loads.append(type(target).__name__)
+
+    from app.models import Account, Bill, Budget, Transaction, TransactionCategory
+
+    models = [Account, Bill, Budget, Transaction, TransactionCategory]
+    for model in models:
+        event.listen(model, "load", on_load)
+    try:
+        response = client.get(path, headers=headers)
+    finally:
+        for model in models:
+            event.remove(model, "load", on_load)
+    assert response.status_code == 200
+    # column projections only, no ORM instance is loaded at all
+    assert loads == [], loads
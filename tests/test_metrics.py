@@ -0,0 +1,15 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+def test_failed_statements_leave_no_timer_behind(app):
+    from app.models import db
+
+    with app.app_context(), db.engine.connect() as connection:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                connection.execute(text("SELECT * FROM missing_table"))
+            connection.rollback()
+        connection.execute(text("SELECT 1"))
+        assert "query_started" not in connection.info
@@ -0,0 +1,27 @@
+import threading
+from app import passwords
+
+
+def test_rehashes_past_the_queue_limit_are_dropped(app, monkeypatch):
+    slots = threading.BoundedSemaphore(2)
+    done = threading.Event()
+    rehashed = []
+
+    def rehash(app, user_id, old_hash, password):
+        done.wait(5)
+        rehashed.append(user_id)
+        slots.release()
+
+    monkeypatch.setattr(passwords, "_rehash_slots", slots)
+    monkeypatch.setattr(passwords, "_rehash", rehash)
+    with app.app_context():
+        scheduled = [
+            passwords.schedule_rehash(user_id, "old", "secret") for user_id in (1, 2, 3)
+        ]
+    assert scheduled == [True, True, False]
+
+    done.set()
+    passwords._rehash_executor.submit(lambda: None).result()
+    assert rehashed == [1, 2]
+    # the slots are back once the queue drains
+    assert slots.acquire(blocking=False) and slots.acquire(blocking=False)
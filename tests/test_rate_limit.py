@@ -0,0 +1,74 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from conftest import make_app
+from app.rate_limit import Limit, MemoryStore
+
+
+def test_prune_uses_each_buckets_own_limit(monkeypatch):
+    store = MemoryStore(stripes=1, max_keys=1)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+
+    # an hourly bucket that was just drained, and a per-second one
+    hourly = Limit.parse("2/hour")
+    store.take("login:ip:a", hourly)
+    store.take("login:ip:a", hourly)
+    now[0] += 5
+    store.take("fast:ip:b", Limit.parse("1/second"))
+
+    # pruned with the per-second limit the hourly bucket would be dropped
+    # and refilled, it must still be empty
+    assert store.take("login:ip:a", hourly) > 0
+
+
+def test_prune_drops_idle_buckets_once_full(monkeypatch):
+    store = MemoryStore(stripes=1, max_keys=2)
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    minute, hourly = Limit.parse("60/minute"), Limit.parse("60/hour")
+
+    store.take("a", minute)
+    store.take("b", hourly)
+    now[0] += 2  # "a" is full again, "b" is still a token short
+    store.take("c", minute)
+
+    _, buckets = store._stripes[0]
+    assert sorted(buckets) == ["b", "c"]
+
+
+def test_concurrent_takes_never_exceed_capacity():
+    store = MemoryStore(stripes=4)
+    limit = Limit.parse("50/hour")
+    start = threading.Barrier(16)
+
+    def take(_):
+        start.wait()
+        return sum(store.take("shared", limit) == 0 for _ in range(20))
+
+    with ThreadPoolExecutor(16) as pool:
+        admitted = sum(pool.map(take, range(16)))
+    # 320 attempts, a token refills every 72 seconds
+    assert admitted == limit.capacity
+
+
+def test_client_ip_comes_from_trusted_proxy(tmp_path):
+    app = make_app(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        RATE_LIMIT_ENABLED="true",
+        RATE_LIMIT_LOGIN="1/hour",
+        TRUSTED_PROXY_HOPS="1",
+    )
+    client = app.test_client()
+
+    def login(ip):
+        return client.post(
+            "/api/login",
+            json={"username": "nobody", "password": "wrong"},
+            headers={"X-Forwarded-For": ip},
+        ).status_code
+
+    assert login("203.0.113.1") != 429
+    assert login("203.0.113.1") == 429
+    # another client behind the same proxy has its own bucket
+    assert login("203.0.113.2") != 429
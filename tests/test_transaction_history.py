@@ -0,0 +1,49 @@
+from datetime import date, timedelta
+from conftest import register
+
+
+def test_paging_walks_to_the_last_page(client):
+    account, headers = register(client, "alice")
+    # made within the same second, the cursor has to break ties on id
+    for amount in range(1, 8):
+        client.post(
+            "/api/transactions",
+            json={
+                "account_id": account["id"],
+                "amount": amount,
+                "transaction_type": "deposit",
+            },
+            headers=headers,
+        )
+    client.post(
+        "/api/transactions",
+        json={
+            "account_id": account["id"],
+            "amount": 1,
+            "transaction_type": "withdrawal",
+        },
+        headers=headers,
+    )
+
+    today = date.today()
+    query = {
+        "type": "deposit",
+        "from": (today - timedelta(days=1)).isoformat(),
+        "to": (today + timedelta(days=1)).isoformat(),
+        "limit": 2,
+    }
+    seen, cursors = [], []
+    while True:
+        response = client.get("/api/transactions", query_string=query, headers=headers)
+        assert response.status_code == 200, response.get_json()
+        seen.extend(transaction["id"] for transaction in response.get_json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        assert cursor not in cursors
+        cursors.append(cursor)
+        query["cursor"] = cursor
+
+    assert len(cursors) == 3
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
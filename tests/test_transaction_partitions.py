@@ -0,0 +1,49 @@
+from conftest import make_app, register
+
+
+def test_the_migration_partitions_a_populated_table(pg_url):
+    import os
+    from flask_migrate import downgrade, upgrade
+    from sqlalchemy import text
+    from app.models import db
+    from app.models.transaction_partitions import is_partitioned, partition_months
+
+    app = make_app(pg_url)
+    account, _ = register(app.test_client(), "alice")
+    with app.app_context():
+        db.engine.dispose()
+    # the request timeout is far too short for the copy
+    app = make_app(pg_url, DB_STATEMENT_TIMEOUT_MS="1", AUTO_BOOTSTRAP="false")
+    directory = os.path.join(os.path.dirname(app.root_path), "migrations")
+
+    def count_rows(connection):
+        return connection.execute(text("SELECT count(*) FROM transactions")).scalar()
+
+    try:
+        with app.app_context():
+            downgrade(directory, "42376af89637")
+            with db.engine.begin() as connection:
+                assert not is_partitioned(connection)
+                # a year of history, one month a year ago included
+                connection.execute(
+                    text(
+                        "INSERT INTO transactions (amount, transaction_type, "
+                        "description, created_at, from_account_id) "
+                        "SELECT 1, 'deposit', '', now() - i * interval '1 hour', :id "
+                        "FROM generate_series(0, 24 * 365) AS i"
+                    ),
+                    {"id": account["id"]},
+                )
+                before = count_rows(connection)
+
+            upgrade(directory)
+            with db.engine.connect() as connection:
+                assert is_partitioned(connection)
+                assert count_rows(connection) == before
+                assert len(partition_months(connection)) >= 13
+                assert not connection.execute(
+                    text("SELECT count(*) FROM transactions_default")
+                ).scalar()
+    finally:
+        with app.app_context():
+            db.engine.dispose()
@@ -0,0 +1,126 @@
+from decimal import Decimal
+import pytest
+from conftest import register
+
+
+def post_batch(client, headers, items, atomic):
+    return client.post(
+        "/api/transactions/batch",
+        json={"transactions": items, "atomic": atomic},
+        headers=headers,
+    )
+
+
+def balance(client, account, headers):
+    response = client.get(f"/api/accounts/{account['id']}/balance", headers=headers)
+    return Decimal(str(response.get_json()["balance"]))
+
+
+def test_partial_batch_rejects_a_malformed_amount_only(client):
+    account, headers = register(client, "alice")
+    deposit = {"account_id": account["id"], "transaction_type": "deposit"}
+
+    response = post_batch(
+        client,
+        headers,
+        [
+            {**deposit, "amount": 10},
+            {**deposit, "amount": "abc"},
+            {**deposit, "amount": "NaN"},
+            {**deposit, "amount": 5},
+        ],
+        atomic=False,
+    )
+
+    assert response.status_code == 207, response.get_json()
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == [201, 400, 400, 201]
+    assert results[1]["error"] == "Amount must be a valid number"
+    assert balance(client, account, headers) == Decimal("15")
+
+
+def test_atomic_batch_rejects_a_malformed_amount(client):
+    account, headers = register(client, "bob")
+    deposit = {"account_id": account["id"], "transaction_type": "deposit"}
+
+    response = post_batch(
+        client, headers, [{**deposit, "amount": 10}, {**deposit, "amount": "abc"}], True
+    )
+
+    assert response.status_code == 400, response.get_json()
+    assert response.get_json()["details"]["index"] == 1
+    assert balance(client, account, headers) == Decimal("0")
+
+
+def test_rolled_back_item_does_not_leave_stale_rows(client, monkeypatch):
+    from app.models.spending_rollup import SpendingRollup
+    from app.models.transaction_service import TransactionError
+
+    account, headers = register(client, "carol")
+    deposit = {"account_id": account["id"], "transaction_type": "deposit"}
+    client.post("/api/transactions", json={**deposit, "amount": 40}, headers=headers)
+
+    # the payment is rejected after the ledger already took the money, its
+    # savepoint puts the balance back and the next item must see it
+    record = SpendingRollup.record
+
+    def reject_once(*args):
+        monkeypatch.setattr(SpendingRollup, "record", record)
+        raise TransactionError({"error": "Category is closed"})
+
+    monkeypatch.setattr(SpendingRollup, "record", reject_once)
+    response = post_batch(
+        client,
+        headers,
+        [
+            {**deposit, "transaction_type": "payment", "amount": 30, "category_id": 1},
+            {**deposit, "transaction_type": "withdrawal", "amount": 40},
+        ],
+        atomic=False,
+    )
+
+    assert response.status_code == 207, response.get_json()
+    results = response.get_json()["results"]
+    assert [result["status"] for result in results] == [400, 201]
+    assert balance(client, account, headers) == Decimal("0")
+
+
+@pytest.mark.parametrize("atomic", [True, False])
+def test_a_server_error_rolls_the_batch_back(client, monkeypatch, atomic):
+    from app.models.spending_rollup import SpendingRollup
+
+    account, headers = register(client, "dave")
+    deposit = {"account_id": account["id"], "transaction_type": "deposit"}
+
+    def fail(*args):
+        raise ValueError("Rollup unavailable")
+
+    monkeypatch.setattr(SpendingRollup, "record", fail)
+    response = post_batch(
+        client,
+        headers,
+        [
+            {**deposit, "amount": 40},
+            {**deposit, "transaction_type": "payment", "amount": 30, "category_id": 1},
+            {**deposit, "transaction_type": "bogus", "amount": 5},
+        ],
+        atomic=atomic,
+    )
+
+    assert response.status_code == 500, response.get_json()
+    assert balance(client, account, headers) == Decimal("0")
+
+
+def test_an_invalid_type_is_rejected(client):
+    account, headers = register(client, "erin")
+    response = post_batch(
+        client,
+        headers,
+        [{"account_id": account["id"], "transaction_type": "bogus", "amount": 5}],
+        atomic=False,
+    )
+
+    assert response.status_code == 207, response.get_json()
+    result = response.get_json()["results"][0]
+    assert result["status"] == 400
+    assert result["error"].startswith("Invalid transaction type")